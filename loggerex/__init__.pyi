@@ -41,9 +41,9 @@ else:
     from typing_extensions import ContextManager
 
 if sys.version_info >= (3, 8):
-    from typing import Protocol, TypedDict
+    from typing import Literal, Protocol, TypedDict
 else:
-    from typing_extensions import Protocol, TypedDict
+    from typing_extensions import Literal, Protocol, TypedDict
 
 _T = TypeVar("_T")
 _F = TypeVar("_F", bound=Callable[..., Any])
@@ -133,7 +133,10 @@ class BasicHandlerConfig(TypedDict, total=False):
     serialize: bool
     backtrace: bool
     diagnose: bool
-    enqueue: bool
+    enqueue: Union[bool, Literal["thread", "shared_memory"]]
+    queue_size: Optional[int]
+    overflow: str
+    flush: str
     catch: bool
 
 class FileHandlerConfig(TypedDict, total=False):
@@ -145,7 +148,10 @@ class FileHandlerConfig(TypedDict, total=False):
     serialize: bool
     backtrace: bool
     diagnose: bool
-    enqueue: bool
+    enqueue: Union[bool, Literal["thread", "shared_memory"]]
+    queue_size: Optional[int]
+    overflow: str
+    flush: str
     catch: bool
     rotation: Optional[
         Union[
@@ -160,7 +166,17 @@ class FileHandlerConfig(TypedDict, total=False):
     retention: Optional[Union[str, int, timedelta, RetentionFunction]]
     compression: Optional[Union[str, CompressionFunction]]
     delay: bool
-    watch: bool
+    watch: Union[bool, Literal["inotify"]]
+    watch_interval: Optional[Union[str, int, float, timedelta]]
+    background: Union[bool, Literal["thread", "process"]]
+    compression_mode: str
+    compression_level: Optional[int]
+    fsync: Union[bool, str]
+    preallocate: Union[bool, int, str]
+    drop_cache: bool
+    shared: bool
+    time_partition: bool
+    max_open_files: int
     mode: str
     buffering: int
     encoding: str
@@ -178,7 +194,9 @@ class AsyncHandlerConfig(TypedDict, total=False):
     serialize: bool
     backtrace: bool
     diagnose: bool
-    enqueue: bool
+    enqueue: Union[bool, Literal["thread", "shared_memory"]]
+    queue_size: Optional[int]
+    overflow: str
     catch: bool
     context: Optional[Union[str, BaseContext]]
     loop: Optional[AbstractEventLoop]
@@ -206,8 +224,11 @@ class Logger:
         serialize: bool = ...,
         backtrace: bool = ...,
         diagnose: bool = ...,
-        enqueue: bool = ...,
+        enqueue: Union[bool, Literal["thread", "shared_memory"]] = ...,
         context: Optional[Union[str, BaseContext]] = ...,
+        queue_size: Optional[int] = ...,
+        overflow: str = ...,
+        flush: str = ...,
         catch: bool = ...
     ) -> int: ...
     @overload
@@ -222,9 +243,11 @@ class Logger:
         serialize: bool = ...,
         backtrace: bool = ...,
         diagnose: bool = ...,
-        enqueue: bool = ...,
+        enqueue: Union[bool, Literal["thread", "shared_memory"]] = ...,
         catch: bool = ...,
         context: Optional[Union[str, BaseContext]] = ...,
+        queue_size: Optional[int] = ...,
+        overflow: str = ...,
         loop: Optional[AbstractEventLoop] = ...
     ) -> int: ...
     @overload
@@ -239,8 +262,11 @@ class Logger:
         serialize: bool = ...,
         backtrace: bool = ...,
         diagnose: bool = ...,
-        enqueue: bool = ...,
+        enqueue: Union[bool, Literal["thread", "shared_memory"]] = ...,
         context: Optional[Union[str, BaseContext]] = ...,
+        queue_size: Optional[int] = ...,
+        overflow: str = ...,
+        flush: str = ...,
         catch: bool = ...,
         rotation: Optional[
             Union[
@@ -255,7 +281,17 @@ class Logger:
         retention: Optional[Union[str, int, timedelta, RetentionFunction]] = ...,
         compression: Optional[Union[str, CompressionFunction]] = ...,
         delay: bool = ...,
-        watch: bool = ...,
+        watch: Union[bool, Literal["inotify"]] = ...,
+        watch_interval: Optional[Union[str, int, float, timedelta]] = ...,
+        background: Union[bool, Literal["thread", "process"]] = ...,
+        compression_mode: str = ...,
+        compression_level: Optional[int] = ...,
+        fsync: Union[bool, str] = ...,
+        preallocate: Union[bool, int, str] = ...,
+        drop_cache: bool = ...,
+        shared: bool = ...,
+        time_partition: bool = ...,
+        max_open_files: int = ...,
         mode: str = ...,
         buffering: int = ...,
         encoding: str = ...,
@@ -1,5 +1,7 @@
 import re
+from _string import formatter_field_name_split
 from contextlib import contextmanager
+from functools import partial
 from string import Formatter
 
 
@@ -355,10 +357,115 @@ class ColoredMessage:
         return AnsiParser.colorize(self.tokens, ansi_level)
 
 
+class FormattingOverlay:
+    # A mapping of the record in which the "exception" and "message" fields are replaced by their
+    # formatted version, this avoids copying the record for each handler.
+    __slots__ = ("_exception", "_message", "_record")
+
+    def __init__(self, record, exception, message):
+        self._record = record
+        self._exception = exception
+        self._message = message
+
+    def __getitem__(self, key):
+        if key == "exception":
+            return self._exception
+        if key == "message":
+            return self._message
+        return self._record[key]
+
+
+def format_with_overlay(format_map, record, exception, message):
+    return format_map(FormattingOverlay(record, exception, message))
+
+
+def compile_template(format_string):
+    # Generate a function equivalent to "format_string.format_map(overlay)", but which does not need
+    # to parse the format string each time it is called. Values are never inlined in the generated
+    # source code, they are passed through the namespace of the function instead.
+    namespace = {
+        "_format": format,
+        "_getattr": getattr,
+        "_repr": repr,
+        "_str": str,
+        "_ascii": ascii,
+    }
+    conversions = {None: "", "r": "_repr", "s": "_str", "a": "_ascii"}
+    overridden = {"exception": "exception", "message": "message"}
+    parts = []
+
+    try:
+        parsed = list(Formatter().parse(format_string))
+    except ValueError:
+        return None
+
+    for index, (literal_text, field_name, format_spec, conversion) in enumerate(parsed):
+        if literal_text:
+            namespace["_l%d" % index] = literal_text
+            parts.append("_l%d" % index)
+
+        if field_name is None:
+            continue
+
+        # Nested replacement fields, positional arguments and invalid specifiers are rare enough
+        # not to deserve special handling, the built-in implementation takes care of them.
+        if "{" in format_spec or conversion not in conversions:
+            return None
+
+        try:
+            first, rest = formatter_field_name_split(field_name)
+            rest = list(rest)
+        except ValueError:
+            return None
+
+        if not isinstance(first, str) or first == "":
+            return None
+
+        if first in overridden:
+            accessor = overridden[first]
+        else:
+            namespace["_k%d" % index] = first
+            accessor = "record[_k%d]" % index
+
+        for position, (is_attribute, key) in enumerate(rest):
+            name = "_a%d_%d" % (index, position)
+            namespace[name] = key
+            if is_attribute:
+                accessor = "_getattr(%s, %s)" % (accessor, name)
+            else:
+                accessor = "%s[%s]" % (accessor, name)
+
+        if conversion is not None:
+            accessor = "%s(%s)" % (conversions[conversion], accessor)
+
+        namespace["_s%d" % index] = format_spec
+        parts.append("_format(%s, _s%d)" % (accessor, index))
+
+    source = "def render(record, exception, message):\n    return ''.join((%s))\n" % "".join(
+        p + ", " for p in parts
+    )
+    exec(compile(source, "<loguru format>", "exec"), namespace)
+    return namespace["render"]
+
+
+class FormatTemplate:
+    __slots__ = ("format_string", "render")
+
+    def __init__(self, format_string):
+        self.format_string = format_string
+        self.render = compile_template(format_string) or partial(
+            format_with_overlay, format_string.format_map
+        )
+
+    def __reduce__(self):
+        return (FormatTemplate, (self.format_string,))
+
+
 class ColoredFormat:
-    def __init__(self, tokens, messages_color_tokens):
+    def __init__(self, tokens, messages_color_tokens, fields):
         self._tokens = tokens
         self._messages_color_tokens = messages_color_tokens
+        self.fields = fields
 
     def strip(self):
         return AnsiParser.strip(self._tokens)
@@ -383,10 +490,13 @@ class ColoredFormat:
 
 
 class Colorizer:
+    # The record key accessed by a format field, e.g. "extra" for "{extra[ip]}".
+    _regex_field_root = re.compile(r"[^.\[]*")
+
     @staticmethod
     def prepare_format(string):
-        tokens, messages_color_tokens = Colorizer._parse_without_formatting(string)
-        return ColoredFormat(tokens, messages_color_tokens)
+        tokens, messages_color_tokens, fields = Colorizer._parse_without_formatting(string)
+        return ColoredFormat(tokens, messages_color_tokens, frozenset(fields))
 
     @staticmethod
     def prepare_message(string, args=(), kwargs={}):  # noqa: B006
@@ -477,6 +587,7 @@ class Colorizer:
         parser = AnsiParser()
 
         messages_color_tokens = []
+        fields = []
 
         for literal_text, field_name, format_spec, conversion in formatter.parse(string):
             if literal_text and literal_text[-1] in "{}":
@@ -485,6 +596,7 @@ class Colorizer:
             parser.feed(literal_text, raw=recursive)
 
             if field_name is not None:
+                fields.append(Colorizer._regex_field_root.match(field_name).group(0))
                 if field_name == "message":
                     if recursive:
                         messages_color_tokens.append(None)
@@ -499,9 +611,10 @@ class Colorizer:
                 field += "}"
                 parser.feed(field, raw=True)
 
-                _, color_tokens = Colorizer._parse_without_formatting(
+                _, color_tokens, nested_fields = Colorizer._parse_without_formatting(
                     format_spec, recursion_depth=recursion_depth - 1, recursive=True
                 )
                 messages_color_tokens.extend(color_tokens)
+                fields.extend(nested_fields)
 
-        return parser.done(), messages_color_tokens
+        return parser.done(), messages_color_tokens, fields
@@ -1,9 +1,12 @@
 import re
+import time as time_module
 from calendar import day_abbr, day_name, month_abbr, month_name
 from datetime import datetime as datetime_
 from datetime import timedelta, timezone
 from functools import lru_cache, partial
-from time import localtime, strftime
+from time import localtime, strftime, time
+
+from . import _defaults
 
 tokens = r"H{1,2}|h{1,2}|m{1,2}|s{1,2}|S+|YYYY|YY|M{1,4}|D{1,4}|Z{1,2}|zz|A|X|x|E|Q|dddd|ddd|d"
 
@@ -16,25 +19,56 @@ def _builtin_datetime_formatter(is_utc, format_string, dt):
     return dt.strftime(format_string)
 
 
-def _loguru_datetime_formatter(is_utc, format_string, formatters, dt):
-    if is_utc:
-        dt = dt.astimezone(timezone.utc)
-    t = dt.timetuple()
-    args = tuple(f(t, dt) for f in formatters)
-    return format_string % args
+class _LoguruDatetimeFormatter:
+    """Format a datetime, re-using the rendered date and time while the second doesn't change."""
+
+    __slots__ = ("_cache", "_format_string", "_formatters", "_is_utc", "_sub_second_formatters")
+
+    def __init__(self, is_utc, format_string, formatters, sub_second_formatters):
+        # The "format_string" contains placeholders for the "formatters" (which depend on the whole
+        # second only) and escaped placeholders for the "sub_second_formatters". Once the former
+        # are rendered, the resulting template only needs the sub-second parts to be spliced in.
+        self._is_utc = is_utc
+        self._format_string = format_string
+        self._formatters = formatters
+        self._sub_second_formatters = sub_second_formatters
+        self._cache = (None, None, None, None, None)
+
+    def __call__(self, dt):
+        last_dt, last_result, key, tzinfo, template = self._cache
+
+        # Handlers using the same time format are called successively with the same datetime.
+        if dt is last_dt:
+            return last_result
+
+        original_dt = dt
 
+        if self._is_utc:
+            dt = dt.astimezone(timezone.utc)
 
-def _default_datetime_formatter(dt):
-    return "%04d-%02d-%02d %02d:%02d:%02d.%03d %s" % (
-        dt.year,
-        dt.month,
-        dt.day,
-        dt.hour,
-        dt.minute,
-        dt.second,
-        dt.microsecond // 1000,
-        _format_timezone(dt, sep=":"),
-    )
+        new_key = (dt.second, dt.minute, dt.hour, dt.day, dt.month, dt.year)
+
+        if type(dt.tzinfo) is not timezone:
+            # The offset of arbitrary timezones may change without the displayed time changing.
+            new_key += (dt.utcoffset(),)
+
+        if new_key != key or dt.tzinfo is not tzinfo:
+            t = dt.timetuple()
+            args = tuple(f(t, dt) for f in self._formatters)
+            if self._sub_second_formatters:
+                # The template is formatted again, the "%" of the rendered tokens must be kept.
+                args = tuple(arg.replace("%", "%%") for arg in args)
+            template = self._format_string % args
+            key, tzinfo = new_key, dt.tzinfo
+
+        if self._sub_second_formatters:
+            result = template % tuple(f(dt) for f in self._sub_second_formatters)
+        else:
+            result = template
+
+        self._cache = (original_dt, result, key, tzinfo, template)
+
+        return result
 
 
 def _format_timezone(dt, *, sep):
@@ -51,11 +85,12 @@ def _format_timezone(dt, *, sep):
     return z
 
 
+def _format_token(specifier, formatter, t, dt):
+    return specifier % formatter(t, dt)
+
+
 @lru_cache(maxsize=32)
 def _compile_format(spec):
-    if spec == "YYYY-MM-DD HH:mm:ss.SSS Z":
-        return _default_datetime_formatter
-
     is_utc = spec.endswith("!UTC")
 
     if is_utc:
@@ -98,22 +133,27 @@ def _compile_format(spec):
         "m": ("%d", lambda t, dt: t.tm_min),
         "ss": ("%02d", lambda t, dt: t.tm_sec),
         "s": ("%d", lambda t, dt: t.tm_sec),
-        "S": ("%d", lambda t, dt: dt.microsecond // 100000),
-        "SS": ("%02d", lambda t, dt: dt.microsecond // 10000),
-        "SSS": ("%03d", lambda t, dt: dt.microsecond // 1000),
-        "SSSS": ("%04d", lambda t, dt: dt.microsecond // 100),
-        "SSSSS": ("%05d", lambda t, dt: dt.microsecond // 10),
-        "SSSSSS": ("%06d", lambda t, dt: dt.microsecond),
         "A": ("%s", lambda t, dt: "AM" if t.tm_hour < 12 else "PM"),
         "Z": ("%s", lambda t, dt: _format_timezone(dt, sep=":")),
         "ZZ": ("%s", lambda t, dt: _format_timezone(dt, sep="")),
         "zz": ("%s", lambda t, dt: (dt.tzinfo or timezone.utc).tzname(dt) or ""),
-        "X": ("%d", lambda t, dt: dt.timestamp()),
-        "x": ("%d", lambda t, dt: int(dt.timestamp() * 1000000 + dt.microsecond)),
+    }
+
+    # These tokens may change within the same second, they are not cached.
+    sub_second_rep = {
+        "S": ("%d", lambda dt: dt.microsecond // 100000),
+        "SS": ("%02d", lambda dt: dt.microsecond // 10000),
+        "SSS": ("%03d", lambda dt: dt.microsecond // 1000),
+        "SSSS": ("%04d", lambda dt: dt.microsecond // 100),
+        "SSSSS": ("%05d", lambda dt: dt.microsecond // 10),
+        "SSSSSS": ("%06d", lambda dt: dt.microsecond),
+        "X": ("%d", lambda dt: dt.timestamp()),
+        "x": ("%d", lambda dt: int(dt.timestamp() * 1000000 + dt.microsecond)),
     }
 
     format_string = ""
     formatters = []
+    sub_second_formatters = []
     pos = 0
 
     for match in pattern.finditer(spec):
@@ -123,17 +163,20 @@ def _compile_format(spec):
 
         token = match.group(0)
 
-        try:
+        if token in rep:
             specifier, formatter = rep[token]
-        except KeyError:
-            format_string += token[1:-1]
+            format_string += "%s"
+            formatters.append(partial(_format_token, specifier, formatter))
+        elif token in sub_second_rep:
+            specifier, formatter = sub_second_rep[token]
+            format_string += "%" + specifier
+            sub_second_formatters.append(formatter)
         else:
-            format_string += specifier
-            formatters.append(formatter)
+            format_string += token[1:-1]
 
     format_string += spec[pos:]
 
-    return partial(_loguru_datetime_formatter, is_utc, format_string, formatters)
+    return _LoguruDatetimeFormatter(is_utc, format_string, formatters, sub_second_formatters)
 
 
 class datetime(datetime_):  # noqa: N801
@@ -172,8 +215,37 @@ def _get_tzinfo(timestamp):
         return _fallback_tzinfo(timestamp)
 
 
+# Modern time zones only change their UTC offset on quarter-hour boundaries, so the local timezone
+# can be reused until the next one. The cache is also invalidated if "time.tzset()" is called. It
+# is stored as a single tuple so that concurrent threads never observe a partially updated state.
+_tzinfo_cache_period = 900
+_tzinfo_cache = (None, 0, 0, None)  # (tzname, start, end, tzinfo)
+
+# If "localtime()" is replaced (typically while mocking time in tests), the clock may jump
+# arbitrarily and the cache is bypassed entirely. The reference is kept in a container so that it
+# is not mistakenly patched by libraries such as "freezegun".
+_system_functions = {"localtime": localtime}
+
+
 def aware_now():
-    now = datetime_.now()
-    timestamp = now.timestamp()
-    tzinfo = _get_tzinfo(timestamp)
-    return datetime.combine(now.date(), now.time().replace(tzinfo=tzinfo))
+    global _tzinfo_cache
+
+    if _defaults.LOGURU_UTC:
+        return datetime.fromtimestamp(time(), tz=timezone.utc)
+
+    if localtime is not _system_functions["localtime"]:
+        now = datetime_.now()
+        timestamp = now.timestamp()
+        tzinfo = _get_tzinfo(timestamp)
+        return datetime.combine(now.date(), now.time().replace(tzinfo=tzinfo))
+
+    timestamp = time()
+    tzname, start, end, tzinfo = _tzinfo_cache
+
+    if not start <= timestamp < end or tzname is not time_module.tzname:
+        tzname = time_module.tzname
+        start = timestamp - timestamp % _tzinfo_cache_period
+        tzinfo = _get_tzinfo(timestamp)
+        _tzinfo_cache = (tzname, start, start + _tzinfo_cache_period, tzinfo)
+
+    return datetime.fromtimestamp(timestamp, tz=tzinfo)
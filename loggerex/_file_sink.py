@@ -1,16 +1,35 @@
+import collections
+import concurrent.futures
 import datetime
 import decimal
+import errno
+import fnmatch
 import glob
+import io
+import multiprocessing
 import numbers
 import os
+import re
 import shutil
 import string
+import sys
+import threading
+import time
 from functools import partial
 from stat import ST_DEV, ST_INO
 
+try:
+    import fcntl
+except ImportError:  # The module is only available on Unix.
+    fcntl = None
+
+from . import _page_cache as page_cache
 from . import _string_parsers as string_parsers
 from ._ctime_functions import get_ctime, set_ctime
 from ._datetime import aware_now
+from ._datetime import pattern as datetime_pattern
+from ._flush_policy import FlushPolicy
+from ._inotify import FileWatcher, inotify_functions
 
 
 def generate_rename_path(root, ext, creation_time):
@@ -27,6 +46,246 @@ def generate_rename_path(root, ext, creation_time):
     return renamed_path
 
 
+class FileIndex:
+    """The log files managed by a sink, associated with the result of "os.stat()".
+
+    The files are listed from disk only once, the index is then updated as they are rotated,
+    compressed or removed, so that the retention doesn't need to scan the directories each time.
+    The files are listed again if the sink notices its file was replaced (for example, rotated by
+    another process sharing it), files rotated by independent processes are otherwise not seen.
+    """
+
+    def __init__(self, glob_patterns):
+        self._glob_patterns = glob_patterns
+        self._stats = None
+
+    def __getstate__(self):
+        # Worker processes list the files themselves, changes they make are not tracked.
+        state = self.__dict__.copy()
+        state["_stats"] = None
+        return state
+
+    def paths(self):
+        return list(self._get_stats())
+
+    def stat(self, path):
+        return self._get_stats()[path]
+
+    def add(self, path):
+        if self._stats is None:
+            return
+        try:
+            self._stats[path] = os.stat(path)
+        except FileNotFoundError:
+            self._stats.pop(path, None)
+
+    def remove(self, path):
+        if self._stats is not None:
+            self._stats.pop(path, None)
+
+    def invalidate(self):
+        self._stats = None
+
+    def _get_stats(self):
+        if self._stats is None:
+            self._stats = self._scan()
+        return self._stats
+
+    def _scan(self):
+        stats = {}
+        patterns_by_directory = {}
+
+        for pattern in self._glob_patterns:
+            directory, name = os.path.split(pattern)
+            patterns_by_directory.setdefault(directory, []).append(name)
+
+        for directory, names in patterns_by_directory.items():
+            if glob.has_magic(directory):
+                # The directory itself depends on the time, there is no way around "glob".
+                for name in names:
+                    for file in glob.glob(os.path.join(directory, name)):
+                        if os.path.isfile(file):
+                            stats[file] = os.stat(file)
+                continue
+
+            try:
+                entries = list(os.scandir(directory))
+            except FileNotFoundError:
+                continue
+
+            for entry in entries:
+                if not any(self._match(entry.name, name) for name in names):
+                    continue
+                if entry.is_file():
+                    stats[os.path.join(directory, entry.name)] = entry.stat()
+
+        return stats
+
+    @staticmethod
+    def _match(filename, pattern):
+        # Same as "glob", wildcards don't match hidden files.
+        if filename.startswith(".") and not pattern.startswith("."):
+            return False
+        return fnmatch.fnmatch(filename, pattern)
+
+
+class FileFinalizer:
+    """Compress the closed file and apply the retention to the files managed by the sink.
+
+    It may be called by a background worker, in which case it must be picklable. The file opened
+    by the sink in the meantime is then given as "active_path", it is excluded from the retention.
+    """
+
+    def __init__(
+        self,
+        compression_function,
+        retention_function,
+        index,
+        *,
+        is_compression_custom,
+        is_retention_custom
+    ):
+        self._compression_function = compression_function
+        self._retention_function = retention_function
+        self._index = index
+        self._is_compression_custom = is_compression_custom
+        self._is_retention_custom = is_retention_custom
+
+    def __call__(self, path, previous_path=None, active_path=None):
+        try:
+            self._finalize(path, previous_path, active_path)
+        except BaseException:
+            # Some files may have been modified, the index can't be trusted anymore.
+            self._index.invalidate()
+            raise
+
+    def _finalize(self, path, previous_path, active_path):
+        index = self._index
+
+        if previous_path is not None:
+            index.remove(previous_path)
+
+        if path is not None:
+            if self._compression_function is None:
+                index.add(path)
+            elif self._is_compression_custom:
+                self._compression_function(path)
+                index.invalidate()
+            else:
+                created_paths = self._compression_function(path)
+                index.remove(path)
+                for created_path in created_paths:
+                    index.add(created_path)
+
+        if self._retention_function is not None:
+            paths = [p for p in index.paths() if p != active_path]
+            if self._is_retention_custom:
+                self._retention_function(paths)
+                index.invalidate()
+            else:
+                for removed_path in self._retention_function(paths, stat=index.stat):
+                    index.remove(removed_path)
+
+
+class GroupCommitter:
+    """Synchronize the file to disk at most once per interval.
+
+    A single synchronization covers all the messages written since the previous one, while the
+    writers wait for their message to be committed.
+    """
+
+    def __init__(self, interval):
+        self.pid = os.getpid()
+        self._interval = interval
+        self._condition = threading.Condition()
+        self._fd_lock = threading.Lock()
+        self._fd = None
+        self._written = 0
+        self._committed = 0
+        self._failure = None
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, daemon=True, name="loggerex-committer")
+        self._thread.start()
+
+    def attach(self, fd):
+        with self._fd_lock:
+            self._fd = fd
+
+    def detach(self):
+        """Commit the messages written to the file about to be closed, return the error if any."""
+        with self._fd_lock:
+            error = self._commit()
+            self._fd = None
+        return error
+
+    def register(self):
+        """Account for a message written (and flushed) to the file, return its sequence number."""
+        with self._condition:
+            self._written += 1
+            self._condition.notify_all()
+            return self._written
+
+    def commit(self):
+        with self._fd_lock:
+            return self._commit()
+
+    def wait(self, sequence):
+        with self._condition:
+            while self._committed < sequence:
+                self._condition.wait()
+            failure = self._failure
+
+        if failure is not None and failure[0] <= sequence <= failure[1]:
+            raise failure[2]
+
+    def stop(self):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        self._thread.join()
+
+    def _commit(self):
+        with self._condition:
+            first, last = self._committed + 1, self._written
+
+        if first > last:
+            return None
+
+        error = None
+
+        if self._fd is not None:
+            try:
+                os.fsync(self._fd)
+            except OSError as e:
+                error = e
+
+        with self._condition:
+            self._committed = last
+            if error is not None:
+                self._failure = (first, last, error)
+            self._condition.notify_all()
+
+        return error
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._committed == self._written and not self._stopped:
+                    self._condition.wait()
+                if self._stopped:
+                    return
+
+                # Messages written in the meantime are committed together with the first one.
+                deadline = time.monotonic() + self._interval
+                while not self._stopped:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+
+            self.commit()
+
+
 class FileDateFormatter:
     def __init__(self, datetime=None):
         self.datetime = datetime or aware_now()
@@ -38,6 +297,12 @@ class FileDateFormatter:
 
 
 class Compression:
+    # Size of the blocks compressed in parallel, larger for "xz" as it benefits from its large
+    # dictionary (each block being compressed independently).
+    parallel_block_sizes = frozenset(
+        {"gz": 1024 * 1024, "bz2": 1024 * 1024, "xz": 8 * 1024 * 1024}.items()
+    )
+
     @staticmethod
     def add_compress(path_in, path_out, opener, **kwargs):
         with opener(path_out, **kwargs) as f_comp:
@@ -54,34 +319,177 @@ class Compression:
             with opener(path_out, **kwargs) as f_out:
                 shutil.copyfileobj(f_in, f_out)
 
+    @staticmethod
+    def parallel_compress(path_in, path_out, compress, block_size, workers):
+        # Each block is compressed independently and the results are concatenated, which is valid
+        # for these formats: gzip members, bzip2 and xz streams are decompressed one after another.
+        with open(path_in, "rb") as f_in, open(path_out, "wb") as f_out:
+            block = f_in.read(block_size)
+
+            if len(block) < block_size:
+                # Starting worker processes is not worth it for a single block.
+                f_out.write(compress(block))
+                return
+
+            # The worker processes are not forked, as the handler's lock may be held at rotation.
+            context = multiprocessing.get_context("spawn")
+
+            with concurrent.futures.ProcessPoolExecutor(workers, mp_context=context) as executor:
+                # The number of blocks in memory is bounded, the file may be much larger than it.
+                pending = collections.deque()
+
+                while block:
+                    pending.append(executor.submit(compress, block))
+                    if len(pending) >= 2 * workers:
+                        f_out.write(pending.popleft().result())
+                    block = f_in.read(block_size)
+
+                while pending:
+                    f_out.write(pending.popleft().result())
+
     @staticmethod
     def compression(path_in, ext, compress_function):
         path_out = "{}{}".format(path_in, ext)
+        created_paths = [path_out]
 
         if os.path.exists(path_out):
             creation_time = get_ctime(path_out)
             root, ext_before = os.path.splitext(path_in)
             renamed_path = generate_rename_path(root, ext_before + ext, creation_time)
             os.rename(path_out, renamed_path)
+            created_paths.append(renamed_path)
         compress_function(path_in, path_out)
         os.remove(path_in)
 
+        return created_paths
+
+
+class CompressedStream(io.BufferedIOBase):
+    """Binary stream compressing the data written to the underlying file on the fly.
+
+    Flushing it doesn't end the compressed stream, but makes the data written so far decompressible.
+    If the format doesn't support a "sync flush", the compressed stream is ended and a new one is
+    started, since the formats used allow several of them to be concatenated in the same file.
+    """
+
+    def __init__(self, file, compressor_factory, sync_flush_mode=None, uncompressed_size=0):
+        self._file = file
+        self._compressor_factory = compressor_factory
+        self._sync_flush_mode = sync_flush_mode
+        self._compressor = compressor_factory()
+        self._is_dirty = False
+        self._is_started = False
+        # The size of the data before compression, as the size of the file can't be relied on.
+        self.uncompressed_size = uncompressed_size
+
+    @staticmethod
+    def measure(path, decompress_opener):
+        # The file may be truncated if the program was interrupted, the data readable is counted.
+        size = 0
+        try:
+            with decompress_opener(path) as file:
+                while True:
+                    chunk = file.read(1024 * 1024)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+        except Exception:
+            pass
+        return size
+
+    @property
+    def name(self):
+        return self._file.name
+
+    def fileno(self):
+        return self._file.fileno()
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._file.write(self._compressor.compress(data))
+        self._is_dirty = self._is_started = True
+        self.uncompressed_size += len(data)
+        return len(data)
+
+    def flush(self):
+        if self._file.closed:
+            return
+
+        if self._is_dirty:
+            if self._sync_flush_mode is None:
+                self._file.write(self._compressor.flush())
+                self._compressor = self._compressor_factory()
+                self._is_started = False
+            else:
+                self._file.write(self._compressor.flush(self._sync_flush_mode))
+            self._is_dirty = False
+
+        self._file.flush()
+
+    def close(self):
+        if self.closed:
+            return
+
+        try:
+            if self._is_started:
+                self._file.write(self._compressor.flush())
+        finally:
+            try:
+                self._file.close()
+            finally:
+                super().close()
+
 
 class Retention:
     @staticmethod
-    def retention_count(logs, number):
+    def remove(log):
+        try:
+            os.remove(log)
+        except FileNotFoundError:
+            # The file was listed beforehand, it may have been removed by another program since.
+            pass
+
+    @staticmethod
+    def retention_count(logs, number, stat=os.stat):
         def key_log(log):
-            return (-os.stat(log).st_mtime, log)
+            return (-stat(log).st_mtime, log)
 
-        for log in sorted(logs, key=key_log)[number:]:
-            os.remove(log)
+        removed = sorted(logs, key=key_log)[number:]
+
+        for log in removed:
+            Retention.remove(log)
+
+        return removed
+
+    @staticmethod
+    def retention_size(logs, size, stat=os.stat):
+        def key_log(log):
+            return (-stat(log).st_mtime, log)
+
+        total = 0
+        removed = []
+
+        for log in sorted(logs, key=key_log):
+            total += stat(log).st_size
+            if total > size:
+                removed.append(log)
+
+        for log in removed:
+            Retention.remove(log)
+
+        return removed
 
     @staticmethod
-    def retention_age(logs, seconds):
+    def retention_age(logs, seconds, stat=os.stat):
         t = datetime.datetime.now().timestamp()
-        for log in logs:
-            if os.stat(log).st_mtime <= t - seconds:
-                os.remove(log)
+        removed = [log for log in logs if stat(log).st_mtime <= t - seconds]
+
+        for log in removed:
+            Retention.remove(log)
+
+        return removed
 
 
 class Rotation:
@@ -100,21 +508,53 @@ class Rotation:
     def forward_interval(t, interval):
         return t + interval
 
-    @staticmethod
-    def rotation_size(message, file, size_limit):
-        file.seek(0, 2)
-        return file.tell() + len(message) > size_limit
+    class RotationSize:
+        def __init__(self, size_limit, *, is_shared=False):
+            self.size_limit = size_limit
+            self._is_shared = is_shared
+            self._file = None
+            self._size = 0
+
+        def __call__(self, message, file):
+            # The file may be written by other processes, in which case its size must be retrieved
+            # each time.
+            if self._is_shared or file is not self._file:
+                # The size is only retrieved when the file is (re)opened, it's then updated as
+                # messages are written so that checking the condition doesn't require any syscall.
+                file.flush()
+                self._file = file
+                stream = getattr(file, "buffer", None)
+                if isinstance(stream, CompressedStream):
+                    # The messages are counted before compression, so is the existing content.
+                    self._size = stream.uncompressed_size
+                else:
+                    self._size = os.fstat(file.fileno()).st_size
+
+            size = len(message.encode(file.encoding, file.errors or "strict"))
+
+            if self._size + size > self.size_limit:
+                # The message will be written to a new file, whose size is retrieved next time.
+                self._file = None
+                return True
+
+            self._size += size
+            return False
 
     class RotationTime:
-        def __init__(self, step_forward, time_init=None):
+        def __init__(self, step_forward, time_init=None, *, is_shared=False):
             self._step_forward = step_forward
             self._time_init = time_init
+            self._is_shared = is_shared
+            self._file = None
             self._limit = None
 
         def __call__(self, message, file):
             record_time = message.record["time"]
 
-            if self._limit is None:
+            # The file may be rotated by other processes, in which case the limit is computed again
+            # from the creation time of the file reopened, otherwise it would be rotated twice.
+            if self._limit is None or (self._is_shared and file is not self._file):
+                self._file = file
                 filepath = os.path.realpath(file.name)
                 creation_time = get_ctime(filepath)
                 set_ctime(filepath, creation_time)
@@ -155,13 +595,169 @@ class Rotation:
 
     class RotationGroup:
         def __init__(self, rotations) -> None:
-            self._rotations = rotations
+            self.rotations = rotations
 
         def __call__(self, message, file) -> bool:
-            return any(rotation(message, file) for rotation in self._rotations)
+            return any(rotation(message, file) for rotation in self.rotations)
+
+
+class TimePartition:
+    """Find the time bucket of a record, whose size depends on the resolution of the path."""
+
+    units = ("year", "month", "day", "hour", "minute", "second")
+
+    # The "sub-second" tokens can't be used, a new file would be created for nearly each message.
+    token_units = frozenset(
+        {
+            "YYYY": "year",
+            "YY": "year",
+            "Q": "month",
+            "MMMM": "month",
+            "MMM": "month",
+            "MM": "month",
+            "M": "month",
+            "DDDD": "day",
+            "DDD": "day",
+            "DD": "day",
+            "D": "day",
+            "dddd": "day",
+            "ddd": "day",
+            "d": "day",
+            "E": "day",
+            "HH": "hour",
+            "H": "hour",
+            "hh": "hour",
+            "h": "hour",
+            "A": "hour",
+            "mm": "minute",
+            "m": "minute",
+            "ss": "second",
+            "s": "second",
+            "X": "second",
+            "S": "sub-second",
+            "x": "sub-second",
+        }.items()
+    )
+
+    directive_units = frozenset(
+        {
+            "Y": "year",
+            "y": "year",
+            "G": "year",
+            "C": "year",
+            "m": "month",
+            "b": "month",
+            "B": "month",
+            "h": "month",
+            "d": "day",
+            "e": "day",
+            "j": "day",
+            "a": "day",
+            "A": "day",
+            "w": "day",
+            "u": "day",
+            "U": "day",
+            "W": "day",
+            "V": "day",
+            "D": "day",
+            "F": "day",
+            "x": "day",
+            "H": "hour",
+            "I": "hour",
+            "k": "hour",
+            "l": "hour",
+            "p": "hour",
+            "M": "minute",
+            "R": "minute",
+            "S": "second",
+            "T": "second",
+            "X": "second",
+            "c": "second",
+            "r": "second",
+            "s": "second",
+            "f": "sub-second",
+        }.items()
+    )
+
+    def __init__(self, unit, is_utc):
+        self.unit = unit
+        self.is_utc = is_utc
+
+    def localize(self, time):
+        # The bounds are compared to the wall-clock time, as it is the one formatted in the path.
+        if self.is_utc:
+            time = time.astimezone(datetime.timezone.utc)
+        return time.replace(tzinfo=None)
+
+    def bounds(self, time):
+        unit = self.unit
+
+        if unit is None:
+            return datetime.datetime.min, datetime.datetime.max
+
+        index = self.units.index(unit)
+        fields = ("month", "day", "hour", "minute", "second", "microsecond")[index:]
+        start = time.replace(**{field: 1 if field in ("month", "day") else 0 for field in fields})
+
+        if unit == "year":
+            end = start.replace(year=start.year + 1)
+        elif unit == "month":
+            end = start.replace(year=start.year + start.month // 12, month=start.month % 12 + 1)
+        else:
+            end = start + datetime.timedelta(**{unit + "s": 1})
+
+        return start, end
+
+    @classmethod
+    def from_path(cls, path):
+        specs = [spec for _, name, spec, _ in string.Formatter().parse(path) if name == "time"]
+
+        if not specs:
+            raise ValueError("The 'time_partition' parameter requires a '{time}' field in the path")
+
+        is_utc = any(spec.endswith("!UTC") for spec in specs)
+        resolutions = []
+
+        for spec in specs:
+            for unit in cls._find_units(spec):
+                if unit == "sub-second":
+                    raise ValueError(
+                        "The 'time_partition' parameter requires the '{time}' fields of the path "
+                        "to have a resolution of at most one second, not: '%s'" % spec
+                    )
+                if unit is not None:
+                    resolutions.append(cls.units.index(unit))
+
+        unit = cls.units[max(resolutions)] if resolutions else None
+
+        return cls(unit, is_utc)
+
+    @classmethod
+    def _find_units(cls, spec):
+        if spec.endswith("!UTC"):
+            spec = spec[:-4]
+
+        if not spec:
+            # The default format of the time in file paths.
+            spec = "%Y-%m-%d_%H-%M-%S_%f"
+
+        if "%" in spec:
+            directive_units = dict(cls.directive_units)
+            return [directive_units.get(d) for d in re.findall(r"%[-#_^0]*(.)", spec)]
+
+        token_units = dict(cls.token_units)
+        tokens = (match.group(0) for match in datetime_pattern.finditer(spec))
+        return [token_units.get("S" if t.startswith("S") else t) for t in tokens]
 
 
 class FileSink:
+    # While compressing messages as they're written, the compressed stream is flushed at most once
+    # per interval (in seconds), as flushing too often would deteriorate the compression ratio.
+    _sync_interval = 1.0
+
+    # Number of characters written between two attempts to drop the written pages from the cache.
+    _drop_cache_step = 4 * 1024 * 1024
+
     def __init__(
         self,
         path,
@@ -171,6 +767,18 @@ class FileSink:
         compression=None,
         delay=False,
         watch=False,
+        watch_interval=None,
+        background=False,
+        compression_mode="close",
+        compression_level=None,
+        flush_policy=None,
+        fsync=None,
+        fsync_levelno=None,
+        preallocate=False,
+        drop_cache=False,
+        shared=False,
+        time_partition=False,
+        is_partition=False,
         mode="a",
         buffering=1,
         encoding="utf8",
@@ -180,27 +788,89 @@ class FileSink:
 
         self._kwargs = {**kwargs, "mode": mode, "buffering": buffering, "encoding": self.encoding}
         self._path = str(path)
+        self._shared = self._make_shared_mode(shared, mode, compression_mode, flush_policy)
+        self._time_partition = self._make_time_partition(
+            time_partition, self._path, rotation, self._shared, mode
+        )
 
-        self._glob_patterns = self._make_glob_patterns(self._path)
-        self._rotation_function = self._make_rotation_function(rotation)
+        glob_patterns = self._make_glob_patterns(
+            os.path.abspath(self._path), is_partition=is_partition
+        )
+        self._rotation_function = self._make_rotation_function(rotation, is_shared=self._shared)
         self._retention_function = self._make_retention_function(retention)
-        self._compression_function = self._make_compression_function(compression)
+        compression_level = self._make_compression_level(compression_level, compression)
+        self._stream_compression = self._make_stream_compression(
+            compression, compression_mode, compression_level
+        )
+
+        if self._stream_compression is not None:
+            compression = None
+
+        self._compression_function = self._make_compression_function(
+            compression, compression_level, self._make_parallel_workers(compression_mode)
+        )
+        self._file_index = FileIndex(glob_patterns)
+        self._finalizer = FileFinalizer(
+            self._compression_function,
+            self._retention_function,
+            self._file_index,
+            is_compression_custom=callable(compression),
+            is_retention_custom=callable(retention),
+        )
 
         self._file = None
         self._file_path = None
-
-        self._watch = watch
+        self._last_sync_time = None
+        self._flush_policy = flush_policy
+        self._fsync = fsync
+        self._fsync_levelno = fsync_levelno
+        self._committer = None
+
+        # The bucket is only known once the first message is logged.
+        self._partition_time = None
+        self._partition_start = datetime.datetime.max
+        self._partition_end = datetime.datetime.min
+        self._partition_latest_end = datetime.datetime.min
+        self._partition_latest_path = None
+
+        self._preallocation = self._make_preallocation(preallocate, self._rotation_function)
+        self._preallocation_countdown = 0
+        self._drop_cache = self._make_drop_cache(drop_cache)
+        self._drop_cache_countdown = 0
+        self._is_page_cache_managed = self._preallocation is not None or self._drop_cache
+
+        # The file is replaced by the process rotating it, the other processes must reopen it.
+        self._watch = self._make_watch_mode(watch) or self._shared
+        self._watch_interval = self._make_watch_interval(watch_interval)
+        self._next_watch_time = 0
+        self._watcher = None
         self._file_dev = -1
         self._file_ino = -1
 
+        self._background = self._make_background_mode(background)
+        self._executor = None
+        self._executor_pid = None
+        self._background_condition = threading.Condition()
+        self._background_tasks = set()
+        self._background_errors = []
+        self._pending_files = []
+        self._journal_path = None
+
         if not delay:
             path = self._create_path()
             self._create_dirs(path)
             self._create_file(path)
 
     def write(self, message):
+        if self._time_partition is not None:
+            record_time = message.record["time"]
+            local_time = self._time_partition.localize(record_time)
+            if not self._partition_start <= local_time < self._partition_end:
+                self._switch_partition(record_time, local_time)
+
         if self._file is None:
-            path = self._create_path()
+            # A suspended file is reopened rather than replaced by a new one.
+            path = self._file_path or self._create_path()
             self._create_dirs(path)
             self._create_file(path)
 
@@ -208,51 +878,283 @@ class FileSink:
             self._reopen_if_needed()
 
         if self._rotation_function is not None and self._rotation_function(message, self._file):
-            self._terminate_file(is_rotating=True)
+            if self._shared:
+                self._rotate_shared_file()
+            else:
+                self._terminate_file(is_rotating=True)
+
+        if self._shared:
+            self._write_shared(message)
+        else:
+            self._file.write(message)
+
+        if self._is_page_cache_managed:
+            self._manage_page_cache(message)
+
+        if self._fsync is not None:
+            return self._sync(message)
+
+        if self._flush_policy is not None:
+            if self._flush_policy.written(message):
+                self.flush()
+        elif self._stream_compression is not None:
+            now = time.monotonic()
+            if now - self._last_sync_time >= self._sync_interval:
+                self._file.flush()
+                self._last_sync_time = now
+
+        return None
+
+    def write_batch(self, messages):
+        if (
+            self._rotation_function is not None
+            or self._time_partition is not None
+            or self._flush_policy is not None
+            or self._fsync_levelno is not None
+        ):
+            # The rotation condition, the partition and the flush policies depend on each message.
+            return self._write_each(messages)
+
+        try:
+            # The text is entirely encoded before being written, nothing is written on failure.
+            self.write("".join(messages))
+        except Exception:
+            return self._write_each(messages)
 
-        self._file.write(message)
+        return []
+
+    def flush(self):
+        if self._flush_policy is not None:
+            self._flush_policy.flushed()
+        if self._file is not None:
+            self._file.flush()
 
     def stop(self):
         if self._watch:
-            self._reopen_if_needed()
+            self._reopen_if_needed(force=True)
+
+        try:
+            if not self._shared:
+                self._terminate_file(is_rotating=False)
+            elif self._file is not None:
+                # Other processes may still be writing to the file, it's not finalized.
+                self._close_file()
+        finally:
+            self._stop_committer()
+            self._stop_background()
+
+        error = self._pop_background_error()
+
+        if error is not None:
+            raise error
+
+    def suspend(self):
+        """Close the file, which is reopened by the next write instead of creating a new one."""
+        if self._file is None:
+            return
+
+        path = self._file_path
 
-        self._terminate_file(is_rotating=False)
+        try:
+            self._close_file()
+        finally:
+            self._file_path = path
+            self._stop_committer()
 
     def tasks_to_complete(self):
+        # Background tasks are not related to the event loop, they are waited synchronously.
+        self._wait_background_tasks()
         return []
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_executor"] = None
+        state["_executor_pid"] = None
+        state["_background_condition"] = None
+        state["_background_tasks"] = None
+        state["_committer"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._background_condition = threading.Condition()
+        self._background_tasks = set()
+
+    def _write_each(self, messages):
+        errors = []
+        for message in messages:
+            try:
+                self.write(message)
+            except Exception as e:
+                errors.append((message, e))
+        return errors
+
     def _create_path(self):
-        path = self._path.format_map({"time": FileDateFormatter()})
-        return os.path.abspath(path)
+        path = self._path.format_map({"time": FileDateFormatter(self._partition_time)})
+        path = os.path.abspath(path)
+
+        if self._stream_compression is not None:
+            path += self._stream_compression[0]
+
+        return path
 
     def _create_dirs(self, path):
         dirname = os.path.dirname(path)
         os.makedirs(dirname, exist_ok=True)
 
     def _create_file(self, path):
-        self._file = open(path, **self._kwargs)
+        if self._stream_compression is None:
+            self._file = open(path, **self._kwargs)
+        else:
+            self._file = self._open_compressed_file(path)
+            self._last_sync_time = time.monotonic()
+
         self._file_path = path
 
+        if self._journal_path is None and self._background and self._compression_function:
+            self._recover_pending_files(path)
+
         if self._watch:
             fileno = self._file.fileno()
             result = os.fstat(fileno)
             self._file_dev = result[ST_DEV]
             self._file_ino = result[ST_INO]
 
+            if self._watch == "inotify":
+                self._watcher = FileWatcher(path)
+
+        if self._fsync:
+            self._get_committer().attach(self._file.fileno())
+
+        if self._preallocation is not None:
+            try:
+                self._preallocate()
+            except BaseException:
+                self._close_file()
+                raise
+
+        self._drop_cache_countdown = self._drop_cache_step
+
     def _close_file(self):
+        if self._watcher is not None:
+            self._watcher.close()
+            self._watcher = None
+
         self._file.flush()
+
+        if self._preallocation is not None:
+            # The blocks allocated beyond the end of the file are released.
+            fileno = self._file.fileno()
+            os.ftruncate(fileno, os.fstat(fileno).st_size)
+
+        if self._drop_cache:
+            page_cache.drop_cache(self._file.fileno(), 0, 0)
+
+        error = None
+
+        if self._fsync:
+            committer = self._committer
+            if committer is not None and committer.pid == os.getpid():
+                error = committer.detach()
+            else:
+                os.fsync(self._file.fileno())
+
         self._file.close()
 
+        if self._flush_policy is not None:
+            self._flush_policy.flushed()
+
         self._file = None
         self._file_path = None
         self._file_dev = -1
         self._file_ino = -1
 
-    def _reopen_if_needed(self):
+        if error is not None:
+            raise error
+
+    def _sync(self, message):
+        self._file.flush()
+
+        if not self._fsync:
+            os.fsync(self._file.fileno())
+            return None
+
+        committer = self._get_committer()
+        sequence = committer.register()
+
+        if self._fsync_levelno is not None and message.record["level"].no >= self._fsync_levelno:
+            error = committer.commit()
+            if error is not None:
+                raise error
+            return None
+
+        # The caller waits for the commit once the handler lock is released, so that other
+        # messages can be written in the meantime and committed at once.
+        return partial(committer.wait, sequence)
+
+    def _manage_page_cache(self, message):
+        if self._preallocation is not None:
+            self._preallocation_countdown -= len(message)
+            if self._preallocation_countdown <= 0:
+                self._preallocate()
+
+        if self._drop_cache:
+            self._drop_cache_countdown -= len(message)
+            if self._drop_cache_countdown <= 0:
+                self._file.flush()
+                page_cache.drop_cache(self._file.fileno(), 0, 0)
+                self._drop_cache_countdown = self._drop_cache_step
+
+    def _preallocate(self):
+        fileno = self._file.fileno()
+        offset = os.fstat(fileno).st_size
+
+        try:
+            page_cache.fallocate(fileno, offset, self._preallocation)
+        except OSError as e:
+            if e.errno != errno.EOPNOTSUPP:
+                raise
+            # The file system doesn't support preallocation, it's not worth trying again.
+            self._preallocation = None
+            self._is_page_cache_managed = self._drop_cache
+            return
+
+        # Characters are counted instead of bytes, the next chunk is allocated before it's needed.
+        self._preallocation_countdown = self._preallocation // 2
+
+    def _get_committer(self):
+        # The thread doesn't exist in child processes, a new one is started if the sink is used.
+        if self._committer is None or self._committer.pid != os.getpid():
+            self._committer = GroupCommitter(self._fsync)
+            if self._file is not None:
+                self._committer.attach(self._file.fileno())
+        return self._committer
+
+    def _stop_committer(self):
+        committer = self._committer
+        self._committer = None
+        if committer is not None and committer.pid == os.getpid():
+            committer.stop()
+
+    def _reopen_if_needed(self, *, force=False):
         # Implemented based on standard library:
         # https://github.com/python/cpython/blob/cb589d1b/Lib/logging/handlers.py#L486
         if not self._file:
-            return
+            return False
+
+        if not force:
+            watcher = self._watcher
+
+            # The watcher thread only exists in the creating process, children rely on "stat()".
+            if watcher is not None and watcher.pid == os.getpid():
+                if not watcher.changed:
+                    return False
+                watcher.changed = False
+            elif self._watch_interval:
+                now = time.monotonic()
+                if now < self._next_watch_time:
+                    return False
+                self._next_watch_time = now + self._watch_interval
 
         filepath = self._file_path
 
@@ -262,12 +1164,47 @@ class FileSink:
             result = None
 
         if not result or result[ST_DEV] != self._file_dev or result[ST_INO] != self._file_ino:
+            # The file was possibly rotated by another process, the index is outdated.
+            self._file_index.invalidate()
             self._close_file()
             self._create_dirs(filepath)
             self._create_file(filepath)
+            return True
+
+        return False
+
+    def _write_shared(self, message):
+        # Each message is appended at once, so that it's not interleaved with the messages of other
+        # processes. The file object is only used to configure the encoding.
+        data = message.encode(self.encoding, self._kwargs.get("errors") or "strict")
+        fileno = self._file.fileno()
+
+        while data:
+            written = os.write(fileno, data)
+            data = data[written:]
+
+    def _rotate_shared_file(self):
+        lock_path = self._make_lock_path(self._file_path)
+
+        with open(lock_path, "a") as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+
+            # The file may have been rotated by another process while waiting for the lock, in
+            # which case the new file is simply reopened. Otherwise, the rotation condition was
+            # checked against the current file (time-based conditions use its creation time).
+            if not self._reopen_if_needed(force=True):
+                self._terminate_file(is_rotating=True)
 
     def _terminate_file(self, *, is_rotating=False):
         old_path = self._file_path
+        new_path = previous_path = None
+
+        if self._time_partition is not None:
+            # The current file may be the one of a late record, which must not be finalized.
+            old_path = self._partition_latest_path
+
+        # The errors of the previous background tasks are reported once the rotation is done.
+        error = self._pop_background_error() if is_rotating else None
 
         if self._file is not None:
             self._close_file()
@@ -278,78 +1215,467 @@ class FileSink:
 
             if new_path == old_path:
                 creation_time = get_ctime(old_path)
-                root, ext = os.path.splitext(old_path)
+                root, ext = self._split_extension(old_path)
                 renamed_path = generate_rename_path(root, ext, creation_time)
                 os.rename(old_path, renamed_path)
-                old_path = renamed_path
+                previous_path, old_path = old_path, renamed_path
 
         if is_rotating or self._rotation_function is None:
-            if self._compression_function is not None and old_path is not None:
-                self._compression_function(old_path)
-
-            if self._retention_function is not None:
-                logs = {
-                    file
-                    for pattern in self._glob_patterns
-                    for file in glob.glob(pattern)
-                    if os.path.isfile(file)
-                }
-                self._retention_function(list(logs))
+            self._finalize_file(old_path, previous_path, new_path)
 
         if is_rotating:
             self._create_file(new_path)
             set_ctime(new_path, datetime.datetime.now().timestamp())
 
+        if error is not None:
+            raise error
+
+    def _finalize_file(self, path, previous_path=None, active_path=None):
+        if self._compression_function is not None or self._retention_function is not None:
+            if self._background:
+                # The active file is created before the task runs, it must not be removed.
+                self._submit_background_task(path, previous_path, active_path)
+            else:
+                self._finalizer(path, previous_path)
+
+    def _switch_partition(self, record_time, local_time):
+        self._partition_time = record_time
+        self._partition_start, self._partition_end = self._time_partition.bounds(local_time)
+
+        new_path = self._create_path()
+        old_path = self._file_path
+        # The file possibly created before the first message belongs to the latest bucket.
+        latest_path = self._partition_latest_path or old_path
+
+        # Only the latest bucket is finalized once a more recent one is reached. The buckets of late
+        # records (or repeated by a DST transition) were possibly finalized already, the messages
+        # are appended to their file (a new one if it was compressed) which is left as is.
+        is_latest = self._partition_end > self._partition_latest_end
+
+        if is_latest:
+            self._partition_latest_end = self._partition_end
+            self._partition_latest_path = new_path
+
+        if new_path == old_path:
+            return
+
+        # The files are named after their bucket, there is no need to rename them nor to track
+        # their creation time.
+        error = self._pop_background_error()
+
+        if self._file is not None:
+            self._close_file()
+
+        self._file_path = None
+
+        if is_latest and latest_path is not None and latest_path != new_path:
+            self._finalize_file(latest_path, active_path=new_path)
+
+        self._create_dirs(new_path)
+        self._create_file(new_path)
+
+        if error is not None:
+            raise error
+
+    def _open_compressed_file(self, path):
+        kwargs = self._kwargs
+        mode = kwargs["mode"]
+
+        if mode not in ("a", "w", "x"):
+            raise ValueError(
+                "Invalid mode for the 'stream' compression mode, it should be 'a', 'w' or 'x', "
+                "not: '%s'" % mode
+            )
+
+        _, compressor_factory, sync_flush_mode, decompress_opener = self._stream_compression
+        uncompressed_size = 0
+
+        if mode == "a" and self._rotation_function is not None and os.path.isfile(path):
+            uncompressed_size = CompressedStream.measure(path, decompress_opener)
+
+        file = open(
+            path,
+            mode + "b",
+            closefd=kwargs.get("closefd", True),
+            opener=kwargs.get("opener", None),
+        )
+
+        try:
+            stream = CompressedStream(file, compressor_factory, sync_flush_mode, uncompressed_size)
+        except BaseException:
+            file.close()
+            raise
+
+        return io.TextIOWrapper(
+            stream,
+            encoding=kwargs["encoding"],
+            errors=kwargs.get("errors", None),
+            newline=kwargs.get("newline", None),
+        )
+
+    def _split_extension(self, path):
+        if self._stream_compression is None:
+            return os.path.splitext(path)
+
+        # The compression extension is kept at the end: "file.log.gz" -> "file.X.log.gz".
+        ext = self._stream_compression[0]
+        root, ext_before = os.path.splitext(path[: -len(ext)])
+        return root, ext_before + ext
+
+    def _get_executor(self):
+        if self._executor_pid != os.getpid():
+            # The workers of an executor inherited from the parent process do not exist in the
+            # child, the tasks of the parent must not be awaited either.
+            self._executor = None
+            self._background_condition = threading.Condition()
+            self._background_tasks = set()
+
+        if self._executor is None:
+            if self._background == "process":
+                # The handler's lock is held at rotation, so the worker process can't be forked
+                # (the lock would be acquired again by the handlers registered with "at_fork").
+                context = multiprocessing.get_context("spawn")
+                self._executor = concurrent.futures.ProcessPoolExecutor(1, mp_context=context)
+            else:
+                self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+            self._executor_pid = os.getpid()
+
+        return self._executor
+
+    def _submit_background_task(self, path, previous_path=None, active_path=None):
+        executor = self._get_executor()
+
+        with self._background_condition:
+            if path is not None and self._compression_function is not None:
+                self._pending_files.append(path)
+                self._write_journal()
+
+            future = executor.submit(self._finalizer, path, previous_path, active_path)
+            self._background_tasks.add(future)
+
+        future.add_done_callback(partial(self._on_background_task_done, path))
+
+    def _on_background_task_done(self, path, future):
+        with self._background_condition:
+            self._background_tasks.discard(future)
+
+            exception = future.exception()
+
+            if exception is not None:
+                # The file is left in the journal so that its compression is retried on startup.
+                self._background_errors.append(exception)
+            elif path in self._pending_files:
+                self._pending_files.remove(path)
+                self._write_journal()
+
+            self._background_condition.notify_all()
+
+    def _wait_background_tasks(self):
+        if self._executor is None or self._executor_pid != os.getpid():
+            return
+
+        with self._background_condition:
+            self._background_condition.wait_for(lambda: not self._background_tasks)
+
+    def _stop_background(self):
+        self._wait_background_tasks()
+
+        if self._executor is not None and self._executor_pid == os.getpid():
+            self._executor.shutdown(wait=True)
+
+        self._executor = None
+        self._executor_pid = None
+
+    def _pop_background_error(self):
+        with self._background_condition:
+            if not self._background_errors:
+                return None
+            error = self._background_errors[0]
+            self._background_errors.clear()
+            return error
+
+    def _recover_pending_files(self, path):
+        # The journal lists the rotated files whose compression has not completed yet, possibly
+        # because the previous program was interrupted. They are compressed again at startup.
+        self._journal_path = self._make_journal_path(self._path, path)
+
+        try:
+            with open(self._journal_path, encoding="utf8") as file:
+                pending_files = file.read().splitlines()
+        except FileNotFoundError:
+            return
+
+        with self._background_condition:
+            self._pending_files = []
+            self._write_journal()
+
+        for pending_file in pending_files:
+            if pending_file != path and os.path.isfile(pending_file):
+                self._submit_background_task(pending_file, active_path=path)
+
+    def _write_journal(self):
+        if self._journal_path is None:
+            return
+
+        if not self._pending_files:
+            try:
+                os.remove(self._journal_path)
+            except FileNotFoundError:
+                pass
+            return
+
+        with open(self._journal_path, "w", encoding="utf8") as file:
+            file.write("".join(path + "\n" for path in self._pending_files))
+
+    @staticmethod
+    def _make_journal_path(path_template, path):
+        formatter = string.Formatter()
+        basename = "".join(text for text, *_ in formatter.parse(os.path.basename(path_template)))
+        return os.path.join(os.path.dirname(path), ".{}.pending".format(basename))
+
+    @staticmethod
+    def _make_lock_path(path):
+        dirname, basename = os.path.split(path)
+        return os.path.join(dirname, ".{}.lock".format(basename))
+
     @staticmethod
-    def _make_glob_patterns(path):
+    def _make_shared_mode(shared, mode, compression_mode, flush_policy):
+        if not isinstance(shared, bool):
+            raise TypeError(
+                "Invalid shared, it should be a boolean, not: '%s'" % type(shared).__name__
+            )
+        if not shared:
+            return False
+        if fcntl is None:
+            raise ValueError("The 'shared' parameter is only available on Unix")
+        if mode != "a":
+            raise ValueError("The 'shared' parameter requires the 'a' mode, not: '%s'" % mode)
+        if compression_mode == "stream":
+            raise ValueError(
+                "The 'shared' parameter is not supported with the 'stream' compression mode"
+            )
+        if flush_policy is not None:
+            raise ValueError("The 'shared' parameter is not supported with the 'flush' parameter")
+        return True
+
+    @staticmethod
+    def _make_time_partition(time_partition, path, rotation, shared, mode):
+        if not isinstance(time_partition, bool):
+            raise TypeError(
+                "Invalid time_partition, it should be a boolean, not: '%s'"
+                % type(time_partition).__name__
+            )
+        if not time_partition:
+            return None
+        if rotation is not None:
+            raise ValueError(
+                "The 'time_partition' and 'rotation' parameters can't be used together"
+            )
+        if shared:
+            raise ValueError(
+                "The 'time_partition' parameter is not supported with the 'shared' parameter"
+            )
+        if mode != "a":
+            raise ValueError(
+                "The 'time_partition' parameter requires the 'a' mode, not: '%s'" % mode
+            )
+        return TimePartition.from_path(path)
+
+    @staticmethod
+    def _make_watch_mode(watch):
+        if isinstance(watch, bool):
+            return watch
+        if isinstance(watch, str):
+            if watch != "inotify":
+                raise ValueError(
+                    "Invalid watch mode, it should be a boolean or 'inotify', not: '%s'" % watch
+                )
+            if inotify_functions is None:
+                raise ValueError("The 'inotify' watch mode is only available on Linux")
+            return watch
+        raise TypeError("Cannot infer watch mode for objects of type: '%s'" % type(watch).__name__)
+
+    @staticmethod
+    def _make_watch_interval(watch_interval):
+        if watch_interval is None:
+            return 0
+        if isinstance(watch_interval, str):
+            interval = string_parsers.parse_duration(watch_interval)
+            if interval is None:
+                raise ValueError("Cannot parse watch interval from: '%s'" % watch_interval)
+            return FileSink._make_watch_interval(interval)
+        if isinstance(watch_interval, datetime.timedelta):
+            return watch_interval.total_seconds()
+        if isinstance(watch_interval, numbers.Real) and not isinstance(watch_interval, bool):
+            if watch_interval < 0:
+                raise ValueError("The watch interval can't be negative, not: '%s'" % watch_interval)
+            return watch_interval
+        raise TypeError(
+            "Cannot infer watch interval for objects of type: '%s'" % type(watch_interval).__name__
+        )
+
+    @staticmethod
+    def _make_preallocation(preallocate, rotation_function):
+        if preallocate is False:
+            return None
+
+        if preallocate is True:
+            size = FileSink._find_size_limit(rotation_function)
+            if size is None:
+                raise ValueError(
+                    "The 'preallocate' parameter requires a size-based 'rotation' if it's 'True'"
+                )
+        elif isinstance(preallocate, str):
+            size = string_parsers.parse_size(preallocate)
+            if size is None:
+                raise ValueError("Cannot parse preallocation size from: '%s'" % preallocate)
+        elif isinstance(preallocate, (numbers.Real, decimal.Decimal)):
+            size = preallocate
+        else:
+            raise TypeError(
+                "Cannot infer preallocation for objects of type: '%s'" % type(preallocate).__name__
+            )
+
+        if size < 1:
+            raise ValueError("The preallocation size must be positive, not: '%s'" % preallocate)
+
+        if page_cache.fallocate is None:
+            raise ValueError("The 'preallocate' parameter is only available on Linux")
+
+        return int(size)
+
+    @staticmethod
+    def _find_size_limit(rotation_function):
+        if isinstance(rotation_function, Rotation.RotationSize):
+            return rotation_function.size_limit
+        if isinstance(rotation_function, Rotation.RotationGroup):
+            sizes = map(FileSink._find_size_limit, rotation_function.rotations)
+            sizes = [size for size in sizes if size is not None]
+            return min(sizes) if sizes else None
+        return None
+
+    @staticmethod
+    def _make_fsync(fsync):
+        # The level is returned by name, it's resolved by the logger which knows the custom levels.
+        if fsync is True:
+            return 0, None
+        if fsync is False:
+            return None, None
+        if not isinstance(fsync, str):
+            raise TypeError(
+                "Invalid fsync, it should be a boolean or a string, not: '%s'"
+                % type(fsync).__name__
+            )
+
+        interval = level = None
+
+        for option in fsync.split(","):
+            key, _, value = option.strip().partition(":")
+            if key == "group" and value and interval is None:
+                duration = string_parsers.parse_duration(value)
+                if duration is None or duration.total_seconds() <= 0:
+                    raise ValueError("Invalid fsync interval: '%s'" % value)
+                interval = duration.total_seconds()
+            elif key == "level" and value and level is None:
+                level = value
+            else:
+                interval = None
+                break
+
+        if interval is None:
+            raise ValueError(
+                "Invalid fsync, it should be a boolean or 'group:DURATION' optionally combined "
+                "with 'level:LEVEL', not: '%s'" % fsync
+            )
+
+        return interval, level
+
+    @staticmethod
+    def _make_drop_cache(drop_cache):
+        if not isinstance(drop_cache, bool):
+            raise TypeError(
+                "Invalid drop_cache, it should be a boolean, not: '%s'" % type(drop_cache).__name__
+            )
+        if drop_cache and page_cache.drop_cache is None:
+            raise ValueError("The 'drop_cache' parameter is not available on this platform")
+        return drop_cache
+
+    @staticmethod
+    def _make_background_mode(background):
+        if isinstance(background, bool):
+            return "thread" if background else None
+        if isinstance(background, str):
+            if background not in ("thread", "process"):
+                raise ValueError(
+                    "Invalid background mode, it should be a boolean, 'thread' or 'process', "
+                    "not: '%s'" % background
+                )
+            if background == "process" and sys.version_info < (3, 7):
+                raise ValueError("The 'process' background mode requires Python 3.7 or later")
+            return background
+        raise TypeError(
+            "Cannot infer background mode for objects of type: '%s'" % type(background).__name__
+        )
+
+    @staticmethod
+    def _make_glob_patterns(path, *, is_partition=False):
         formatter = string.Formatter()
         tokens = formatter.parse(path)
         escaped = "".join(glob.escape(text) + "*" * (name is not None) for text, name, *_ in tokens)
 
         root, ext = os.path.splitext(escaped)
 
+        if is_partition:
+            # The files of other partitions are in the same directory, "a.*.log" would match the
+            # files of the "a.b" partition. The wildcard is anchored to the date of renamed files.
+            date = "[0-9]" * 4 + "-" + "[0-9]" * 2 + "-" + "[0-9]" * 2 + "_*"
+            if not ext:
+                return [escaped, escaped + "." + date]
+            rotated = root + "." + date + ext
+            return [escaped, escaped + ".*", rotated, rotated + ".*"]
+
         if not ext:
             return [escaped, escaped + ".*"]
 
         return [escaped, escaped + ".*", root + ".*" + ext, root + ".*" + ext + ".*"]
 
     @staticmethod
-    def _make_rotation_function(rotation):
+    def _make_rotation_function(rotation, *, is_shared=False):
         if rotation is None:
             return None
         if isinstance(rotation, (list, tuple, set)):
             if len(rotation) == 0:
                 raise ValueError("Must provide at least one rotation condition")
             return Rotation.RotationGroup(
-                [FileSink._make_rotation_function(rot) for rot in rotation]
+                [FileSink._make_rotation_function(rot, is_shared=is_shared) for rot in rotation]
             )
         if isinstance(rotation, str):
             size = string_parsers.parse_size(rotation)
             if size is not None:
-                return FileSink._make_rotation_function(size)
+                return FileSink._make_rotation_function(size, is_shared=is_shared)
             interval = string_parsers.parse_duration(rotation)
             if interval is not None:
-                return FileSink._make_rotation_function(interval)
+                return FileSink._make_rotation_function(interval, is_shared=is_shared)
             frequency = string_parsers.parse_frequency(rotation)
             if frequency is not None:
-                return Rotation.RotationTime(frequency)
+                return Rotation.RotationTime(frequency, is_shared=is_shared)
             daytime = string_parsers.parse_daytime(rotation)
             if daytime is not None:
                 day, time = daytime
                 if day is None:
-                    return FileSink._make_rotation_function(time)
+                    return FileSink._make_rotation_function(time, is_shared=is_shared)
                 if time is None:
                     time = datetime.time(0, 0, 0)
                 step_forward = partial(Rotation.forward_weekday, weekday=day)
-                return Rotation.RotationTime(step_forward, time)
+                return Rotation.RotationTime(step_forward, time, is_shared=is_shared)
             raise ValueError("Cannot parse rotation from: '%s'" % rotation)
         if isinstance(rotation, (numbers.Real, decimal.Decimal)):
-            return partial(Rotation.rotation_size, size_limit=rotation)
+            return Rotation.RotationSize(rotation, is_shared=is_shared)
         if isinstance(rotation, datetime.time):
-            return Rotation.RotationTime(Rotation.forward_day, rotation)
+            return Rotation.RotationTime(Rotation.forward_day, rotation, is_shared=is_shared)
         if isinstance(rotation, datetime.timedelta):
             step_forward = partial(Rotation.forward_interval, interval=rotation)
-            return Rotation.RotationTime(step_forward)
+            return Rotation.RotationTime(step_forward, is_shared=is_shared)
         if callable(rotation):
             return rotation
         raise TypeError("Cannot infer rotation for objects of type: '%s'" % type(rotation).__name__)
@@ -359,6 +1685,9 @@ class FileSink:
         if retention is None:
             return None
         if isinstance(retention, str):
+            size = string_parsers.parse_size(retention)
+            if size is not None:
+                return partial(Retention.retention_size, size=size)
             interval = string_parsers.parse_duration(retention)
             if interval is None:
                 raise ValueError("Cannot parse retention from: '%s'" % retention)
@@ -374,33 +1703,141 @@ class FileSink:
         )
 
     @staticmethod
-    def _make_compression_function(compression):
+    def _make_compression_level(compression_level, compression):
+        if compression_level is None:
+            return None
+        if not isinstance(compression_level, int) or isinstance(compression_level, bool):
+            raise TypeError(
+                "Invalid compression_level, it should be an integer, not: '%s'"
+                % type(compression_level).__name__
+            )
+
+        ext = compression.strip().lstrip(".") if isinstance(compression, str) else None
+
+        if ext in ("bz2", "tar.bz2"):
+            minimum = 1
+        elif ext in ("gz", "xz", "lzma", "tar.gz", "tar.xz"):
+            minimum = 0
+        else:
+            raise ValueError(
+                "The 'compression_level' parameter requires one of the 'gz', 'bz2', 'xz', 'lzma', "
+                "'tar.gz', 'tar.bz2' or 'tar.xz' compression formats, not: '%s'" % (compression,)
+            )
+
+        if not minimum <= compression_level <= 9:
+            raise ValueError(
+                "Invalid compression_level, it should be between %d and 9 for the '%s' format, "
+                "not: %d" % (minimum, ext, compression_level)
+            )
+
+        return compression_level
+
+    @staticmethod
+    def _make_parallel_workers(compression_mode):
+        name, _, workers = compression_mode.partition(":")
+
+        if name != "parallel":
+            return None
+        if not workers:
+            return os.cpu_count() or 1
+        if not workers.isdigit() or int(workers) < 1:
+            raise ValueError(
+                "Invalid compression mode, the number of parallel workers should be a positive "
+                "integer, not: '%s'" % workers
+            )
+
+        return int(workers)
+
+    @staticmethod
+    def _make_stream_compression(compression, compression_mode, compression_level=None):
+        if not isinstance(compression_mode, str):
+            raise TypeError(
+                "Invalid compression mode, it should be a string, not: '%s'"
+                % type(compression_mode).__name__
+            )
+        if compression_mode == "close" or compression_mode.partition(":")[0] == "parallel":
+            return None
+        if compression_mode != "stream":
+            raise ValueError(
+                "Invalid compression mode, it should be 'close', 'stream' or 'parallel', not: '%s'"
+                % compression_mode
+            )
+
+        ext = compression.strip().lstrip(".") if isinstance(compression, str) else None
+        level = 9 if compression_level is None else compression_level
+
+        if ext == "gz":
+            import gzip
+            import zlib
+
+            # The "wbits" value makes "zlib" write the gzip header and trailer.
+            factory = partial(zlib.compressobj, level, zlib.DEFLATED, 31)
+            return (".gz", factory, zlib.Z_SYNC_FLUSH, gzip.open)
+        if ext == "bz2":
+            import bz2
+
+            return (".bz2", partial(bz2.BZ2Compressor, level), None, bz2.open)
+        if ext == "xz":
+            import lzma
+
+            factory = partial(lzma.LZMACompressor, format=lzma.FORMAT_XZ, preset=compression_level)
+            return (".xz", factory, None, lzma.open)
+
+        raise ValueError(
+            "The 'stream' compression mode requires one of the 'gz', 'bz2' or 'xz' compression "
+            "formats, not: '%s'" % (compression,)
+        )
+
+    @staticmethod
+    def _make_compression_function(compression, compression_level=None, parallel_workers=None):
         if compression is None:
+            if parallel_workers is not None:
+                raise ValueError(
+                    "The 'parallel' compression mode requires one of the 'gz', 'bz2' or 'xz' "
+                    "compression formats, not: None"
+                )
             return None
         if isinstance(compression, str):
             ext = compression.strip().lstrip(".")
 
-            if ext == "gz":
+            if compression_level is None:
+                level = {}
+            elif ext in ("xz", "lzma", "tar.xz"):
+                level = {"preset": compression_level}
+            else:
+                level = {"compresslevel": compression_level}
+
+            if parallel_workers is not None:
+                compress = FileSink._make_parallel_compression(ext, level, parallel_workers)
+            elif ext == "gz":
                 import gzip
 
-                compress = partial(Compression.copy_compress, opener=gzip.open, mode="wb")
+                compress = partial(Compression.copy_compress, opener=gzip.open, mode="wb", **level)
             elif ext == "bz2":
                 import bz2
 
-                compress = partial(Compression.copy_compress, opener=bz2.open, mode="wb")
+                compress = partial(Compression.copy_compress, opener=bz2.open, mode="wb", **level)
 
             elif ext == "xz":
                 import lzma
 
                 compress = partial(
-                    Compression.copy_compress, opener=lzma.open, mode="wb", format=lzma.FORMAT_XZ
+                    Compression.copy_compress,
+                    opener=lzma.open,
+                    mode="wb",
+                    format=lzma.FORMAT_XZ,
+                    **level,
                 )
 
             elif ext == "lzma":
                 import lzma
 
                 compress = partial(
-                    Compression.copy_compress, opener=lzma.open, mode="wb", format=lzma.FORMAT_ALONE
+                    Compression.copy_compress,
+                    opener=lzma.open,
+                    mode="wb",
+                    format=lzma.FORMAT_ALONE,
+                    **level,
                 )
             elif ext == "tar":
                 import tarfile
@@ -410,18 +1847,24 @@ class FileSink:
                 import gzip
                 import tarfile
 
-                compress = partial(Compression.add_compress, opener=tarfile.open, mode="w:gz")
+                compress = partial(
+                    Compression.add_compress, opener=tarfile.open, mode="w:gz", **level
+                )
             elif ext == "tar.bz2":
                 import bz2
                 import tarfile
 
-                compress = partial(Compression.add_compress, opener=tarfile.open, mode="w:bz2")
+                compress = partial(
+                    Compression.add_compress, opener=tarfile.open, mode="w:bz2", **level
+                )
 
             elif ext == "tar.xz":
                 import lzma
                 import tarfile
 
-                compress = partial(Compression.add_compress, opener=tarfile.open, mode="w:xz")
+                compress = partial(
+                    Compression.add_compress, opener=tarfile.open, mode="w:xz", **level
+                )
             elif ext == "zip":
                 import zipfile
 
@@ -436,7 +1879,206 @@ class FileSink:
 
             return partial(Compression.compression, ext="." + ext, compress_function=compress)
         if callable(compression):
+            if parallel_workers is not None:
+                raise ValueError(
+                    "The 'parallel' compression mode requires one of the 'gz', 'bz2' or 'xz' "
+                    "compression formats, not a custom function"
+                )
             return compression
         raise TypeError(
             "Cannot infer compression for objects of type: '%s'" % type(compression).__name__
         )
+
+    @staticmethod
+    def _make_parallel_compression(ext, level, workers):
+        if ext == "gz":
+            import gzip
+
+            compress = partial(gzip.compress, **level)
+        elif ext == "bz2":
+            import bz2
+
+            compress = partial(bz2.compress, **level)
+        elif ext == "xz":
+            import lzma
+
+            compress = partial(lzma.compress, format=lzma.FORMAT_XZ, **level)
+        else:
+            raise ValueError(
+                "The 'parallel' compression mode requires one of the 'gz', 'bz2' or 'xz' "
+                "compression formats, not: '%s'" % ext
+            )
+
+        return partial(
+            Compression.parallel_compress,
+            compress=compress,
+            block_size=dict(Compression.parallel_block_sizes)[ext],
+            workers=workers,
+        )
+
+
+class PartitionedFileSink:
+    """Route each message to the file sink of the partition its record fields belong to.
+
+    The partitions are created on demand and share the same options, including the rotation and
+    the retention which are applied to each of them independently. At most ``max_open_files`` of
+    them keep their file open, the least recently used one is suspended when another partition
+    needs to be written.
+    """
+
+    def __init__(
+        self,
+        path,
+        *,
+        max_open_files=128,
+        delay=False,
+        flush_policy=None,
+        mode="a",
+        encoding="utf8",
+        **kwargs
+    ):
+        self.encoding = encoding
+
+        if mode != "a":
+            # Files of evicted partitions are reopened and must not be truncated.
+            raise ValueError("A partitioned file sink only supports the 'a' mode, not: '%s'" % mode)
+
+        self._path = str(path)
+        self._max_open_files = self._make_max_open_files(max_open_files)
+        self._tokens = list(string.Formatter().parse(self._path))
+
+        names = [name for _, name, _, _ in self._tokens if self.is_partition_field(name)]
+        placeholders = [
+            self._make_placeholder(name, spec, conversion)
+            for _, name, spec, conversion in self._tokens
+            if self.is_partition_field(name)
+        ]
+
+        self.fields = frozenset(self._get_root_field(name) for name in names)
+
+        # All the fields are formatted at once, the resulting string identifies the partition.
+        self._key_template = "\0".join(placeholders)
+        self._key_size = len(placeholders)
+
+        self._flush_policy = flush_policy
+        self._kwargs = {**kwargs, "mode": mode, "encoding": encoding}
+        self._sinks = {}
+        self._open_sinks = collections.OrderedDict()
+
+        # The options are checked once, the partitions are not known before messages are logged.
+        FileSink(self._path, delay=True, flush_policy=flush_policy, **self._kwargs)
+
+    def write(self, message):
+        key = self._key_template.format_map(message.record)
+        open_sinks = self._open_sinks
+        sink = open_sinks.get(key)
+
+        if sink is not None:
+            open_sinks.move_to_end(key)
+        else:
+            sink = self._sinks.get(key)
+            if sink is None:
+                sink = self._sinks[key] = self._create_sink(key)
+            open_sinks[key] = sink
+            if len(open_sinks) > self._max_open_files:
+                _, evicted = open_sinks.popitem(last=False)
+                evicted.suspend()
+
+        return sink.write(message)
+
+    def flush(self):
+        for sink in self._open_sinks.values():
+            sink.flush()
+
+    def stop(self):
+        error = None
+
+        for sink in self._sinks.values():
+            try:
+                sink.stop()
+            except Exception as e:
+                if error is None:
+                    error = e
+
+        self._open_sinks.clear()
+
+        if error is not None:
+            raise error
+
+    def tasks_to_complete(self):
+        for sink in self._sinks.values():
+            sink.tasks_to_complete()
+        return []
+
+    @staticmethod
+    def is_partitioned(path):
+        tokens = string.Formatter().parse(str(path))
+        return any(PartitionedFileSink.is_partition_field(name) for _, name, _, _ in tokens)
+
+    @staticmethod
+    def is_partition_field(name):
+        return name is not None and PartitionedFileSink._get_root_field(name) != "time"
+
+    @staticmethod
+    def _get_root_field(name):
+        return re.match(r"[^.\[]*", name).group()
+
+    @staticmethod
+    def _make_placeholder(name, spec, conversion):
+        placeholder = name
+        if conversion:
+            placeholder += "!" + conversion
+        if spec:
+            placeholder += ":" + spec
+        return "{" + placeholder + "}"
+
+    @staticmethod
+    def _make_path_component(value):
+        # The values come from the records, they must not be able to escape the partition directory.
+        for sep in (os.sep, os.altsep, "\0"):
+            if sep:
+                value = value.replace(sep, "_")
+        if not value.strip("."):
+            value = "_" + value
+        return value.replace("{", "{{").replace("}", "}}")
+
+    @staticmethod
+    def _make_max_open_files(max_open_files):
+        if not isinstance(max_open_files, int) or isinstance(max_open_files, bool):
+            raise TypeError(
+                "Invalid max_open_files, it should be an integer, not: '%s'"
+                % type(max_open_files).__name__
+            )
+        if max_open_files < 1:
+            raise ValueError(
+                "Invalid max_open_files, it should be a positive integer, not: %d" % max_open_files
+            )
+        return max_open_files
+
+    def _create_sink(self, key):
+        values = iter(key.split("\0", self._key_size - 1))
+        parts = []
+
+        for text, name, spec, conversion in self._tokens:
+            parts.append(text.replace("{", "{{").replace("}", "}}"))
+            if name is None:
+                continue
+            if self.is_partition_field(name):
+                parts.append(self._make_path_component(next(values)))
+            else:
+                parts.append(self._make_placeholder(name, spec, conversion))
+
+        flush_policy = self._flush_policy
+
+        if flush_policy is not None:
+            flush_policy = FlushPolicy(
+                interval=flush_policy.interval, size=flush_policy.size, levelno=flush_policy.levelno
+            )
+
+        return FileSink(
+            "".join(parts),
+            delay=True,
+            flush_policy=flush_policy,
+            is_partition=True,
+            **self._kwargs,
+        )
@@ -1,23 +1,24 @@
-def filter_none(record):
-    return record["name"] is not None
+# These filters only depend on the name and the severity of the records, the handlers accepting a
+# given pair are resolved once and cached by the core.
 
 
-def filter_by_name(record, parent, length):
-    name = record["name"]
+def filter_none(name, levelno):
+    return name is not None
+
+
+def filter_by_name(name, levelno, parent, length):
     if name is None:
         return False
     return (name + ".")[:length] == parent
 
 
-def filter_by_level(record, level_per_module):
-    name = record["name"]
-
+def filter_by_level(name, levelno, thresholds):
+    # The threshold of the closest configured parent applies, disabled modules having an infinite
+    # one. The result is cached by the core for each name, there is no need to memoize it here.
     while True:
-        level = level_per_module.get(name, None)
-        if level is False:
-            return False
-        if level is not None:
-            return record["level"].no >= level
+        threshold = thresholds.get(name, None)
+        if threshold is not None:
+            return levelno >= threshold
         if not name:
             return True
         index = name.rfind(".")
@@ -0,0 +1,47 @@
+import io
+import time
+
+
+class FlushPolicy:
+    """Keep track of the messages written to a sink since it was last flushed."""
+
+    def __init__(self, *, interval=None, size=None, levelno=None):
+        self.interval = interval
+        self.size = size
+        self.levelno = levelno
+        self._pending_size = 0
+        self._deadline = None
+
+    @property
+    def buffering(self):
+        # The buffer of the file must not be flushed before the policy requires it.
+        if self.size is None:
+            return -1
+        return max(int(self.size), io.DEFAULT_BUFFER_SIZE)
+
+    @property
+    def is_pending(self):
+        return self._pending_size > 0
+
+    def written(self, message):
+        """Account for the written message, return whether the sink should now be flushed."""
+        self._pending_size += len(message)
+
+        if self.levelno is not None and message.record["level"].no >= self.levelno:
+            return True
+
+        if self.size is not None and self._pending_size >= self.size:
+            return True
+
+        if self.interval is not None:
+            now = time.monotonic()
+            if self._deadline is None:
+                self._deadline = now + self.interval
+            elif now >= self._deadline:
+                return True
+
+        return False
+
+    def flushed(self):
+        self._pending_size = 0
+        self._deadline = None
@@ -2,12 +2,16 @@ import functools
 import json
 import multiprocessing
 import os
+import queue
 import threading
+import time
 from contextlib import contextmanager
+from multiprocessing.util import Finalize
 from threading import Thread
 
-from ._colorizer import Colorizer
+from ._colorizer import Colorizer, FormatTemplate, FormattingOverlay
 from ._locks_machinery import create_handler_lock
+from ._ring_buffer import RingBuffer
 
 
 def prepare_colored_format(format_, ansi_level):
@@ -29,6 +33,14 @@ class Message(str):
 
 
 class Handler:
+    # Maximum number of messages written at once by the worker thread if "enqueue=True".
+    _batch_size = 1000
+
+    # Size in bytes of the ring buffer allocated by each process if "enqueue='shared_memory'".
+    _ring_size = 1024 * 1024
+    # Maximum time in seconds a process waits for room in its ring before using the queue instead.
+    _ring_timeout = 1.0
+
     def __init__(
         self,
         *,
@@ -38,6 +50,7 @@ class Handler:
         formatter,
         is_formatter_dynamic,
         filter_,
+        name_filter,
         colorize,
         serialize,
         enqueue,
@@ -45,7 +58,12 @@ class Handler:
         error_interceptor,
         exception_formatter,
         id_,
-        levels_ansi_codes
+        levels_ansi_codes,
+        lazy_fields,
+        queue_size,
+        overflow,
+        overflow_levelno,
+        flush_interval
     ):
         self._name = name
         self._sink = sink
@@ -53,6 +71,7 @@ class Handler:
         self._formatter = formatter
         self._is_formatter_dynamic = is_formatter_dynamic
         self._filter = filter_
+        self._name_filter = name_filter
         self._colorize = colorize
         self._serialize = serialize
         self._enqueue = enqueue
@@ -61,6 +80,11 @@ class Handler:
         self._exception_formatter = exception_formatter
         self._id = id_
         self._levels_ansi_codes = levels_ansi_codes  # Warning, reference shared among handlers
+        self._lazy_fields = lazy_fields
+        self._queue_size = queue_size
+        self._overflow = overflow
+        self._overflow_levelno = overflow_levelno
+        self._flush_interval = flush_interval
 
         self._decolorized_format = None
         self._precolorized_formats = {}
@@ -71,10 +95,19 @@ class Handler:
         self._lock_acquired = threading.local()
         self._queue = None
         self._queue_lock = None
+        self._queue_slots = None
+        self._dropped_count = 0
+        self._dropped_pending = 0
+        self._doorbell = None
+        self._ring_lock = None
+        self._ring = None
+        self._ring_pid = None
         self._confirmation_event = None
         self._confirmation_lock = None
         self._owner_process_pid = None
         self._thread = None
+        self._flusher = None
+        self._flusher_event = None
 
         if self._is_formatter_dynamic:
             if self._colorize:
@@ -86,10 +119,17 @@ class Handler:
                 for level_name in self._levels_ansi_codes:
                     self.update_format(level_name)
             else:
-                self._decolorized_format = self._formatter.strip()
+                self._decolorized_format = FormatTemplate(self._formatter.strip())
 
         if self._enqueue:
-            if self._multiprocessing_context is None:
+            if self._enqueue == "thread":
+                # Messages never leave the current process, they don't need to be pickled.
+                self._queue = (
+                    queue.SimpleQueue() if hasattr(queue, "SimpleQueue") else queue.Queue()
+                )
+                self._confirmation_event = threading.Event()
+                self._confirmation_lock = threading.Lock()
+            elif self._multiprocessing_context is None:
                 self._queue = multiprocessing.SimpleQueue()
                 self._confirmation_event = multiprocessing.Event()
                 self._confirmation_lock = multiprocessing.Lock()
@@ -97,13 +137,34 @@ class Handler:
                 self._queue = self._multiprocessing_context.SimpleQueue()
                 self._confirmation_event = self._multiprocessing_context.Event()
                 self._confirmation_lock = self._multiprocessing_context.Lock()
+            if self._queue_size is not None:
+                if self._enqueue == "thread":
+                    self._queue_slots = threading.BoundedSemaphore(self._queue_size)
+                elif self._multiprocessing_context is None:
+                    self._queue_slots = multiprocessing.BoundedSemaphore(self._queue_size)
+                else:
+                    self._queue_slots = self._multiprocessing_context.BoundedSemaphore(
+                        self._queue_size
+                    )
+            if self._enqueue == "shared_memory":
+                # Messages are written to rings the worker is notified of, the queue is only used
+                # for control messages and for messages too large to fit in the rings.
+                context = self._multiprocessing_context or multiprocessing
+                self._doorbell = context.Semaphore(0)
+                # The lock must be inherited by child processes, it can't be sent with their ring.
+                self._ring_lock = context.Lock()
+                RingBuffer.prepare()
+                target = self._shared_memory_writer
+            else:
+                target = self._queued_writer
             self._queue_lock = create_handler_lock()
             self._owner_process_pid = os.getpid()
-            self._thread = Thread(
-                target=self._queued_writer, daemon=True, name="loggerex-writer-%d" % self._id
-            )
+            self._thread = Thread(target=target, daemon=True, name="loggerex-writer-%d" % self._id)
             self._thread.start()
 
+        if self._flush_interval is not None:
+            self._start_flusher()
+
     def __repr__(self):
         return "(id=%d, level=%d, sink=%s)" % (self._id, self._levelno, self._name)
 
@@ -124,7 +185,13 @@ class Handler:
         finally:
             self._lock_acquired.acquired = False
 
-    def emit(self, record, level_id, from_decorator, is_raw, colored_message):
+    def accepts(self, name, levelno):
+        """Whether the records of this name and severity pass the level and the name filter."""
+        if self._levelno > levelno:
+            return False
+        return self._name_filter is None or self._name_filter(name, levelno)
+
+    def emit(self, record, level_id, from_decorator, is_raw, colored_message, formatting_cache):
         try:
             if self._levelno > record["level"].no:
                 return
@@ -133,105 +200,272 @@ class Handler:
                 if not self._filter(record):
                     return
 
-            if self._is_formatter_dynamic:
-                dynamic_format = self._formatter(record)
-
-            formatter_record = record.copy()
-
-            if not record["exception"]:
-                formatter_record["exception"] = ""
-            else:
-                type_, value, tb = record["exception"]
-                formatter = self._exception_formatter
-                lines = formatter.format_exception(type_, value, tb, from_decorator=from_decorator)
-                formatter_record["exception"] = "".join(lines)
-
-            if colored_message is not None and colored_message.stripped != record["message"]:
-                colored_message = None
-
-            if is_raw:
-                if colored_message is None or not self._colorize:
-                    formatted = record["message"]
-                else:
-                    ansi_level = self._levels_ansi_codes[level_id]
-                    formatted = colored_message.colorize(ansi_level)
-            elif self._is_formatter_dynamic:
-                if not self._colorize:
-                    precomputed_format = self._memoize_dynamic_format(dynamic_format)
-                    formatted = precomputed_format.format_map(formatter_record)
-                elif colored_message is None:
-                    ansi_level = self._levels_ansi_codes[level_id]
-                    _, precomputed_format = self._memoize_dynamic_format(dynamic_format, ansi_level)
-                    formatted = precomputed_format.format_map(formatter_record)
-                else:
-                    ansi_level = self._levels_ansi_codes[level_id]
-                    formatter, precomputed_format = self._memoize_dynamic_format(
-                        dynamic_format, ansi_level
-                    )
-                    coloring_message = formatter.make_coloring_message(
-                        record["message"], ansi_level=ansi_level, colored_message=colored_message
-                    )
-                    formatter_record["message"] = coloring_message
-                    formatted = precomputed_format.format_map(formatter_record)
-
-            else:
-                if not self._colorize:
-                    precomputed_format = self._decolorized_format
-                    formatted = precomputed_format.format_map(formatter_record)
-                elif colored_message is None:
-                    ansi_level = self._levels_ansi_codes[level_id]
-                    precomputed_format = self._precolorized_formats[level_id]
-                    formatted = precomputed_format.format_map(formatter_record)
-                else:
-                    ansi_level = self._levels_ansi_codes[level_id]
-                    precomputed_format = self._precolorized_formats[level_id]
-                    coloring_message = self._formatter.make_coloring_message(
-                        record["message"], ansi_level=ansi_level, colored_message=colored_message
-                    )
-                    formatter_record["message"] = coloring_message
-                    formatted = precomputed_format.format_map(formatter_record)
-
-            if self._serialize:
-                formatted = self._serialize_record(formatted, record)
+            str_record = self._format_message(
+                record, level_id, from_decorator, is_raw, colored_message, formatting_cache
+            )
 
-            str_record = Message(formatted)
-            str_record.record = record
+            wait_commit = None
 
             with self._protected_lock():
                 if self._stopped:
                     return
-                if self._enqueue:
+                if not self._enqueue or self._is_worker_lost():
+                    wait_commit = self._sink.write(str_record)
+                elif self._doorbell is not None:
+                    self._put_shared_memory(str_record)
+                elif self._queue_slots is None:
                     self._queue.put(str_record)
                 else:
-                    self._sink.write(str_record)
+                    self._put_bounded(str_record, level_id)
+
+            # Sinks committing messages to disk by groups return a function to wait for the commit.
+            if wait_commit is not None:
+                wait_commit()
         except Exception:
             if not self._error_interceptor.should_catch():
                 raise
             self._error_interceptor.print(record)
 
+    def _format_message(
+        self, record, level_id, from_decorator, is_raw, colored_message, formatting_cache
+    ):
+        if self._is_formatter_dynamic:
+            dynamic_format = self._formatter(record)
+
+        exception = record["exception"]
+
+        if not exception:
+            formatted_exception = ""
+        else:
+            # Handlers sharing the same exception formatter render the exception only once.
+            formatter = self._exception_formatter
+            try:
+                cached_exception, formatted_exception = formatting_cache[formatter]
+            except KeyError:
+                cached_exception = None
+            if cached_exception is not exception:
+                type_, value, tb = exception
+                lines = formatter.format_exception(type_, value, tb, from_decorator=from_decorator)
+                formatted_exception = "".join(lines)
+                formatting_cache[formatter] = (exception, formatted_exception)
+
+        message = record["message"]
+
+        if colored_message is not None and colored_message.stripped != message:
+            colored_message = None
+
+        if is_raw:
+            if colored_message is None or not self._colorize:
+                formatted = message
+            else:
+                ansi_level = self._levels_ansi_codes[level_id]
+                formatted = colored_message.colorize(ansi_level)
+        elif self._is_formatter_dynamic:
+            if not self._colorize:
+                precomputed_format = self._memoize_dynamic_format(dynamic_format)
+            elif colored_message is None:
+                ansi_level = self._levels_ansi_codes[level_id]
+                _, precomputed_format = self._memoize_dynamic_format(dynamic_format, ansi_level)
+            else:
+                ansi_level = self._levels_ansi_codes[level_id]
+                formatter, precomputed_format = self._memoize_dynamic_format(
+                    dynamic_format, ansi_level
+                )
+                message = formatter.make_coloring_message(
+                    message, ansi_level=ansi_level, colored_message=colored_message
+                )
+            overlay = FormattingOverlay(record, formatted_exception, message)
+            formatted = precomputed_format.format_map(overlay)
+        else:
+            if not self._colorize:
+                precomputed_format = self._decolorized_format
+            elif colored_message is None:
+                precomputed_format = self._precolorized_formats[level_id]
+            else:
+                ansi_level = self._levels_ansi_codes[level_id]
+                precomputed_format = self._precolorized_formats[level_id]
+                message = self._formatter.make_coloring_message(
+                    message, ansi_level=ansi_level, colored_message=colored_message
+                )
+            formatted = precomputed_format.render(record, formatted_exception, message)
+
+        if self._serialize:
+            formatted = self._serialize_record(formatted, record)
+
+        str_record = Message(formatted)
+        str_record.record = record
+
+        return str_record
+
+    def _put_shared_memory(self, message):
+        # Each process writes to its own ring, there is no need for a lock shared between processes.
+        if self._ring_pid != os.getpid():
+            self._ring = RingBuffer.create(self._ring_size, self._ring_lock)
+            self._ring_pid = os.getpid()
+            self._queue.put(("ring", self._ring.name))
+            if self._owner_process_pid != self._ring_pid:
+                # Rings of child processes are released by the worker once they exited.
+                Finalize(
+                    None,
+                    self._release_ring,
+                    args=(self._ring, self._queue, self._doorbell),
+                    exitpriority=0,
+                )
+
+        ring = self._ring
+        data = message.encode("utf8")
+
+        # The ring is drained first so that messages of the current process remain ordered. If the
+        # worker does not catch up in time, the message is sent through the queue anyway, possibly
+        # before the messages still waiting in the ring.
+        if not ring.fits(data) or not self._wait_ring(lambda: ring.has_room(data)):
+            self._wait_ring(ring.is_empty)
+            self._queue.put(message)
+            self._doorbell.release()
+            return
+
+        record_time = message.record["time"]
+        utcoffset = record_time.utcoffset()
+        seconds = 0 if utcoffset is None else int(utcoffset.total_seconds())
+
+        if ring.put(data, record_time.timestamp(), seconds):
+            self._doorbell.release()
+
+    def _wait_ring(self, condition):
+        deadline = time.monotonic() + self._ring_timeout
+        while not condition():
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.001)
+        return True
+
+    @staticmethod
+    def _release_ring(ring, queue, doorbell):
+        try:
+            queue.put(("ring_closed", ring.name))
+            doorbell.release()
+        finally:
+            ring.close()
+
+    def _put_bounded(self, message, level_id):
+        # The number of dropped messages is reported as soon as there is room in the queue.
+        if self._dropped_pending and self._queue_slots.acquire(False):
+            notice = dict(message.record, exception=None)
+            notice["message"] = (
+                "%d message(s) dropped because the queue of the handler was full"
+                % self._dropped_pending
+            )
+            self._queue.put(self._format_message(notice, level_id, False, False, None, {}))
+            self._dropped_pending = 0
+
+        if not self._acquire_queue_slot(message.record["level"].no):
+            self._dropped_count += 1
+            self._dropped_pending += 1
+            return
+
+        self._queue.put(message)
+
+    def _acquire_queue_slot(self, levelno):
+        slots = self._queue_slots
+
+        if slots.acquire(False):
+            return True
+
+        if self._overflow == "block":
+            return slots.acquire()
+
+        if self._overflow == "drop_below":
+            return levelno >= self._overflow_levelno and slots.acquire()
+
+        if self._overflow == "drop_oldest":
+            if self._drop_oldest_message():
+                # The slot of the dropped message is transferred to the new one.
+                self._dropped_count += 1
+                self._dropped_pending += 1
+                return True
+            # The worker thread took all messages, it will release the slots once they're written.
+            return slots.acquire()
+
+        return False
+
+    def _drop_oldest_message(self):
+        # The confirmation marker used by "complete()" must not be lost, it is re-queued instead.
+        for _ in range(2):
+            try:
+                oldest = self._queue.get_nowait()
+            except queue.Empty:
+                return False
+            if oldest is not True:
+                return True
+            self._queue.put(oldest)
+        return False
+
     def stop(self):
+        # The flusher acquires the lock, it can't be joined while the lock is held.
+        self._stop_flusher()
+
         with self._protected_lock():
             self._stopped = True
             if self._enqueue:
+                if self._is_worker_lost():
+                    self._sink.stop()
+                    return
                 if self._owner_process_pid != os.getpid():
                     return
                 self._queue.put(None)
+                if self._doorbell is not None:
+                    self._doorbell.release()
                 self._thread.join()
                 if hasattr(self._queue, "close"):
                     self._queue.close()
+                if self._ring is not None:
+                    self._ring.close()
 
             self._sink.stop()
 
+    def _start_flusher(self):
+        self._flusher_event = threading.Event()
+        self._flusher = Thread(
+            target=self._periodic_flusher, daemon=True, name="loggerex-flusher-%d" % self._id
+        )
+        self._flusher.start()
+
+    def _stop_flusher(self):
+        if self._flusher is None:
+            return
+        self._flusher_event.set()
+        if self._flusher.is_alive():
+            self._flusher.join()
+        self._flusher = None
+
+    def _periodic_flusher(self):
+        # Messages buffered by the sink are flushed even if no other message is logged afterward.
+        lock = self._queue_lock if self._enqueue else self._lock
+
+        while not self._flusher_event.wait(self._flush_interval):
+            with lock:
+                if self._stopped:
+                    return
+                try:
+                    self._sink.flush()
+                except Exception:
+                    self._error_interceptor.print(None)
+
     def complete_queue(self):
-        if not self._enqueue:
+        if not self._enqueue or self._is_worker_lost():
             return
 
         with self._confirmation_lock:
             self._queue.put(True)
+            if self._doorbell is not None:
+                self._doorbell.release()
             self._confirmation_event.wait()
             self._confirmation_event.clear()
 
     def tasks_to_complete(self):
+        if self._is_worker_lost():
+            with self._protected_lock():
+                return self._sink.tasks_to_complete()
         if self._enqueue and self._owner_process_pid != os.getpid():
             return []
         lock = self._queue_lock if self._enqueue else self._protected_lock()
@@ -242,12 +476,25 @@ class Handler:
         if not self._colorize or self._is_formatter_dynamic:
             return
         ansi_code = self._levels_ansi_codes[level_id]
-        self._precolorized_formats[level_id] = self._formatter.colorize(ansi_code)
+        self._precolorized_formats[level_id] = FormatTemplate(self._formatter.colorize(ansi_code))
 
     @property
     def levelno(self):
         return self._levelno
 
+    @property
+    def lazy_fields(self):
+        return self._lazy_fields
+
+    @property
+    def dropped_count(self):
+        return self._dropped_count
+
+    def _is_worker_lost(self):
+        # Unlike the multiprocessing queue, the in-process queue is not consumed by the parent once
+        # forked, the child process must write messages to the sink by itself.
+        return self._enqueue == "thread" and self._owner_process_pid != os.getpid()
+
     @staticmethod
     def _serialize_record(text, record):
         exception = record["exception"]
@@ -289,38 +536,143 @@ class Handler:
 
     def _queued_writer(self):
         message = None
+        messages = []
         queue = self._queue
 
-        # We need to use a lock to protect sink during fork.
-        # Particularly, writing to stderr may lead to deadlock in child process.
-        lock = self._queue_lock
-
         while True:
             try:
                 message = queue.get()
             except Exception:
-                with lock:
+                self._write_messages(messages)
+                messages = []
+                self._release_queue_slots(1)
+                with self._queue_lock:
                     self._error_interceptor.print(None)
                 continue
 
-            if message is None:
-                break
+            if message is None or message is True:
+                self._write_messages(messages)
+                messages = []
+
+                if message is None:
+                    break
 
-            if message is True:
                 self._confirmation_event.set()
                 continue
 
-            with lock:
+            messages.append(message)
+
+            # Messages already available are drained so that they can be written all at once.
+            if len(messages) >= self._batch_size or queue.empty():
+                self._write_messages(messages)
+                messages = []
+
+    def _shared_memory_writer(self):
+        queue = self._queue
+        rings = {}
+        is_stopping = False
+
+        while not is_stopping:
+            # The timeout is a safety net in case a producer was not aware the worker was waiting.
+            self._doorbell.acquire(True, 0.1)
+
+            messages = []
+            confirmations = 0
+            closed = []
+
+            while not queue.empty():
                 try:
-                    self._sink.write(message)
+                    item = queue.get()
                 except Exception:
-                    self._error_interceptor.print(message.record)
+                    with self._queue_lock:
+                        self._error_interceptor.print(None)
+                    continue
+
+                if item is None:
+                    is_stopping = True
+                elif item is True:
+                    confirmations += 1
+                elif isinstance(item, tuple) and item[0] == "ring_closed":
+                    # The ring is released once the last messages of the process are consumed.
+                    closed.append(item[1])
+                elif isinstance(item, tuple):
+                    try:
+                        ring = RingBuffer.attach(item[1], self._ring_lock)
+                        # The memory remains accessible until it is closed by all processes.
+                        ring.unlink()
+                    except Exception:
+                        with self._queue_lock:
+                            self._error_interceptor.print(None)
+                    else:
+                        rings[ring.name] = ring
+                else:
+                    messages.append(item)
+
+            for ring in rings.values():
+                try:
+                    entries = ring.get_all()
+                except Exception:
+                    with self._queue_lock:
+                        self._error_interceptor.print(None)
+                    continue
+
+                for text, record_time in entries:
+                    message = Message(text)
+                    message.record = {"time": record_time}
+                    messages.append(message)
+
+            for i in range(0, len(messages), self._batch_size):
+                self._write_messages(messages[i : i + self._batch_size])
+
+            for name in closed:
+                ring = rings.pop(name, None)
+                if ring is not None:
+                    ring.close()
+
+            for _ in range(confirmations):
+                self._confirmation_event.set()
+
+        for ring in rings.values():
+            ring.close()
+
+    def _write_messages(self, messages):
+        if not messages:
+            return
+
+        # We need to use a lock to protect sink during fork.
+        # Particularly, writing to stderr may lead to deadlock in child process.
+        with self._queue_lock:
+            if len(messages) > 1 and hasattr(self._sink, "write_batch"):
+                try:
+                    errors = self._sink.write_batch(messages)
+                except Exception as e:
+                    errors = [(messages[-1], e)]
+                for message, error in errors:
+                    self._error_interceptor.print(message.record, exception=error)
+            else:
+                for message in messages:
+                    try:
+                        self._sink.write(message)
+                    except Exception:
+                        self._error_interceptor.print(message.record)
+
+        self._release_queue_slots(len(messages))
+
+    def _release_queue_slots(self, count):
+        if self._queue_slots is None:
+            return
+        for _ in range(count):
+            self._queue_slots.release()
 
     def __getstate__(self):
         state = self.__dict__.copy()
         state["_lock"] = None
         state["_lock_acquired"] = None
         state["_memoize_dynamic_format"] = None
+        state["_ring"] = None
+        state["_ring_pid"] = None
+        state["_flusher"] = None
+        state["_flusher_event"] = None
         if self._enqueue:
             state["_sink"] = None
             state["_thread"] = None
@@ -339,3 +691,5 @@ class Handler:
                 self._memoize_dynamic_format = memoize(prepare_colored_format)
             else:
                 self._memoize_dynamic_format = memoize(prepare_stripped_format)
+        if self._flush_interval is not None and not self._enqueue:
+            self._start_flusher()
@@ -0,0 +1,93 @@
+import os
+import select
+import sys
+import threading
+
+
+def load_inotify_functions():
+    if not sys.platform.startswith("linux"):
+        return None
+
+    try:
+        import ctypes
+        import ctypes.util
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        inotify_init1 = libc.inotify_init1
+        inotify_add_watch = libc.inotify_add_watch
+    except (ImportError, OSError, AttributeError):
+        return None
+
+    def init(flags):
+        fd = inotify_init1(flags)
+        if fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        return fd
+
+    def add_watch(fd, path, mask):
+        wd = inotify_add_watch(fd, os.fsencode(path), mask)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), path)
+        return wd
+
+    return init, add_watch
+
+
+inotify_functions = load_inotify_functions()
+
+IN_ATTRIB = 0x00000004
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_CLOEXEC = 0o2000000
+
+# Deleting or replacing an opened file doesn't trigger "IN_DELETE_SELF" until it's closed, but its
+# number of links changes, which triggers "IN_ATTRIB".
+WATCH_MASK = IN_ATTRIB | IN_DELETE_SELF | IN_MOVE_SELF
+
+
+class FileWatcher:
+    """Thread notified by inotify when the watched file is possibly moved or removed."""
+
+    def __init__(self, path):
+        init, add_watch = inotify_functions
+
+        self.changed = False
+        self.pid = os.getpid()
+
+        self._fd = init(IN_CLOEXEC)
+        self._wakeup_r, self._wakeup_w = os.pipe()
+
+        try:
+            add_watch(self._fd, path, WATCH_MASK)
+        except BaseException:
+            self._close_fds()
+            raise
+
+        self._thread = threading.Thread(
+            target=self._watch, daemon=True, name="loggerex-watcher-%s" % os.path.basename(path)
+        )
+        self._thread.start()
+
+    def close(self):
+        if self.pid == os.getpid():
+            os.write(self._wakeup_w, b"\0")
+            self._thread.join()
+        self._close_fds()
+
+    def _close_fds(self):
+        os.close(self._fd)
+        os.close(self._wakeup_r)
+        os.close(self._wakeup_w)
+
+    def _watch(self):
+        while True:
+            readable, _, _ = select.select([self._fd, self._wakeup_r], [], [])
+
+            if self._wakeup_r in readable:
+                return
+
+            # The events don't matter, the file status is checked by the sink anyway.
+            os.read(self._fd, 4096)
+            self.changed = True
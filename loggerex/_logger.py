@@ -36,6 +36,7 @@
 .. |datetime| replace:: :class:`datetime.datetime`
 .. |timedelta| replace:: :class:`datetime.timedelta`
 .. |open| replace:: :func:`open()`
+.. |os.fsync| replace:: :func:`os.fsync()`
 .. |logging| replace:: :mod:`logging`
 .. |signal| replace:: :mod:`signal`
 .. |contextvars| replace:: :mod:`contextvars`
@@ -97,6 +98,7 @@
 import builtins
 import contextlib
 import functools
+import io
 import logging
 import re
 import sys
@@ -110,17 +112,26 @@ from multiprocessing.context import BaseContext
 from os.path import basename, splitext
 from threading import current_thread
 
-from . import _asyncio_loop, _colorama, _defaults, _filters
+from . import _asyncio_loop, _colorama, _defaults, _filters, _ring_buffer
+from . import _string_parsers as string_parsers
 from ._better_exceptions import ExceptionFormatter
 from ._colorizer import Colorizer, try_formatting
 from ._contextvars import ContextVar
 from ._datetime import aware_now
 from ._error_interceptor import ErrorInterceptor
-from ._file_sink import FileSink
+from ._file_sink import FileSink, PartitionedFileSink
+from ._flush_policy import FlushPolicy
 from ._get_frame import get_frame
 from ._handler import Handler
 from ._locks_machinery import create_logger_lock
-from ._recattrs import RecordException, RecordFile, RecordLevel, RecordProcess, RecordThread
+from ._recattrs import (
+    LazyRecord,
+    RecordException,
+    RecordFile,
+    RecordLevel,
+    RecordProcess,
+    RecordThread,
+)
 from ._simple_sinks import AsyncSink, CallableSink, StandardSink, StreamSink
 
 if sys.version_info >= (3, 6):
@@ -204,6 +215,16 @@ class Core:
         self.handlers_count = 0
         self.handlers = {}
 
+        # The handlers accepting the records of each "(name, levelno)" pair, based on their level
+        # and their name filter. It's replaced whenever a handler is added or removed.
+        self.dispatch = {}
+        self.exception_formatters = {}
+
+        # The costly record fields which are not needed by any of the handlers' format. If not
+        # empty, the record is created as a "LazyRecord" and these fields are only computed on
+        # demand.
+        self.lazy_fields = LazyRecord.lazy_fields
+
         self.extra = {}
         self.patcher = None
 
@@ -212,6 +233,11 @@ class Core:
         self.activation_list = []
         self.activation_none = True
 
+        # Cache of the metadata derived from the code object of each logging call site. Entries are
+        # considered outdated as soon as the "generation" is bumped by a configuration change.
+        self.callsites = {}
+        self.generation = 0
+
         self.thread_locals = threading.local()
         self.lock = create_logger_lock()
 
@@ -219,6 +245,8 @@ class Core:
         state = self.__dict__.copy()
         state["thread_locals"] = None
         state["lock"] = None
+        state["callsites"] = {}
+        state["dispatch"] = {}
         return state
 
     def __setstate__(self, state):
@@ -270,6 +298,9 @@ class Logger:
         diagnose=_defaults.LOGURU_DIAGNOSE,
         enqueue=_defaults.LOGURU_ENQUEUE,
         context=_defaults.LOGURU_CONTEXT,
+        queue_size=None,
+        overflow="block",
+        flush="always",
         catch=_defaults.LOGURU_CATCH,
         **kwargs
     ):
@@ -300,14 +331,36 @@ class Logger:
         diagnose : |bool|, optional
             Whether the exception trace should display the variables values to eases the debugging.
             This should be set to ``False`` in production to avoid leaking sensitive data.
-        enqueue : |bool|, optional
+        enqueue : |bool| or |str|, optional
             Whether the messages to be logged should first pass through a multiprocessing-safe queue
             before reaching the sink. This is useful while logging to a file through multiple
-            processes. This also has the advantage of making logging calls non-blocking.
+            processes. This also has the advantage of making logging calls non-blocking. If
+            ``"thread"``, messages are passed by reference through an in-process queue instead,
+            which avoids the cost of pickling them but is not multiprocessing-safe. If
+            ``"shared_memory"`` (file and stream sinks only), each process writes the formatted
+            messages to its own ring buffer in shared memory, without any lock shared between
+            processes. In this case, the ``record`` attached to the message received by the sink
+            only contains the ``"time"`` key.
         context : |multiprocessing.Context| or |str|, optional
             A context object or name that will be used for all tasks involving internally the
             |multiprocessing| module, in particular when ``enqueue=True``. If ``None``, the default
             context is used.
+        queue_size : |int|, optional
+            The maximum number of messages waiting to be processed by the sink if ``enqueue`` is
+            enabled. If ``None``, the queue is unbounded.
+        overflow : |str|, optional
+            What to do with new messages when the queue is full: ``"block"`` the logging call until
+            room is available, ``"drop_new"`` to discard the new message, ``"drop_oldest"`` to
+            discard the oldest message still in the queue (only if ``enqueue="thread"``), or
+            ``"drop_below:LEVEL"`` to discard the new message only if its severity is lower than
+            ``LEVEL`` and block otherwise. Once room is available again, a message reporting the
+            number of messages dropped is logged.
+        flush : |str|, optional
+            When the messages written to a file or stream sink should be flushed: ``"always"``
+            after each message, or buffered until ``"interval:DURATION"`` elapsed since the oldest
+            message not flushed (also enforced by a background timer), ``"size:SIZE"`` is reached,
+            or a message with a severity of at least ``"level:LEVEL"`` is logged. Several policies
+            can be combined with commas, e.g. ``"interval:100ms,level:ERROR"``.
         catch : |bool|, optional
             Whether errors occurring while sink handles logs messages should be automatically
             caught. If ``True``, an exception message is displayed on |sys.stderr| but the exception
@@ -344,9 +397,61 @@ class Logger:
         delay : |bool|, optional
             Whether the file should be created as soon as the sink is configured, or delayed until
             first logged message. It defaults to ``False``.
-        watch : |bool|, optional
+        watch : |bool| or |str|, optional
             Whether or not the file should be watched and re-opened when deleted or changed (based
-            on its device and inode properties) by an external program. It defaults to ``False``.
+            on its device and inode properties) by an external program. If ``"inotify"`` (Linux
+            only), the file is checked only once notified of a possible change by the system. It
+            defaults to ``False``.
+        watch_interval : |str|, |int|, |float| or |timedelta|, optional
+            The minimum duration between two checks of the watched file (in seconds if a number),
+            messages being written to the already opened file in the meantime. It defaults to
+            ``None`` (the file is checked before each message).
+        background : |bool| or |str|, optional
+            Whether the compression and the retention should be executed by a background worker
+            (``"thread"`` or ``"process"``, ``True`` being the same as ``"thread"``) instead of
+            blocking the logging call which triggered the rotation. It defaults to ``False``.
+        compression_mode : |str|, optional
+            Whether the file should be compressed once closed (``"close"``), compressed once closed
+            by blocks in parallel worker processes (``"parallel"``, or ``"parallel:N"`` to use
+            ``N`` workers instead of one per CPU) or whether the messages should be compressed as
+            they are written (``"stream"``). It defaults to ``"close"``. The workers of
+            ``"parallel"`` are spawned and import the ``__main__`` module, so the code of a script
+            must be protected by an ``if __name__ == "__main__":`` guard.
+        compression_level : |int|, optional
+            The level of the ``compression``, from ``0`` (``1`` for ``"bz2"`` formats) to ``9``.
+            It defaults to ``None`` (the default level of the format).
+        fsync : |bool| or |str|, optional
+            Whether the messages should be synchronized to disk before the logging call returns.
+            If ``True``, |os.fsync| is called after each message. If ``"group:DURATION"``, it is
+            called at most once per duration for all the messages written in the meantime, the
+            logging calls waiting for the next commit (unless ``enqueue`` is used). It can be
+            combined with ``"level:LEVEL"`` to commit immediately messages of at least this
+            severity. It defaults to ``False``.
+        preallocate : |bool|, |int| or |str|, optional
+            The size of the chunks of disk space allocated ahead of the messages written to the
+            file (Linux only), reducing its fragmentation. If ``True``, the size of the ``rotation``
+            is used. The space not used is released once the file is closed. It defaults to
+            ``False``.
+        drop_cache : |bool|, optional
+            Whether the pages of the file already written should be regularly evicted from the
+            system page cache, so that logs don't evict the cached data of the application. It
+            defaults to ``False``.
+        shared : |bool|, optional
+            Whether the file is written by several processes which added the same sink (e.g.
+            pre-forked web server workers). Each message is appended to the file with a single
+            system call, the rotation is performed by only one of the processes and the others
+            reopen the new file. Only the rotated files are compressed. It defaults to ``False``.
+        time_partition : |bool|, optional
+            Whether the ``"{time}"`` fields of the path should be formatted with the time of the
+            logged messages rather than the time of the file creation, so that each message is
+            written to the file of its time bucket (e.g. ``"logs/{time:YYYY/MM/DD/HH}.log"`` for
+            hourly files). It replaces the ``rotation``, the ``compression`` and the ``retention``
+            being applied once a more recent bucket is reached. Messages of an older bucket are
+            appended to its file, which is not compressed again. It defaults to ``False``.
+        max_open_files : |int|, optional
+            The maximum number of files kept open if the path is partitioned by record fields, the
+            least recently used one being closed and later reopened if needed. It defaults to
+            ``128``.
         mode : |str|, optional
             The opening mode as for built-in |open| function. It defaults to ``"a"`` (open the
             file in appending mode).
@@ -626,6 +731,13 @@ class Logger:
         current date at file creation. The file is closed at sink stop, i.e. when the application
         ends or the handler is removed.
 
+        The path may also reference fields of the record, e.g. ``"logs/{extra[tenant]}/app.log"``,
+        in which case each message is written to the file of its partition. The partitions are
+        created as messages are logged, each of them being rotated, compressed and retained
+        independently with the same options. Separators in the field values are replaced with
+        ``"_"``, so that all the files are contained in the partitioned directories. Only the
+        ``"a"`` mode is supported.
+
         The ``rotation`` check is made before logging each message. If there is already an existing
         file with the same name that the file to be created, then the existing file is renamed by
         appending the date to its basename to prevent file overwriting. This parameter accepts:
@@ -646,12 +758,18 @@ class Logger:
         is selected if it matches the pattern ``"root(.*).ext(.*)"``, where ``root`` and ``ext`` are
         derived from ``os.path.splitext()`` applied to the configured sink path (possible time
         fields are beforehand replaced with ``.*``). Afterwards, the list is processed to determine
-        files to be retained. This parameter accepts:
+        files to be retained. The files are only listed from disk at the first retention, they are
+        then tracked as they are rotated, compressed and removed by the sink (unless a custom
+        ``compression`` or ``retention`` function is used, which requires listing them again).
+        This parameter accepts:
 
         - an |int| which indicates the number of log files to keep, while older files are deleted.
         - a |timedelta| which specifies the maximum age of files to keep.
         - a |str| for human-friendly parametrization of the maximum age of files to keep.
           Examples: ``"1 week, 3 days"``, ``"2 months"``, ...
+        - a |str| which specifies the maximum total size of the files to keep, while the oldest
+          ones are deleted until the others fit within this budget. Examples: ``"500 MB"``,
+          ``"50 GB"``, ...
         - a |callable|_ which will be invoked before the retention process. It should accept the
           list of log files as argument and process to whatever it wants (moving files, removing
           them, etc.).
@@ -666,6 +784,21 @@ class Logger:
           logged file. It should accept the path of the log file as argument and process to whatever
           it wants (custom compression, network sending, renaming it, removing it, etc.).
 
+        If ``compression_mode="stream"``, the messages are directly written to a compressed file
+        (its path being suffixed with the compression extension), which can be one of ``"gz"``,
+        ``"bz2"`` or ``"xz"``. The compressed stream is flushed at most once per second, so that
+        only the latest messages may be lost in case of a crash. In this mode, the file size used
+        by the ``rotation`` is counted before compression (an existing file being decompressed once
+        to measure it when appended to), and ``mode`` must be one of ``"a"``, ``"w"`` or ``"x"``.
+
+        If ``background`` is enabled, the rotation only renames the file and opens a new one, while
+        the compression and the retention are executed by a worker thread or process. These tasks
+        are awaited by |complete| and |remove|, and their errors are raised at the next rotation or
+        when the sink is stopped. The files which were rotated but not yet compressed are listed
+        in a hidden ``".pending"`` file, so that their compression can be resumed at next startup
+        if the program was interrupted. With ``"process"``, the custom functions must be
+        picklable.
+
         Either way, if you use a custom function designed according to your preferences, you must be
         very careful not to use the ``logger`` within your function. Otherwise, there is a risk that
         your program hang because of a deadlock.
@@ -761,6 +894,10 @@ class Logger:
         If you want to disable the pre-configured sink, you can set the ``LOGURU_AUTOINIT``
         variable to ``False``.
 
+        Similarly, setting the ``LOGURU_UTC`` variable to ``True`` makes the ``time`` of the logged
+        records expressed in UTC rather than in the local timezone, which also avoids the overhead
+        of resolving the local timezone.
+
         On Linux, you will probably need to edit the ``~/.profile`` file to make this persistent. On
         Windows, don't forget to restart your terminal for the change to be taken into account.
 
@@ -816,6 +953,38 @@ class Logger:
         if colorize is None and serialize:
             colorize = False
 
+        if not isinstance(flush, str):
+            raise TypeError(
+                "Invalid flush, it should be a string, not: '%s'" % type(flush).__name__
+            )
+
+        if flush == "always":
+            flush_policy = None
+        else:
+            flush_options = {}
+            for option in flush.split(","):
+                key, _, value = option.strip().partition(":")
+                if key in flush_options or not value:
+                    key = None
+                if key == "interval":
+                    duration = string_parsers.parse_duration(value)
+                    if duration is None or duration.total_seconds() <= 0:
+                        raise ValueError("Invalid flush interval: '%s'" % value)
+                    flush_options[key] = duration.total_seconds()
+                elif key == "size":
+                    size = string_parsers.parse_size(value)
+                    if size is None or size <= 0:
+                        raise ValueError("Invalid flush size: '%s'" % value)
+                    flush_options[key] = size
+                elif key == "level":
+                    flush_options["levelno"] = self.level(value).no
+                else:
+                    raise ValueError(
+                        "Invalid flush, it should be 'always' or a combination of "
+                        "'interval:DURATION', 'size:SIZE' and 'level:LEVEL', not: '%s'" % flush
+                    )
+            flush_policy = FlushPolicy(**flush_options)
+
         if isinstance(sink, (str, PathLike)):
             path = sink
             name = "'%s'" % path
@@ -823,7 +992,38 @@ class Logger:
             if colorize is None:
                 colorize = False
 
-            wrapped_sink = FileSink(path, **kwargs)
+            fsync_interval, fsync_level = FileSink._make_fsync(kwargs.pop("fsync", False))
+            fsync_levelno = None if fsync_level is None else self.level(fsync_level).no
+
+            if fsync_interval is not None and flush_policy is not None:
+                raise ValueError("The 'flush' and 'fsync' parameters can't be used together")
+
+            if fsync_levelno is not None and enqueue == "shared_memory":
+                raise ValueError(
+                    "The 'level' fsync policy is not supported with the 'shared_memory' "
+                    "enqueue mode"
+                )
+
+            if flush_policy is not None:
+                # Line buffering would defeat the purpose of the flush policy.
+                kwargs.setdefault("buffering", flush_policy.buffering)
+
+            if PartitionedFileSink.is_partitioned(path):
+                file_sink_class = PartitionedFileSink
+            elif "max_open_files" in kwargs:
+                raise ValueError(
+                    "The 'max_open_files' parameter requires a path partitioned by record fields"
+                )
+            else:
+                file_sink_class = FileSink
+
+            wrapped_sink = file_sink_class(
+                path,
+                flush_policy=flush_policy,
+                fsync=fsync_interval,
+                fsync_levelno=fsync_levelno,
+                **kwargs,
+            )
             kwargs = {}
             encoding = wrapped_sink.encoding
             terminator = "\n"
@@ -839,7 +1039,12 @@ class Logger:
             else:
                 stream = sink
 
-            wrapped_sink = StreamSink(stream)
+            wrapped_sink = StreamSink(stream, flush_policy)
+
+            if not wrapped_sink.flushable:
+                # Messages are never buffered, there is no need to flush them periodically.
+                flush_policy = None
+
             encoding = getattr(sink, "encoding", None)
             terminator = "\n"
             exception_prefix = ""
@@ -898,14 +1103,27 @@ class Logger:
         if kwargs:
             raise TypeError("add() got an unexpected keyword argument '%s'" % next(iter(kwargs)))
 
+        if flush_policy is not None:
+            if not isinstance(wrapped_sink, (FileSink, PartitionedFileSink, StreamSink)):
+                raise ValueError("The 'flush' parameter only supports file and stream sinks")
+            if flush_policy.levelno is not None and enqueue == "shared_memory":
+                raise ValueError(
+                    "The 'level' flush policy is not supported with the 'shared_memory' "
+                    "enqueue mode"
+                )
+
+        # Filters depending only on the record's name are evaluated once per name by the core.
+        filter_func = None
+        name_filter = None
+
         if filter is None:
-            filter_func = None
+            pass
         elif filter == "":
-            filter_func = _filters.filter_none
+            name_filter = _filters.filter_none
         elif isinstance(filter, str):
             parent = filter + "."
             length = len(parent)
-            filter_func = functools.partial(_filters.filter_by_name, parent=parent, length=length)
+            name_filter = functools.partial(_filters.filter_by_name, parent=parent, length=length)
         elif isinstance(filter, dict):
             level_per_module = {}
             for module, level_ in filter.items():
@@ -940,9 +1158,11 @@ class Logger:
                         "it should be a positive integer, not: '%d'" % (module, levelno_)
                     )
                 level_per_module[module] = levelno_
-            filter_func = functools.partial(
-                _filters.filter_by_level, level_per_module=level_per_module
-            )
+            thresholds = {
+                module: float("inf") if levelno_ is False else levelno_
+                for module, levelno_ in level_per_module.items()
+            }
+            name_filter = functools.partial(_filters.filter_by_level, thresholds=thresholds)
         elif callable(filter):
             if filter == builtins.filter:
                 raise ValueError(
@@ -995,9 +1215,77 @@ class Logger:
                 % type(format).__name__
             )
 
+        if (
+            is_formatter_dynamic
+            or serialize
+            or enqueue == "thread"
+            or not isinstance(wrapped_sink, (FileSink, PartitionedFileSink, StreamSink))
+            # Unlike the standard streams, custom objects with a "write()" method may keep the
+            # message and access its record once the logging call returned.
+            or (isinstance(wrapped_sink, StreamSink) and not isinstance(sink, io.IOBase))
+        ):
+            # The whole record is likely to be accessed, possibly after the logging call returned.
+            lazy_fields = frozenset()
+        else:
+            lazy_fields = LazyRecord.lazy_fields - formatter.fields
+
+            if isinstance(wrapped_sink, PartitionedFileSink):
+                # The fields of the path must be those of the logging call, not of the sink thread.
+                lazy_fields -= wrapped_sink.fields
+
         if not isinstance(encoding, str):
             encoding = "ascii"
 
+        if isinstance(enqueue, str) and enqueue not in ("thread", "shared_memory"):
+            raise ValueError(
+                "Invalid enqueue mode, it should be a boolean, 'thread' or 'shared_memory', "
+                "not: '%s'" % enqueue
+            )
+
+        if enqueue == "shared_memory":
+            if _ring_buffer.shared_memory is None:
+                raise ValueError("The 'shared_memory' enqueue mode requires Python 3.8 or later")
+            if not isinstance(wrapped_sink, (FileSink, StreamSink)):
+                raise ValueError(
+                    "The 'shared_memory' enqueue mode only supports file and stream sinks"
+                )
+            if queue_size is not None:
+                raise ValueError("The 'queue_size' parameter is not supported with 'shared_memory'")
+
+        if queue_size is not None:
+            if not isinstance(queue_size, int) or isinstance(queue_size, bool):
+                raise TypeError(
+                    "Invalid queue_size, it should be an integer, not: '%s'"
+                    % type(queue_size).__name__
+                )
+            if queue_size < 1:
+                raise ValueError(
+                    "Invalid queue_size, it should be a strictly positive integer, not: %d"
+                    % queue_size
+                )
+            if not enqueue:
+                raise ValueError("The 'queue_size' parameter requires 'enqueue' to be enabled")
+
+        if not isinstance(overflow, str):
+            raise TypeError(
+                "Invalid overflow, it should be a string, not: '%s'" % type(overflow).__name__
+            )
+
+        overflow_policy, _, overflow_level = overflow.partition(":")
+
+        if overflow_policy == "drop_below" and overflow_level:
+            overflow_levelno = self.level(overflow_level).no
+        elif overflow_policy in ("block", "drop_new", "drop_oldest") and not overflow_level:
+            overflow_levelno = 0
+        else:
+            raise ValueError(
+                "Invalid overflow, it should be one of 'block', 'drop_new', 'drop_oldest' or "
+                "'drop_below:LEVEL', not: '%s'" % overflow
+            )
+
+        if overflow_policy == "drop_oldest" and enqueue and enqueue != "thread":
+            raise ValueError("The 'drop_oldest' overflow policy requires enqueue='thread'")
+
         if isinstance(context, str):
             context = get_context(context)
         elif context is not None and not isinstance(context, BaseContext):
@@ -1007,14 +1295,21 @@ class Logger:
             )
 
         with self._core.lock:
-            exception_formatter = ExceptionFormatter(
-                colorize=colorize,
-                encoding=encoding,
-                diagnose=diagnose,
-                backtrace=backtrace,
-                hidden_frames_filename=self.catch.__code__.co_filename,
-                prefix=exception_prefix,
-            )
+            # Formatters are shared by handlers with identical configuration, so that a logged
+            # exception is formatted only once for all of them.
+            exception_formatter_key = (colorize, encoding, diagnose, backtrace, exception_prefix)
+            exception_formatter = self._core.exception_formatters.get(exception_formatter_key)
+
+            if exception_formatter is None:
+                exception_formatter = ExceptionFormatter(
+                    colorize=colorize,
+                    encoding=encoding,
+                    diagnose=diagnose,
+                    backtrace=backtrace,
+                    hidden_frames_filename=self.catch.__code__.co_filename,
+                    prefix=exception_prefix,
+                )
+                self._core.exception_formatters[exception_formatter_key] = exception_formatter
 
             handler = Handler(
                 name=name,
@@ -1023,6 +1318,7 @@ class Logger:
                 formatter=formatter,
                 is_formatter_dynamic=is_formatter_dynamic,
                 filter_=filter_func,
+                name_filter=name_filter,
                 colorize=colorize,
                 serialize=serialize,
                 enqueue=enqueue,
@@ -1031,13 +1327,21 @@ class Logger:
                 error_interceptor=error_interceptor,
                 exception_formatter=exception_formatter,
                 levels_ansi_codes=self._core.levels_ansi_codes,
+                lazy_fields=lazy_fields,
+                queue_size=queue_size,
+                overflow=overflow_policy,
+                overflow_levelno=overflow_levelno,
+                flush_interval=None if flush_policy is None else flush_policy.interval,
             )
 
             handlers = self._core.handlers.copy()
             handlers[handler_id] = handler
 
             self._core.min_level = min(self._core.min_level, levelno)
+            self._core.lazy_fields = self._core.lazy_fields & lazy_fields
             self._core.handlers = handlers
+            self._core.dispatch = {}
+            self._core.generation += 1
 
         return handler_id
 
@@ -1085,7 +1389,12 @@ class Logger:
                 # This needs to be done first in case "stop()" raises an exception
                 levelnos = (h.levelno for h in handlers.values())
                 self._core.min_level = min(levelnos, default=float("inf"))
+                self._core.lazy_fields = LazyRecord.lazy_fields.intersection(
+                    *(h.lazy_fields for h in handlers.values())
+                )
                 self._core.handlers = handlers
+                self._core.dispatch = {}
+                self._core.generation += 1
 
                 handler.stop()
 
@@ -1818,6 +2127,9 @@ class Logger:
                 self._core.extra.clear()
                 self._core.extra.update(extra)
 
+        with self._core.lock:
+            self._core.generation += 1
+
         if activation is not None:
             for name, state in activation:
                 if state:
@@ -1873,6 +2185,7 @@ class Logger:
                         enabled[n] = status
                 self._core.activation_none = status
                 self._core.enabled = enabled
+                self._core.generation += 1
                 return
 
             if name != "":
@@ -1897,6 +2210,7 @@ class Logger:
 
             self._core.activation_list = activation_list
             self._core.enabled = enabled
+            self._core.generation += 1
 
     @staticmethod
     def parse(file, pattern, *, cast={}, chunk=2**16):  # noqa: B006
@@ -2013,6 +2327,73 @@ class Logger:
                 buffer = buffer[end:]
                 yield from matches[:-1]
 
+    @staticmethod
+    def _resolve_callsite(core, f_code, f_globals):
+        # The status may be changed concurrently, it must not be stored as up to date in that case.
+        generation = core.generation
+
+        if f_code is None:
+            co_name = "<unknown>"
+            co_filename = "<unknown>"
+        else:
+            co_name = f_code.co_name
+            co_filename = f_code.co_filename
+
+        try:
+            name = f_globals["__name__"]
+        except KeyError:
+            name = None
+
+        try:
+            is_enabled = core.enabled[name]
+        except KeyError:
+            enabled = core.enabled
+            if name is None:
+                is_enabled = core.activation_none
+            else:
+                is_enabled = True
+                dotted_name = name + "."
+                for dotted_module_name, status in core.activation_list:
+                    if dotted_name[: len(dotted_module_name)] == dotted_module_name:
+                        is_enabled = status
+                        break
+            enabled[name] = is_enabled
+
+        file_name = basename(co_filename)
+        module = splitext(file_name)[0]
+
+        callsite = (
+            generation,
+            f_globals,
+            name,
+            is_enabled,
+            co_name,
+            file_name,
+            co_filename,
+            module,
+        )
+
+        if f_code is not None:
+            callsites = core.callsites
+            # Code objects generated dynamically may never be reused, so the cache must not grow
+            # indefinitely. Resetting it entirely is simpler than maintaining a proper LRU order.
+            if len(callsites) >= 4096:
+                callsites.clear()
+            callsites[f_code] = callsite
+
+        return callsite
+
+    @staticmethod
+    def _resolve_handlers(core, dispatch, name, level_no):
+        handlers = tuple(h for h in core.handlers.values() if h.accepts(name, level_no))
+
+        # The names can be arbitrarily modified by patchers, the cache is bounded like "callsites".
+        if len(dispatch) >= 4096:
+            dispatch.clear()
+        dispatch[(name, level_no)] = handlers
+
+        return handlers
+
     def _log(self, level, from_decorator, options, message, args, kwargs):
         core = self._core
 
@@ -2045,47 +2426,25 @@ class Logger:
         try:
             frame = get_frame(depth + 2)
         except ValueError:
+            f_code = None
             f_globals = {}
             f_lineno = 0
-            co_name = "<unknown>"
-            co_filename = "<unknown>"
         else:
+            f_code = frame.f_code
             f_globals = frame.f_globals
             f_lineno = frame.f_lineno
-            co_name = frame.f_code.co_name
-            co_filename = frame.f_code.co_filename
 
-        try:
-            name = f_globals["__name__"]
-        except KeyError:
-            name = None
+        callsite = core.callsites.get(f_code)
 
-        try:
-            if not core.enabled[name]:
-                return
-        except KeyError:
-            enabled = core.enabled
-            if name is None:
-                status = core.activation_none
-                enabled[name] = status
-                if not status:
-                    return
-            else:
-                dotted_name = name + "."
-                for dotted_module_name, status in core.activation_list:
-                    if dotted_name[: len(dotted_module_name)] == dotted_module_name:
-                        if status:
-                            break
-                        enabled[name] = False
-                        return
-                enabled[name] = True
+        if callsite is None or callsite[0] != core.generation or callsite[1] is not f_globals:
+            callsite = self._resolve_callsite(core, f_code, f_globals)
 
-        current_datetime = aware_now()
+        _, _, name, is_enabled, co_name, file_name, co_filename, module = callsite
 
-        file_name = basename(co_filename)
-        thread = current_thread()
-        process = current_process()
-        elapsed = current_datetime - start_time
+        if not is_enabled:
+            return
+
+        current_datetime = aware_now()
 
         if exception:
             if isinstance(exception, BaseException):
@@ -2098,21 +2457,46 @@ class Logger:
         else:
             exception = None
 
-        log_record = {
-            "elapsed": elapsed,
-            "exception": exception,
-            "extra": {**core.extra, **context.get(), **extra},
-            "file": RecordFile(file_name, co_filename),
-            "function": co_name,
-            "level": RecordLevel(level_name, level_no, level_icon),
-            "line": f_lineno,
-            "message": str(message),
-            "module": splitext(file_name)[0],
-            "name": name,
-            "process": RecordProcess(process.ident, process.name),
-            "thread": RecordThread(thread.ident, thread.name),
-            "time": current_datetime,
-        }
+        if core.lazy_fields:
+            log_record = LazyRecord(
+                {
+                    "exception": exception,
+                    "function": co_name,
+                    "level": RecordLevel(level_name, level_no, level_icon),
+                    "line": f_lineno,
+                    "message": str(message),
+                    "module": module,
+                    "name": name,
+                    "time": current_datetime,
+                },
+                (
+                    current_datetime,
+                    start_time,
+                    core.extra,
+                    context.get(),
+                    extra,
+                    file_name,
+                    co_filename,
+                ),
+            )
+        else:
+            thread = current_thread()
+            process = current_process()
+            log_record = {
+                "elapsed": current_datetime - start_time,
+                "exception": exception,
+                "extra": {**core.extra, **context.get(), **extra},
+                "file": RecordFile(file_name, co_filename),
+                "function": co_name,
+                "level": RecordLevel(level_name, level_no, level_icon),
+                "line": f_lineno,
+                "message": str(message),
+                "module": module,
+                "name": name,
+                "process": RecordProcess(process.ident, process.name),
+                "thread": RecordThread(thread.ident, thread.name),
+                "time": current_datetime,
+            }
 
         if lazy:
             args = [arg() for arg in args]
@@ -2148,8 +2532,22 @@ class Logger:
         for patcher in patchers:
             patcher(log_record)
 
-        for handler in core.handlers.values():
-            handler.emit(log_record, level_id, from_decorator, raw, colored_message)
+        # The name and the level may have been modified by the patchers.
+        name = log_record["name"]
+        level_no = log_record["level"].no
+        dispatch = core.dispatch
+        handlers = dispatch.get((name, level_no))
+
+        if handlers is None:
+            handlers = self._resolve_handlers(core, dispatch, name, level_no)
+
+        # Formatted values which can be shared between handlers (e.g. the formatted exception).
+        formatting_cache = {}
+
+        for handler in handlers:
+            handler.emit(
+                log_record, level_id, from_decorator, raw, colored_message, formatting_cache
+            )
 
     def trace(__self, __message, *args, **kwargs):  # noqa: N805
         r"""Log ``message.format(*args, **kwargs)`` with severity ``'TRACE'``."""
@@ -0,0 +1,43 @@
+import os
+import sys
+
+# The allocated blocks don't change the size of the file, so that appended messages are still
+# written at its end.
+FALLOC_FL_KEEP_SIZE = 0x01
+
+
+def load_fallocate():
+    if not sys.platform.startswith("linux"):
+        return None
+
+    try:
+        import ctypes
+        import ctypes.util
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        function = libc.fallocate64
+    except (ImportError, OSError, AttributeError):
+        return None
+
+    function.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_int64, ctypes.c_int64]
+    function.restype = ctypes.c_int
+
+    def fallocate(fd, offset, length):
+        if function(fd, FALLOC_FL_KEEP_SIZE, offset, length) != 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+
+    return fallocate
+
+
+fallocate = load_fallocate()
+
+if hasattr(os, "posix_fadvise"):
+
+    def drop_cache(fd, offset, length):
+        # Dirty pages are not dropped, but their writeback is initiated so that they can be dropped
+        # by the next call.
+        os.posix_fadvise(fd, offset, length, os.POSIX_FADV_DONTNEED)
+
+else:
+    drop_cache = None
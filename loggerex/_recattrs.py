@@ -1,5 +1,7 @@
 import pickle
 from collections import namedtuple
+from multiprocessing import current_process
+from threading import current_thread
 
 
 class RecordLevel:
@@ -90,3 +92,166 @@ class RecordException(
             return cls(type_, None, traceback_)
         else:
             return cls(type_, value, traceback_)
+
+
+class LazyRecord(dict):
+    """A record dict whose costly items are only computed the first time they are accessed.
+
+    Handlers statically declare the fields their format require. The fields that none of them
+    need are not computed while logging, unless they are explicitly requested by a filter, a patcher
+    or a sink. The captured context is dropped once all items have been computed, at which point the
+    record behaves exactly like a plain dict.
+    """
+
+    __slots__ = ("_context",)
+
+    # The ordering is the one of the regular record, it is preserved when the record is completed.
+    ordered_fields = (
+        "elapsed",
+        "exception",
+        "extra",
+        "file",
+        "function",
+        "level",
+        "line",
+        "message",
+        "module",
+        "name",
+        "process",
+        "thread",
+        "time",
+    )
+
+    lazy_fields = frozenset(["elapsed", "extra", "file", "process", "thread"])
+
+    def __init__(self, items, context):
+        dict.__init__(self, items)
+        # The context is a tuple of values captured at the time of the logging call:
+        # (time, start_time, core_extra, context_extra, bound_extra, file_name, file_path).
+        self._context = context
+
+    def __missing__(self, key):
+        context = self._context
+        if context is None or key not in self.lazy_fields:
+            raise KeyError(key)
+        value = self._resolve(key, context)
+        dict.__setitem__(self, key, value)
+        return value
+
+    @staticmethod
+    def _resolve(key, context):
+        time, start_time, core_extra, context_extra, bound_extra, file_name, file_path = context
+        if key == "elapsed":
+            return time - start_time
+        if key == "extra":
+            return {**core_extra, **context_extra, **bound_extra}
+        if key == "file":
+            return RecordFile(file_name, file_path)
+        if key == "process":
+            process = current_process()
+            return RecordProcess(process.ident, process.name)
+        thread = current_thread()
+        return RecordThread(thread.ident, thread.name)
+
+    def complete(self):
+        """Compute all the pending items, so that the dict can be used without restriction."""
+        context = self._context
+        if context is None:
+            return
+
+        items = dict(dict.items(self))
+        for key in self.lazy_fields:
+            if key not in items:
+                items[key] = self._resolve(key, context)
+
+        ordered = {key: items.pop(key) for key in self.ordered_fields if key in items}
+        ordered.update(items)
+
+        dict.clear(self)
+        dict.update(self, ordered)
+        self._context = None
+
+    def copy(self):
+        return LazyRecord(dict.items(self), self._context)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        if dict.__contains__(self, key):
+            return True
+        return self._context is not None and key in self.lazy_fields
+
+    def __iter__(self):
+        self.complete()
+        return dict.__iter__(self)
+
+    def __reversed__(self):
+        self.complete()
+        return reversed(dict.keys(self))
+
+    def __len__(self):
+        self.complete()
+        return dict.__len__(self)
+
+    def __eq__(self, other):
+        self.complete()
+        if isinstance(other, LazyRecord):
+            other.complete()
+        return dict.__eq__(self, other)
+
+    def __ne__(self, other):
+        self.complete()
+        if isinstance(other, LazyRecord):
+            other.complete()
+        return dict.__ne__(self, other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        self.complete()
+        return dict.__repr__(self)
+
+    def __delitem__(self, key):
+        self.complete()
+        dict.__delitem__(self, key)
+
+    def __or__(self, other):
+        self.complete()
+        return dict(dict.items(self)) | other
+
+    def __reduce_ex__(self, protocol):
+        # The record is sent as a plain dict, the captured context is not required anymore.
+        self.complete()
+        return (dict, (dict(dict.items(self)),))
+
+    def keys(self):
+        self.complete()
+        return dict.keys(self)
+
+    def values(self):
+        self.complete()
+        return dict.values(self)
+
+    def items(self):
+        self.complete()
+        return dict.items(self)
+
+    def pop(self, *args):
+        self.complete()
+        return dict.pop(self, *args)
+
+    def popitem(self):
+        self.complete()
+        return dict.popitem(self)
+
+    def setdefault(self, key, default=None):
+        self.complete()
+        return dict.setdefault(self, key, default)
+
+    def clear(self):
+        dict.clear(self)
+        self._context = None
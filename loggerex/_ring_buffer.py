@@ -0,0 +1,151 @@
+import struct
+from datetime import datetime, timedelta, timezone
+
+try:
+    from multiprocessing import resource_tracker, shared_memory
+except ImportError:  # The modules are only available starting with Python 3.8.
+    resource_tracker = shared_memory = None
+
+# The header stores the capacity, the total number of bytes written and the total number of bytes
+# read. Positions only ever increase, each of them being updated by a single process.
+_header = struct.Struct("<QQQ")
+_write_offset = 8
+_read_offset = 16
+_position = struct.Struct("<Q")
+
+# Each entry stores the size of the encoded message, the timestamp and the UTC offset of the record.
+_entry = struct.Struct("<Idi")
+
+
+class RingBuffer:
+    """Single-producer single-consumer queue of messages stored in shared memory.
+
+    The positions are published and read by the other process while holding a lock shared by the
+    producer and the consumer. Python provides no memory barrier, acquiring the lock ensures that
+    the entries written before the write position is published are visible to the consumer, and
+    that the entries read before the read position is published are not overwritten.
+
+    The producer notifies the consumer only if it was caught up before the entry was written. If the
+    consumer updates its read position concurrently, the notification may be missed, in which case
+    the entry is only consumed at the next periodic check of the consumer.
+    """
+
+    def __init__(self, memory, lock):
+        self._memory = memory
+        self._lock = lock
+        self._buffer = memory.buf
+        self._capacity = _header.unpack_from(self._buffer)[0]
+
+    @staticmethod
+    def prepare():
+        # The tracker must be started before child processes are created so that they share it.
+        # Otherwise, the tracker of each child would destroy its ring when it exits, possibly before
+        # it was consumed by the parent.
+        resource_tracker.ensure_running()
+
+    @classmethod
+    def create(cls, capacity, lock):
+        memory = shared_memory.SharedMemory(create=True, size=_header.size + capacity)
+        _header.pack_into(memory.buf, 0, capacity, 0, 0)
+        return cls(memory, lock)
+
+    @classmethod
+    def attach(cls, name, lock):
+        return cls(shared_memory.SharedMemory(name=name), lock)
+
+    @property
+    def name(self):
+        return self._memory.name
+
+    def fits(self, data):
+        return _entry.size + len(data) <= self._capacity
+
+    def is_empty(self):
+        written, read = self._get_positions()
+        return read == written
+
+    def has_room(self, data):
+        written, read = self._get_positions()
+        return self._capacity - (written - read) >= _entry.size + len(data)
+
+    def put(self, data, timestamp, utcoffset):
+        """Write the entry, the caller must ensure there is room for it.
+
+        Return whether the consumer was caught up, in which case it may be waiting and needs to be
+        notified.
+        """
+        # Only the producer updates the write position, it can be read without the lock.
+        written = _position.unpack_from(self._buffer, _write_offset)[0]
+        position = self._write(written, _entry.pack(len(data), timestamp, utcoffset))
+        position = self._write(position, data)
+
+        with self._lock:
+            _position.pack_into(self._buffer, _write_offset, position)
+            return _position.unpack_from(self._buffer, _read_offset)[0] == written
+
+    def get_all(self):
+        """Consume the entries, return them as a list of messages associated with their time.
+
+        The read position is published before the entries are decoded, so that an invalid entry
+        raises an error once but does not prevent the following ones from being consumed.
+        """
+        written, position = self._get_positions()
+        raw_entries = []
+
+        while position < written:
+            position, header = self._read(position, _entry.size)
+            size, timestamp, utcoffset = _entry.unpack(header)
+            position, data = self._read(position, size)
+            raw_entries.append((data, timestamp, utcoffset))
+
+        with self._lock:
+            _position.pack_into(self._buffer, _read_offset, position)
+
+        entries = []
+
+        for data, timestamp, utcoffset in raw_entries:
+            tzinfo = timezone(timedelta(seconds=utcoffset))
+            entries.append((data.decode("utf8"), datetime.fromtimestamp(timestamp, tz=tzinfo)))
+
+        return entries
+
+    def close(self):
+        self._buffer = None
+        self._memory.close()
+
+    def unlink(self):
+        self._memory.unlink()
+
+    def _get_positions(self):
+        with self._lock:
+            written = _position.unpack_from(self._buffer, _write_offset)[0]
+            read = _position.unpack_from(self._buffer, _read_offset)[0]
+        return written, read
+
+    def _write(self, position, data):
+        start = _header.size + position % self._capacity
+        end = start + len(data)
+        limit = _header.size + self._capacity
+
+        if end <= limit:
+            self._buffer[start:end] = data
+        else:
+            split = limit - start
+            self._buffer[start:limit] = data[:split]
+            self._buffer[_header.size : _header.size + len(data) - split] = data[split:]
+
+        return position + len(data)
+
+    def _read(self, position, size):
+        start = _header.size + position % self._capacity
+        end = start + size
+        limit = _header.size + self._capacity
+
+        if end <= limit:
+            data = bytes(self._buffer[start:end])
+        else:
+            data = bytes(self._buffer[start:limit]) + bytes(
+                self._buffer[_header.size : _header.size + end - limit]
+            )
+
+        return position + size, data
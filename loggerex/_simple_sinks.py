@@ -6,18 +6,55 @@ from ._asyncio_loop import get_running_loop, get_task_loop
 
 
 class StreamSink:
-    def __init__(self, stream):
+    def __init__(self, stream, flush_policy=None):
         self._stream = stream
         self._flushable = callable(getattr(stream, "flush", None))
         self._stoppable = callable(getattr(stream, "stop", None))
         self._completable = inspect.iscoroutinefunction(getattr(stream, "complete", None))
+        self._flush_policy = flush_policy if self._flushable else None
 
     def write(self, message):
         self._stream.write(message)
+        if self._flush_policy is not None:
+            if self._flush_policy.written(message):
+                self.flush()
+        elif self._flushable:
+            self._stream.flush()
+
+    def write_batch(self, messages):
+        errors = []
+        should_flush = self._flushable and self._flush_policy is None
+
+        for message in messages:
+            try:
+                self._stream.write(message)
+            except Exception as e:
+                errors.append((message, e))
+            else:
+                if self._flush_policy is not None and self._flush_policy.written(message):
+                    should_flush = True
+
+        if should_flush:
+            try:
+                self.flush()
+            except Exception as e:
+                errors.append((messages[-1], e))
+
+        return errors
+
+    @property
+    def flushable(self):
+        return self._flushable
+
+    def flush(self):
+        if self._flush_policy is not None:
+            self._flush_policy.flushed()
         if self._flushable:
             self._stream.flush()
 
     def stop(self):
+        if self._flush_policy is not None and self._flush_policy.is_pending:
+            self.flush()
         if self._stoppable:
             self._stream.stop()
 
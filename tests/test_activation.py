@@ -151,3 +151,57 @@ def test_invalid_enable_name(name):
 def test_invalid_disable_name(name):
     with pytest.raises(TypeError):
         logger.disable(name)
+
+
+def test_callsite_cache_invalidated_by_activation(writer):
+    def log(message):
+        logger.info(message)
+
+    logger.add(writer, format="{name} {message}")
+    log("1")
+    logger.disable("tests")
+    log("2")
+    logger.enable("tests.test_activation")
+    log("3")
+    assert writer.read() == "tests.test_activation 1\ntests.test_activation 3\n"
+
+
+def test_callsite_cache_invalidated_by_activation_while_resolved(writer):
+    class Enabled(dict):
+        def __setitem__(self, name, status):
+            super().__setitem__(name, status)
+            logger.disable(name)
+
+    def log(message):
+        logger.info(message)
+
+    logger._core.enabled = Enabled()
+    logger.add(writer, format="{message}")
+    log("1")
+    log("2")
+    assert writer.read() == "1\n"
+
+
+def test_callsite_cache_same_code_different_globals(writer):
+    code = compile("logger.info('message')", "<dynamic>", "exec")
+    logger.add(writer, format="{name} {module} {message}")
+    logger.disable("foo")
+    exec(code, {"__name__": "foo", "logger": logger})
+    exec(code, {"__name__": "bar", "logger": logger})
+    exec(code, {"__name__": "foo.baz", "logger": logger})
+    assert writer.read() == "bar <dynamic> message\n"
+
+
+def test_callsite_cache_keeps_line_number(writer):
+    logger.add(writer, format="{line} {file} {function}")
+    for _ in range(2):
+        logger.info("first")
+        logger.info("second")
+    first, second, third, fourth = writer.read().splitlines()
+    assert first == third
+    assert second == fourth
+    line_first, file_, function = first.split(" ")
+    line_second, _, _ = second.split(" ")
+    assert int(line_second) == int(line_first) + 1
+    assert file_ == "test_activation.py"
+    assert function == "test_callsite_cache_keeps_line_number"
@@ -1,11 +1,15 @@
+import datetime
+import io
 import pickle
 import re
 import sys
+import threading
 import time
 
 import pytest
 
 from loggerex import logger
+from loggerex._ring_buffer import RingBuffer
 
 from .conftest import default_threading_excepthook
 
@@ -64,6 +68,45 @@ def test_enqueue():
     assert x[0] == "Test\n"
 
 
+def test_enqueue_thread():
+    x = []
+
+    def sink(message):
+        time.sleep(0.1)
+        x.append(message)
+
+    not_picklable = NotPicklable()
+
+    logger.add(sink, format="{message}", enqueue="thread", catch=False)
+    logger.bind(value=not_picklable).debug("Test")
+    assert len(x) == 0
+    logger.complete()
+    assert len(x) == 1
+    assert x[0] == "Test\n"
+    assert x[0].record["extra"]["value"] is not_picklable
+
+
+def test_enqueue_thread_record_resolved_in_caller_thread():
+    class Sink:
+        def __init__(self):
+            self.threads = []
+
+        def write(self, message):
+            self.threads.append(message.record["thread"].name)
+
+    sink = Sink()
+    logger.add(sink, format="{message}", enqueue="thread", catch=False)
+    logger.info("Test")
+    logger.remove()
+
+    assert sink.threads == [threading.current_thread().name]
+
+
+def test_enqueue_invalid_mode(writer):
+    with pytest.raises(ValueError, match="Invalid enqueue mode"):
+        logger.add(writer, enqueue="process")
+
+
 def test_enqueue_with_exception():
     x = []
 
@@ -292,3 +335,317 @@ def test_logging_not_unpicklable_exception(exception_value):
     assert type_ is ValueError
     assert value is None
     assert traceback_ is None
+
+
+@pytest.mark.parametrize("enqueue", [True, "thread"])
+def test_messages_written_in_batch(enqueue):
+    class Stream:
+        def __init__(self):
+            self.written = []
+            self.flushes = 0
+
+        def write(self, message):
+            self.written.append(message)
+
+        def flush(self):
+            self.flushes += 1
+
+    stream = Stream()
+    i = logger.add(stream, format="{message}", enqueue=enqueue, catch=False)
+
+    with logger._core.handlers[i]._queue_lock:
+        for j in range(10):
+            logger.info(j)
+
+    logger.remove()
+
+    assert stream.written == ["%d\n" % j for j in range(10)]
+    assert stream.flushes <= 2
+
+
+@pytest.mark.parametrize("enqueue", [True, "thread"])
+def test_caught_exception_sink_write_batch(enqueue, tmp_path, capsys):
+    filepath = tmp_path / "test.log"
+    i = logger.add(filepath, format="{message}", encoding="ascii", enqueue=enqueue, catch=True)
+
+    with logger._core.handlers[i]._queue_lock:
+        logger.info("It's fine")
+        logger.info("Bye bye... é")
+        logger.info("It's fine again")
+
+    logger.remove()
+
+    out, err = capsys.readouterr()
+    lines = err.strip().splitlines()
+    assert filepath.read_text() == "It's fine\nIt's fine again\n"
+    assert out == ""
+    assert lines[0] == "--- Logging error in Loguru Handler #%d ---" % i
+    assert re.match(r"Record was: \{.*Bye bye.*\}", lines[1])
+    assert "UnicodeEncodeError" in err
+    assert lines[-1] == "--- End of logging error ---"
+
+
+def wait_for_empty_queue(handler):
+    while not handler._queue.empty():
+        time.sleep(0.01)
+
+
+@pytest.mark.parametrize("enqueue", [True, "thread"])
+def test_queue_size_drop_new(writer, enqueue):
+    i = logger.add(
+        writer, format="{message}", enqueue=enqueue, queue_size=2, overflow="drop_new", catch=False
+    )
+
+    with logger._core.handlers[i]._queue_lock:
+        for j in range(5):
+            logger.info(j)
+
+    logger.complete()
+    logger.info("After")
+    assert logger._core.handlers[i].dropped_count == 3
+    logger.remove()
+
+    assert writer.read() == (
+        "0\n1\n3 message(s) dropped because the queue of the handler was full\nAfter\n"
+    )
+
+
+@pytest.mark.parametrize("enqueue", [True, "thread"])
+def test_queue_size_drop_below(writer, enqueue):
+    i = logger.add(
+        writer,
+        format="{level} {message}",
+        enqueue=enqueue,
+        queue_size=1,
+        overflow="drop_below:WARNING",
+        catch=False,
+    )
+
+    with logger._core.handlers[i]._queue_lock:
+        logger.info("A")
+        logger.info("B")
+        logger.debug("C")
+
+    logger.complete()
+    logger.warning("D")
+    logger.remove()
+
+    assert writer.read() == (
+        "INFO A\n"
+        "WARNING 2 message(s) dropped because the queue of the handler was full\n"
+        "WARNING D\n"
+    )
+
+
+def test_queue_size_drop_oldest(writer):
+    i = logger.add(
+        writer,
+        format="{message}",
+        enqueue="thread",
+        queue_size=2,
+        overflow="drop_oldest",
+        catch=False,
+    )
+    handler = logger._core.handlers[i]
+
+    with handler._queue_lock:
+        logger.info(0)
+        wait_for_empty_queue(handler)
+        for j in range(1, 4):
+            logger.info(j)
+
+    logger.complete()
+    logger.info("After")
+    logger.remove()
+
+    assert writer.read() == (
+        "0\n3\n2 message(s) dropped because the queue of the handler was full\nAfter\n"
+    )
+
+
+@pytest.mark.parametrize("enqueue", [True, "thread"])
+def test_queue_size_block(writer, enqueue):
+    i = logger.add(writer, format="{message}", enqueue=enqueue, queue_size=1, catch=False)
+    handler = logger._core.handlers[i]
+
+    with handler._queue_lock:
+        logger.info("A")
+        wait_for_empty_queue(handler)
+        thread = threading.Thread(target=logger.info, args=("B",))
+        thread.start()
+        thread.join(0.1)
+        assert thread.is_alive()
+
+    thread.join()
+    logger.remove()
+
+    assert writer.read() == "A\nB\n"
+
+
+@pytest.mark.parametrize(
+    ("kwargs", "exception", "message"),
+    [
+        ({"queue_size": 10}, ValueError, "requires 'enqueue' to be enabled"),
+        ({"queue_size": 0, "enqueue": True}, ValueError, "Invalid queue_size"),
+        ({"queue_size": "10", "enqueue": True}, TypeError, "Invalid queue_size"),
+        ({"queue_size": 10, "enqueue": True, "overflow": None}, TypeError, "Invalid overflow"),
+        ({"queue_size": 10, "enqueue": True, "overflow": "drop"}, ValueError, "Invalid overflow"),
+        ({"queue_size": 10, "enqueue": True, "overflow": "drop_below"}, ValueError, "Invalid"),
+        ({"queue_size": 10, "enqueue": True, "overflow": "drop_new:INFO"}, ValueError, "Invalid"),
+        ({"queue_size": 10, "enqueue": True, "overflow": "drop_below:FOO"}, ValueError, "FOO"),
+        ({"queue_size": 10, "enqueue": True, "overflow": "drop_oldest"}, ValueError, "requires"),
+    ],
+)
+def test_invalid_queue_size_or_overflow(writer, kwargs, exception, message):
+    with pytest.raises(exception, match=message):
+        logger.add(writer, **kwargs)
+
+
+requires_shared_memory = pytest.mark.skipif(
+    sys.version_info < (3, 8), reason="Shared memory requires Python 3.8+"
+)
+
+
+@requires_shared_memory
+def test_enqueue_shared_memory(tmp_path):
+    filepath = tmp_path / "test.log"
+    logger.add(filepath, format="{message}", enqueue="shared_memory", catch=False)
+
+    for i in range(100):
+        logger.info("Message {}", i)
+
+    logger.complete()
+    assert filepath.read_text() == "".join("Message %d\n" % i for i in range(100))
+    logger.remove()
+
+
+@requires_shared_memory
+def test_enqueue_shared_memory_message_larger_than_ring(tmp_path, monkeypatch):
+    monkeypatch.setattr("loggerex._handler.Handler._ring_size", 64)
+    filepath = tmp_path / "test.log"
+    logger.add(filepath, format="{message}", enqueue="shared_memory", catch=False)
+
+    logger.info("A")
+    logger.info("B" * 100)
+    logger.info("C")
+    logger.remove()
+
+    assert filepath.read_text() == "A\n" + "B" * 100 + "\nC\n"
+
+
+@requires_shared_memory
+def test_enqueue_shared_memory_ring_wraparound(tmp_path, monkeypatch):
+    monkeypatch.setattr("loggerex._handler.Handler._ring_size", 100)
+    filepath = tmp_path / "test.log"
+    logger.add(filepath, format="{message}", enqueue="shared_memory", catch=False)
+
+    for i in range(1000):
+        logger.info("Message {}", i)
+
+    logger.remove()
+    assert filepath.read_text() == "".join("Message %d\n" % i for i in range(1000))
+
+
+@requires_shared_memory
+def test_enqueue_shared_memory_ring_full_timeout(monkeypatch):
+    monkeypatch.setattr("loggerex._handler.Handler._ring_size", 64)
+    monkeypatch.setattr("loggerex._handler.Handler._ring_timeout", 0.01)
+    event = threading.Event()
+    messages = []
+
+    class Sink:
+        def write(self, message):
+            event.wait()
+            messages.append(message)
+
+    logger.add(Sink(), format="{message}", enqueue="shared_memory", catch=False)
+
+    for i in range(10):
+        logger.info("Message {}", i)
+
+    event.set()
+    logger.remove()
+
+    assert sorted(messages) == ["Message %d\n" % i for i in range(10)]
+
+
+@requires_shared_memory
+def test_enqueue_shared_memory_record_time():
+    class Sink:
+        def __init__(self):
+            self.records = []
+
+        def write(self, message):
+            self.records.append(message.record)
+
+    tzinfo = datetime.timezone(datetime.timedelta(hours=2))
+    now = datetime.datetime(2018, 6, 9, 11, 30, 45, 123456, tzinfo=tzinfo)
+
+    sink = Sink()
+    logger.add(sink, format="{message}", enqueue="shared_memory", catch=False)
+    logger.patch(lambda record: record.update(time=now)).info("Test")
+    logger.remove()
+
+    assert sink.records == [{"time": now}]
+    assert sink.records[0]["time"].utcoffset() == datetime.timedelta(hours=2)
+
+
+@requires_shared_memory
+def test_enqueue_shared_memory_invalid_entry():
+    ring = RingBuffer.create(64, threading.Lock())
+
+    try:
+        ring.put(b"\xff", 0, 0)
+        with pytest.raises(UnicodeDecodeError):
+            ring.get_all()
+
+        ring.put(b"Test", 0, 0)
+        assert [text for text, _ in ring.get_all()] == ["Test"]
+        assert ring.is_empty()
+    finally:
+        ring.close()
+        ring.unlink()
+
+
+@requires_shared_memory
+def test_enqueue_shared_memory_caught_exception_ring_get(monkeypatch, capsys):
+    get_all = RingBuffer.get_all
+
+    def get_all_failing(self):
+        entries = get_all(self)
+        if any(text.startswith("Bye") for text, _ in entries):
+            raise ValueError("Invalid entry")
+        return entries
+
+    stream = io.StringIO()
+    monkeypatch.setattr(RingBuffer, "get_all", get_all_failing)
+    logger.add(stream, enqueue="shared_memory", catch=True, format="{message}")
+
+    logger.info("It's fine")
+    logger.complete()
+    logger.info("Bye bye...")
+    logger.complete()
+    logger.info("It's fine again")
+    logger.remove()
+
+    out, err = capsys.readouterr()
+    lines = err.strip().splitlines()
+    assert stream.getvalue() == "It's fine\nIt's fine again\n"
+    assert out == ""
+    assert lines[0] == "--- Logging error in Loguru Handler #0 ---"
+    assert lines[1] == "Record was: None"
+    assert "ValueError: Invalid entry" in err
+    assert lines[-1] == "--- End of logging error ---"
+
+
+@pytest.mark.parametrize(
+    ("kwargs", "message"),
+    [
+        ({"sink": lambda m: None}, "only supports file and stream sinks"),
+        ({"sink": sys.stderr, "queue_size": 10}, "'queue_size' parameter is not supported"),
+    ],
+)
+@requires_shared_memory
+def test_enqueue_shared_memory_invalid(kwargs, message):
+    with pytest.raises(ValueError, match=message):
+        logger.add(enqueue="shared_memory", **kwargs)
@@ -1,7 +1,10 @@
+import io
 import re
+from unittest.mock import Mock
 
 import pytest
 
+import loggerex
 from loggerex import logger
 
 
@@ -149,3 +152,80 @@ def test_invalid_filter_builtin(writer):
         ),
     ):
         logger.add(writer, filter=filter)
+
+
+def test_filtered_out_handlers_not_called(writer, monkeypatch):
+    emitted = []
+    emit = loggerex._handler.Handler.emit
+
+    def patched_emit(self, record, *args):
+        emitted.append(self.levelno)
+        return emit(self, record, *args)
+
+    monkeypatch.setattr(loggerex._handler.Handler, "emit", patched_emit)
+    logger.add(writer, filter="tests", level=1, format="{message}")
+    logger.add(writer, filter="unrelated", level=2)
+    logger.add(writer, filter={"": False}, level=3)
+    logger.add(writer, level="ERROR")
+
+    logger.info("Test")
+
+    assert emitted == [1]
+    assert writer.read() == "Test\n"
+
+
+def test_name_filter_resolved_once(writer, monkeypatch):
+    filter_by_level = Mock(side_effect=loggerex._filters.filter_by_level)
+    monkeypatch.setattr(loggerex._filters, "filter_by_level", filter_by_level)
+    logger.add(writer, filter={"tests": "INFO"}, format="{message}")
+
+    for _ in range(3):
+        logger.debug("A")
+        logger.info("B")
+
+    assert filter_by_level.call_count == 2
+    assert writer.read() == "B\nB\nB\n"
+
+
+def test_handlers_resolved_again_on_add_and_remove(writer):
+    other = io.StringIO()
+    logger.add(writer, filter="tests", format="{message}")
+    logger.info("A")
+    i = logger.add(other, filter="tests", format="{message}")
+    logger.info("B")
+    logger.remove(i)
+    logger.info("C")
+
+    assert writer.read() == "A\nB\nC\n"
+    assert other.getvalue() == "B\n"
+
+
+def test_handlers_resolved_with_patched_name_and_level(writer):
+    logger.add(writer, filter={"": False, "foo": "ERROR"}, format="{name} {level.no} {message}")
+    patched = logger.patch(lambda r: r.update(name="foo.bar"))
+
+    logger.info("A")
+    patched.info("B")
+    patched.patch(lambda r: r.update(level=logger.level("ERROR"))).info("C")
+
+    assert writer.read() == "foo.bar 40 C\n"
+
+
+def test_handlers_resolution_cache_is_bounded(writer):
+    logger.add(writer, filter="foo", format="{message}")
+
+    for i in range(5000):
+        logger.patch(lambda r, i=i: r.update(name="foo.%d" % i)).info("A")
+
+    assert len(logger._core.dispatch) <= 4096
+    assert writer.read() == "A\n" * 5000
+
+
+def test_filter_dict_thresholds_of_closest_parent():
+    thresholds = {"": 10, "a": 20, "a.b.c": float("inf"), "a.b.c.d.e": 30}
+
+    assert loggerex._filters.filter_by_level("a.b.c.d.e.f", 30, thresholds)
+    assert not loggerex._filters.filter_by_level("a.b.c.d", 50, thresholds)
+    assert not loggerex._filters.filter_by_level("a.b", 10, thresholds)
+    assert loggerex._filters.filter_by_level("z", 10, thresholds)
+    assert loggerex._filters.filter_by_level("z", 0, {"a": 10})
@@ -0,0 +1,210 @@
+import io
+import time
+
+import pytest
+
+from loggerex import logger
+
+
+class FlushCounterStream:
+    def __init__(self):
+        self.written = ""
+        self.flushed = ""
+        self.flush_count = 0
+
+    def write(self, message):
+        self.written += message
+
+    def flush(self):
+        self.flushed = self.written
+        self.flush_count += 1
+
+
+def test_flush_always_by_default():
+    stream = FlushCounterStream()
+    logger.add(stream, format="{message}")
+    logger.info("A")
+    logger.info("B")
+    assert stream.flushed == "A\nB\n"
+    assert stream.flush_count == 2
+
+
+def test_flush_size():
+    stream = FlushCounterStream()
+    logger.add(stream, format="{message}", flush="size:11 B")
+    logger.info("1234")
+    logger.info("5678")
+    assert stream.flushed == ""
+    logger.info("9")
+    assert stream.flushed == "1234\n5678\n9\n"
+    assert stream.flush_count == 1
+
+
+def test_flush_level():
+    stream = FlushCounterStream()
+    logger.add(stream, format="{message}", flush="level:ERROR")
+    logger.info("A")
+    logger.warning("B")
+    assert stream.flushed == ""
+    logger.error("C")
+    assert stream.flushed == "A\nB\nC\n"
+    logger.critical("D")
+    assert stream.flushed == "A\nB\nC\nD\n"
+
+
+def test_flush_interval_timer():
+    stream = FlushCounterStream()
+    logger.add(stream, format="{message}", flush="interval:50ms")
+    logger.info("A")
+    assert stream.flushed == ""
+
+    for _ in range(100):
+        time.sleep(0.01)
+        if stream.flushed:
+            break
+
+    assert stream.flushed == "A\n"
+
+
+def test_flush_interval_on_write(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("loggerex._flush_policy.time.monotonic", lambda: now[0])
+    stream = FlushCounterStream()
+    logger.add(stream, format="{message}", flush="interval:1h")
+    logger.info("A")
+    now[0] += 3599
+    logger.info("B")
+    assert stream.flushed == ""
+    now[0] += 1
+    logger.info("C")
+    assert stream.flushed == "A\nB\nC\n"
+
+
+def test_flush_combined_policies():
+    stream = FlushCounterStream()
+    logger.add(stream, format="{message}", flush="interval:1h, size:1 KB, level:WARNING")
+    logger.info("A")
+    assert stream.flushed == ""
+    logger.warning("B")
+    assert stream.flushed == "A\nB\n"
+    logger.info("C" * 1000)
+    assert stream.flushed == "A\nB\n" + "C" * 1000 + "\n"
+
+
+def test_flush_on_remove():
+    stream = FlushCounterStream()
+    logger.add(stream, format="{message}", flush="interval:1h")
+    logger.info("A")
+    logger.remove()
+    assert stream.flushed == "A\n"
+
+
+def test_flush_with_enqueue():
+    stream = FlushCounterStream()
+    logger.add(stream, format="{message}", flush="level:ERROR", enqueue=True)
+    logger.info("A")
+    logger.complete()
+    assert stream.written == "A\n"
+    assert stream.flushed == ""
+    logger.error("B")
+    logger.complete()
+    assert stream.flushed == "A\nB\n"
+
+
+def test_flush_non_flushable_stream():
+    stream = io.StringIO()
+    logger.add(stream.write, format="{message}")
+    logger.add(type("Stream", (), {"write": stream.write})(), format="{message}", flush="size:1KB")
+    logger.info("A")
+    assert stream.getvalue() == "A\nA\n"
+
+
+def test_flush_interval_non_flushable_stream(capsys):
+    stream = io.StringIO()
+    logger.add(
+        type("Stream", (), {"write": stream.write})(), format="{message}", flush="interval:10ms"
+    )
+    logger.info("A")
+    time.sleep(0.05)
+    logger.remove()
+
+    assert stream.getvalue() == "A\n"
+    out, err = capsys.readouterr()
+    assert out == err == ""
+
+
+def test_flush_file_buffered(tmp_path):
+    file = tmp_path / "test.log"
+    logger.add(file, format="{message}", flush="level:ERROR")
+    logger.info("A")
+    assert file.read_text() == ""
+    logger.error("B")
+    assert file.read_text() == "A\nB\n"
+    logger.info("C")
+    logger.remove()
+    assert file.read_text() == "A\nB\nC\n"
+
+
+def test_flush_file_size(tmp_path):
+    file = tmp_path / "test.log"
+    logger.add(file, format="{message}", flush="size:10 KB")
+    logger.info("A" * 9000)
+    assert file.read_text() == ""
+    logger.info("B" * 1000)
+    assert file.read_text() == "A" * 9000 + "\n" + "B" * 1000 + "\n"
+
+
+def test_flush_file_explicit_buffering(tmp_path):
+    file = tmp_path / "test.log"
+    logger.add(file, format="{message}", flush="level:ERROR", buffering=1)
+    logger.info("A")
+    assert file.read_text() == "A\n"
+
+
+def test_flush_file_with_rotation(tmp_path):
+    logger.add(tmp_path / "test.log", format="{message}", flush="interval:1h", rotation="8 B")
+    logger.info("AAAAAA")
+    logger.info("BBBBBB")
+    files = sorted(tmp_path.iterdir())
+    assert len(files) == 2
+    assert sorted(f.read_text() for f in files) == ["", "AAAAAA\n"]
+
+
+@pytest.mark.parametrize(
+    "flush",
+    [
+        "",
+        "never",
+        "interval",
+        "interval:",
+        "interval:foo",
+        "size:-1",
+        "size:foo",
+        "level:",
+        "size:1KB,size:2KB",
+    ],
+)
+def test_invalid_flush(flush):
+    with pytest.raises(ValueError, match=r"Invalid flush"):
+        logger.add(FlushCounterStream(), flush=flush)
+
+
+@pytest.mark.parametrize("flush", [None, 1, True])
+def test_invalid_flush_type(flush):
+    with pytest.raises(TypeError, match=r"Invalid flush, it should be a string"):
+        logger.add(FlushCounterStream(), flush=flush)
+
+
+def test_invalid_flush_level():
+    with pytest.raises(ValueError, match=r"Level 'foo' does not exist"):
+        logger.add(FlushCounterStream(), flush="level:foo")
+
+
+def test_invalid_flush_sink():
+    with pytest.raises(ValueError, match=r"only supports file and stream sinks"):
+        logger.add(lambda m: None, flush="size:1KB")
+
+
+def test_invalid_flush_with_shared_memory_level():
+    with pytest.raises(ValueError, match=r"not supported with the 'shared_memory'"):
+        logger.add(FlushCounterStream(), flush="level:ERROR", enqueue="shared_memory")
@@ -248,3 +248,110 @@ def test_invalid_time_format(writer, time_format):
     logger.add(writer, format="{time:%s} {message}" % time_format, catch=False)
     with pytest.raises(ValueError, match="Invalid time format"):
         logger.info("Test")
+
+
+def test_local_timezone_cached_between_transitions(monkeypatch):
+    get_tzinfo = Mock(wraps=loggerex._datetime._get_tzinfo)
+    clock = Mock(return_value=1700000000.5)
+    monkeypatch.setattr(loggerex._datetime, "_get_tzinfo", get_tzinfo)
+    monkeypatch.setattr(loggerex._datetime, "time", clock)
+    monkeypatch.setattr(loggerex._datetime, "_tzinfo_cache", (None, 0, 0, None))
+
+    first = loggerex._datetime.aware_now()
+    clock.return_value += 60
+    second = loggerex._datetime.aware_now()
+
+    assert get_tzinfo.call_count == 1
+    assert second - first == datetime.timedelta(seconds=60)
+    assert second.timestamp() == 1700000060.5
+
+    clock.return_value += 900
+    loggerex._datetime.aware_now()
+
+    assert get_tzinfo.call_count == 2
+
+
+def test_local_timezone_cache_invalidated_by_tzset(monkeypatch):
+    get_tzinfo = Mock(wraps=loggerex._datetime._get_tzinfo)
+    monkeypatch.setattr(loggerex._datetime, "_get_tzinfo", get_tzinfo)
+    monkeypatch.setattr(loggerex._datetime, "time", lambda: 1700000000.5)
+    monkeypatch.setattr(loggerex._datetime, "_tzinfo_cache", (None, 0, 0, None))
+
+    loggerex._datetime.aware_now()
+    loggerex._datetime.aware_now()
+    assert get_tzinfo.call_count == 1
+
+    monkeypatch.setattr(loggerex._datetime.time_module, "tzname", ("A", "B"))
+    loggerex._datetime.aware_now()
+    assert get_tzinfo.call_count == 2
+
+
+def test_utc_environment_variable(writer, freeze_time, monkeypatch):
+    monkeypatch.setattr(loggerex._defaults, "LOGURU_UTC", True)
+    logger.add(writer, format="{time:YYYY-MM-DD HH:mm:ss Z zz}")
+
+    with freeze_time("2018-06-09 01:02:03", ("ABC", 7200)):
+        logger.info("Test")
+
+    assert writer.read() == "2018-06-08 23:02:03 +00:00 UTC\n"
+
+
+def test_formatting_cached_within_same_second():
+    formatter = loggerex._datetime._compile_format("YYYY-MM-DD HH:mm:ss.SSSSSS ZZ zz X")
+    tzinfo = datetime.timezone(datetime.timedelta(hours=2), "ABC")
+    dt = loggerex._datetime.datetime(2020, 1, 2, 3, 4, 5, 6, tzinfo=tzinfo)
+
+    assert formatter(dt) == "2020-01-02 03:04:05.000006 +0200 ABC 1577927045"
+    assert formatter(dt) == "2020-01-02 03:04:05.000006 +0200 ABC 1577927045"
+    assert formatter(dt.replace(microsecond=999999)) == (
+        "2020-01-02 03:04:05.999999 +0200 ABC 1577927045"
+    )
+    assert formatter(dt.replace(second=6)) == "2020-01-02 03:04:06.000006 +0200 ABC 1577927046"
+    assert formatter(dt.replace(year=2021)) == "2021-01-02 03:04:05.000006 +0200 ABC 1609549445"
+
+    other_tzinfo = datetime.timezone(datetime.timedelta(hours=3), "DEF")
+    assert formatter(dt.replace(tzinfo=other_tzinfo)) == (
+        "2020-01-02 03:04:05.000006 +0300 DEF 1577923445"
+    )
+
+
+def test_formatting_cached_escapes_percent_sign():
+    formatter = loggerex._datetime._compile_format("HH:mm:ss.SSS zz")
+    tzinfo = datetime.timezone(datetime.timedelta(0), "%d%%")
+    dt = loggerex._datetime.datetime(2020, 1, 2, 3, 4, 5, 123456, tzinfo=tzinfo)
+
+    assert formatter(dt) == "03:04:05.123 %d%%"
+    assert formatter(dt.replace(microsecond=654321)) == "03:04:05.654 %d%%"
+
+
+def test_formatting_cached_percent_sign_without_sub_second():
+    formatter = loggerex._datetime._compile_format("HH:mm zz")
+    tzinfo = datetime.timezone(datetime.timedelta(0), "A%B")
+    dt = loggerex._datetime.datetime(2020, 1, 2, 3, 4, 5, 123456, tzinfo=tzinfo)
+
+    assert formatter(dt) == "03:04 A%B"
+    assert formatter(dt.replace(microsecond=654321)) == "03:04 A%B"
+
+
+def test_formatting_shared_between_handlers(writer, monkeypatch):
+    formatter = Mock(wraps=loggerex._datetime._format_timezone)
+    monkeypatch.setattr(loggerex._datetime, "_format_timezone", formatter)
+    loggerex._datetime._compile_format.cache_clear()
+
+    tzinfo = datetime.timezone(datetime.timedelta(hours=2), "ABC")
+    dt = loggerex._datetime.datetime(2018, 6, 9, 1, 2, 3, 456000, tzinfo=tzinfo)
+
+    logger.add(writer, format="{time:YYYY-MM-DD HH:mm:ss.SSS Z} {message}")
+    logger.add(writer, format="{time:YYYY-MM-DD HH:mm:ss.SSS Z} {message}")
+
+    logger.patch(lambda r: r.update(time=dt)).info("A")
+    dt = dt.replace(microsecond=556000)
+    logger.patch(lambda r: r.update(time=dt)).info("B")
+
+    assert formatter.call_count == 1
+    assert writer.read() == (
+        "2018-06-09 01:02:03.456 +02:00 A\n"
+        "2018-06-09 01:02:03.456 +02:00 A\n"
+        "2018-06-09 01:02:03.556 +02:00 B\n"
+        "2018-06-09 01:02:03.556 +02:00 B\n"
+    )
@@ -1,11 +1,15 @@
+import bz2
+import lzma
 import os
 import sys
 import threading
 import time
+import zlib
 from unittest.mock import Mock
 
 import pytest
 
+import loggerex
 from loggerex import logger
 
 from .conftest import check_dir
@@ -265,6 +269,380 @@ def test_exception_during_compression_at_remove(tmp_path, capsys, delay):
     assert out == err == ""
 
 
+@pytest.mark.parametrize("background", [True, "thread", "process"])
+def test_background_compression_at_rotation(tmp_path, freeze_time, background):
+    with freeze_time("2010-10-09 11:30:59"):
+        logger.add(
+            tmp_path / "file.log",
+            format="{message}",
+            rotation=0,
+            compression="gz",
+            background=background,
+        )
+        logger.debug("After compression")
+        logger.complete()
+
+        check_dir(
+            tmp_path,
+            files=[
+                ("file.2010-10-09_11-30-59_000000.log.gz", None),
+                ("file.log", "After compression\n"),
+            ],
+        )
+
+
+def test_background_compression_does_not_block_rotation(tmp_path):
+    event = threading.Event()
+
+    def compression(filepath):
+        event.wait(5)
+        os.rename(filepath, filepath + ".mv")
+
+    def rotation(message, _):
+        return message.record["extra"].get("rotate", False)
+
+    logger.add(
+        tmp_path / "test.log",
+        format="{message}",
+        compression=compression,
+        rotation=rotation,
+        background=True,
+    )
+
+    logger.info("Before")
+    logger.bind(rotate=True).info("Rotation")
+    logger.info("After")
+
+    assert (tmp_path / "test.log").read_text() == "Rotation\nAfter\n"
+    assert (tmp_path / ".test.log.pending").is_file()
+
+    event.set()
+    logger.remove()
+
+    check_dir(tmp_path, size=2)
+    assert not (tmp_path / ".test.log.pending").exists()
+
+
+def test_background_compression_at_remove_without_rotation(tmp_path):
+    logger.add(tmp_path / "file.log", format="{message}", compression="gz", background=True)
+    logger.debug("test")
+    logger.remove()
+
+    check_dir(tmp_path, files=[("file.log.gz", None)])
+
+
+def test_background_compression_recovered_at_startup(tmp_path):
+    rotated = tmp_path / "file.2020-01-01_00-00-00_000000.log"
+    rotated.write_text("Rotated\n")
+    (tmp_path / "file.2020-01-02_00-00-00_000000.log").write_text("Not pending\n")
+    (tmp_path / ".file.log.pending").write_text(
+        str(rotated) + "\n" + str(tmp_path / "missing.log") + "\n"
+    )
+
+    logger.add(
+        tmp_path / "file.log",
+        format="{message}",
+        rotation="10 MB",
+        compression="gz",
+        background=True,
+    )
+    logger.debug("test")
+    logger.remove()
+
+    check_dir(
+        tmp_path,
+        files=[
+            ("file.2020-01-01_00-00-00_000000.log.gz", None),
+            ("file.2020-01-02_00-00-00_000000.log", "Not pending\n"),
+            ("file.log", "test\n"),
+        ],
+    )
+
+
+def test_exception_during_background_compression(freeze_time, tmp_path, capsys):
+    with freeze_time("2017-07-01") as frozen:
+        logger.add(
+            tmp_path / "test.log",
+            format="{message}",
+            compression=Mock(side_effect=[OSError("Compression error"), None]),
+            rotation=0,
+            catch=False,
+            background=True,
+        )
+        logger.debug("AAA")
+        logger.complete()
+
+        frozen.tick()
+
+        with pytest.raises(OSError, match="^Compression error$"):
+            logger.debug("BBB")
+
+        logger.remove()
+
+    out, err = capsys.readouterr()
+    assert out == err == ""
+
+    # The file which could not be compressed is kept for a new attempt at next startup.
+    journal = tmp_path / ".test.log.pending"
+    assert journal.read_text() == str(tmp_path / "test.2017-07-01_00-00-00_000000.log") + "\n"
+
+
+def test_exception_during_background_compression_at_remove(tmp_path):
+    logger.add(
+        tmp_path / "test.log",
+        format="{message}",
+        compression=Mock(side_effect=OSError("Compression error")),
+        catch=True,
+        background=True,
+    )
+    logger.debug("AAA")
+
+    with pytest.raises(OSError, match="^Compression error$"):
+        logger.remove()
+
+
+@pytest.mark.parametrize(
+    ("background", "exception"), [(1, TypeError), (None, TypeError), ("pool", ValueError)]
+)
+def test_invalid_background(tmp_path, background, exception):
+    with pytest.raises(exception):
+        logger.add(tmp_path / "test.log", compression="gz", background=background)
+
+
+def decompress(path, ext):
+    data = path.read_bytes()
+    if ext == "gz":
+        # The last member may not be terminated yet, which the "gzip" module doesn't support.
+        result = b""
+        while data:
+            decompressor = zlib.decompressobj(31)
+            result += decompressor.decompress(data)
+            data = decompressor.unused_data
+        return result.decode("utf8")
+    if ext == "bz2":
+        return bz2.decompress(data).decode("utf8")
+    return lzma.decompress(data).decode("utf8")
+
+
+@pytest.mark.parametrize("ext", ["gz", "bz2", "xz"])
+def test_stream_compression(tmp_path, ext):
+    logger.add(
+        tmp_path / "file.log", format="{message}", compression=ext, compression_mode="stream"
+    )
+    logger.info("A")
+    logger.info("B")
+    logger.remove()
+
+    check_dir(tmp_path, files=[("file.log.%s" % ext, None)])
+    assert decompress(tmp_path / ("file.log.%s" % ext), ext) == "A\nB\n"
+
+
+@pytest.mark.parametrize("ext", ["gz", "bz2", "xz"])
+def test_stream_compression_append(tmp_path, ext):
+    for message in ["A", "B"]:
+        logger.add(
+            tmp_path / "file.log", format="{message}", compression=ext, compression_mode="stream"
+        )
+        logger.info(message)
+        logger.remove()
+
+    assert decompress(tmp_path / ("file.log.%s" % ext), ext) == "A\nB\n"
+
+
+@pytest.mark.parametrize("ext", ["gz", "bz2", "xz"])
+def test_stream_compression_rotation_size_counted_before_compression(tmp_path, ext):
+    logger.add(
+        tmp_path / "file.log", format="{message}", compression=ext, compression_mode="stream"
+    )
+    logger.info("12345678")
+    logger.remove()
+
+    logger.add(
+        tmp_path / "file.log",
+        format="{message}",
+        rotation="12 B",
+        compression=ext,
+        compression_mode="stream",
+    )
+    logger.info("AB")
+    check_dir(tmp_path, size=1)
+    logger.info("C")
+    logger.remove()
+
+    check_dir(tmp_path, size=2)
+    assert decompress(tmp_path / ("file.log.%s" % ext), ext) == "C\n"
+
+
+@pytest.mark.parametrize("ext", ["gz", "bz2", "xz"])
+def test_stream_compression_sync_flush(tmp_path, monkeypatch, ext):
+    monkeypatch.setattr("loggerex._file_sink.FileSink._sync_interval", 0)
+    logger.add(
+        tmp_path / "file.log", format="{message}", compression=ext, compression_mode="stream"
+    )
+    logger.info("A")
+    assert decompress(tmp_path / ("file.log.%s" % ext), ext) == "A\n"
+    logger.info("B")
+    assert decompress(tmp_path / ("file.log.%s" % ext), ext) == "A\nB\n"
+
+
+def test_stream_compression_not_flushed_before_interval(tmp_path):
+    logger.add(
+        tmp_path / "file.log", format="{message}", compression="gz", compression_mode="stream"
+    )
+    logger.info("A")
+    logger.info("B")
+    assert decompress(tmp_path / "file.log.gz", "gz") == ""
+
+
+def test_stream_compression_at_rotation(tmp_path, freeze_time):
+    with freeze_time("2010-10-09 11:30:59"):
+        logger.add(
+            tmp_path / "file.log",
+            format="{message}",
+            rotation=0,
+            compression="gz",
+            compression_mode="stream",
+        )
+        logger.debug("After rotation")
+        logger.remove()
+
+    check_dir(tmp_path, size=2)
+    assert decompress(tmp_path / "file.2010-10-09_11-30-59_000000.log.gz", "gz") == ""
+    assert decompress(tmp_path / "file.log.gz", "gz") == "After rotation\n"
+
+
+@pytest.mark.parametrize(
+    ("kwargs", "exception", "message"),
+    [
+        ({"compression": "gz", "compression_mode": "foo"}, ValueError, "Invalid compression mode"),
+        ({"compression": "gz", "compression_mode": None}, TypeError, "Invalid compression mode"),
+        ({"compression": None, "compression_mode": "stream"}, ValueError, "requires one of"),
+        ({"compression": "zip", "compression_mode": "stream"}, ValueError, "requires one of"),
+        ({"compression": "lzma", "compression_mode": "stream"}, ValueError, "requires one of"),
+        ({"compression": "gz", "compression_mode": "stream", "mode": "a+"}, ValueError, "mode"),
+    ],
+)
+def test_invalid_stream_compression(tmp_path, kwargs, exception, message):
+    with pytest.raises(exception, match=message):
+        logger.add(tmp_path / "file.log", **kwargs)
+
+
+@pytest.mark.parametrize("ext", ["gz", "bz2", "xz"])
+def test_parallel_compression_single_block(tmp_path, ext):
+    logger.add(
+        tmp_path / "file.log", format="{message}", compression=ext, compression_mode="parallel"
+    )
+    logger.info("Test")
+    logger.remove()
+
+    check_dir(tmp_path, size=1)
+    assert decompress(tmp_path / ("file.log." + ext), ext) == "Test\n"
+
+
+@pytest.mark.parametrize("ext", ["gz", "bz2", "xz"])
+def test_parallel_compression_blocks(tmp_path, monkeypatch, ext):
+    monkeypatch.setattr(
+        loggerex._file_sink.Compression, "parallel_block_sizes", frozenset({ext: 64}.items())
+    )
+    logger.add(
+        tmp_path / "file.log", format="{message}", compression=ext, compression_mode="parallel:2"
+    )
+
+    for i in range(50):
+        logger.info("Message {}", i)
+
+    logger.remove()
+
+    check_dir(tmp_path, size=1)
+    expected = "".join("Message %d\n" % i for i in range(50))
+    assert decompress(tmp_path / ("file.log." + ext), ext) == expected
+
+
+def test_parallel_compression_blocks_are_independent(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        loggerex._file_sink.Compression, "parallel_block_sizes", frozenset({"xz": 10}.items())
+    )
+    logger.add(
+        tmp_path / "file.log", format="{message}", compression="xz", compression_mode="parallel:2"
+    )
+    logger.info("A" * 14)
+    logger.remove()
+
+    data = (tmp_path / "file.log.xz").read_bytes()
+    blocks = [b"A" * 10, b"A" * 4 + b"\n"]
+    assert data == b"".join(lzma.compress(block, format=lzma.FORMAT_XZ) for block in blocks)
+
+
+def test_parallel_compression_in_background_process(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        loggerex._file_sink.Compression, "parallel_block_sizes", frozenset({"gz": 8}.items())
+    )
+    logger.add(
+        tmp_path / "file.log",
+        format="{message}",
+        compression="gz",
+        compression_mode="parallel:2",
+        background="process",
+    )
+    logger.info("Test" * 10)
+    logger.remove()
+
+    assert decompress(tmp_path / "file.log.gz", "gz") == "Test" * 10 + "\n"
+
+
+@pytest.mark.parametrize(("level", "flag"), [(1, 4), (9, 2), (None, 2)])
+@pytest.mark.parametrize("mode", ["close", "stream", "parallel"])
+def test_compression_level_gz(tmp_path, level, flag, mode):
+    logger.add(
+        tmp_path / "file.log", compression="gz", compression_mode=mode, compression_level=level
+    )
+    logger.info("Test")
+    logger.remove()
+
+    # The "XFL" field of the gzip header indicates the fastest (4) or the best (2) compression.
+    assert (tmp_path / "file.log.gz").read_bytes()[8] == flag
+
+
+@pytest.mark.parametrize("ext", ["bz2", "xz", "lzma", "tar.gz", "tar.bz2", "tar.xz"])
+def test_compression_level(tmp_path, ext):
+    logger.add(tmp_path / "file.log", compression=ext, compression_level=1)
+    logger.info("Test")
+    logger.remove()
+
+    check_dir(tmp_path, size=1)
+    assert (tmp_path / ("file.log." + ext)).exists()
+
+
+@pytest.mark.parametrize(
+    ("kwargs", "exception", "message"),
+    [
+        ({"compression": "gz", "compression_level": "9"}, TypeError, "Invalid compression_level"),
+        ({"compression": "gz", "compression_level": True}, TypeError, "Invalid compression_level"),
+        ({"compression": "gz", "compression_level": 10}, ValueError, "between 0 and 9"),
+        ({"compression": "xz", "compression_level": -1}, ValueError, "between 0 and 9"),
+        ({"compression": "bz2", "compression_level": 0}, ValueError, "between 1 and 9"),
+        ({"compression": "zip", "compression_level": 1}, ValueError, "requires one of"),
+        ({"compression": "tar", "compression_level": 1}, ValueError, "requires one of"),
+        ({"compression": None, "compression_level": 1}, ValueError, "requires one of"),
+        ({"compression": "zip", "compression_mode": "parallel"}, ValueError, "requires one of"),
+        ({"compression": None, "compression_mode": "parallel"}, ValueError, "requires one of"),
+        ({"compression": "gz", "compression_mode": "parallel:0"}, ValueError, "parallel workers"),
+        ({"compression": "gz", "compression_mode": "parallel:a"}, ValueError, "parallel workers"),
+        ({"compression": "gz", "compression_mode": "parallels"}, ValueError, "Invalid compression"),
+    ],
+)
+def test_invalid_compression_level_or_parallel_mode(tmp_path, kwargs, exception, message):
+    with pytest.raises(exception, match=message):
+        logger.add(tmp_path / "file.log", **kwargs)
+
+
+def test_invalid_parallel_compression_with_function(tmp_path):
+    with pytest.raises(ValueError, match=r"not a custom function"):
+        logger.add(
+            tmp_path / "file.log", compression=lambda path: None, compression_mode="parallel"
+        )
+
+
 @pytest.mark.parametrize("compression", [0, True, os, object(), {"zip"}])
 def test_invalid_compression_type(compression):
     with pytest.raises(TypeError):
@@ -0,0 +1,135 @@
+import os
+import threading
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from loggerex import logger
+
+
+@pytest.fixture
+def fsync(monkeypatch):
+    mock = Mock(side_effect=os.fsync)
+    monkeypatch.setattr("loggerex._file_sink.os.fsync", mock)
+    return mock
+
+
+def test_fsync_disabled_by_default(tmp_path, fsync):
+    logger.add(tmp_path / "test.log", format="{message}")
+    logger.info("A")
+    logger.remove()
+    assert fsync.call_count == 0
+
+
+def test_fsync_each_message(tmp_path, fsync):
+    file = tmp_path / "test.log"
+    logger.add(file, format="{message}", fsync=True)
+    logger.info("A")
+    assert fsync.call_count == 1
+    logger.info("B")
+    assert fsync.call_count == 2
+    assert file.read_text() == "A\nB\n"
+
+
+def test_fsync_group_waits_for_commit(tmp_path, fsync):
+    file = tmp_path / "test.log"
+    logger.add(file, format="{message}", fsync="group:10ms")
+    logger.info("A")
+    assert fsync.call_count == 1
+    assert file.read_text() == "A\n"
+
+
+def test_fsync_group_commits_concurrent_messages_at_once(tmp_path, fsync):
+    file = tmp_path / "test.log"
+    logger.add(file, format="{message}", fsync="group:200ms")
+    barrier = threading.Barrier(10)
+
+    def worker(i):
+        barrier.wait()
+        logger.info("Message {}", i)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(10)]
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    assert 1 <= fsync.call_count < 10
+    assert len(file.read_text().splitlines()) == 10
+
+
+def test_fsync_group_level_commits_immediately(tmp_path, fsync):
+    logger.add(tmp_path / "test.log", format="{message}", fsync="group:1h, level:ERROR")
+    start = time.monotonic()
+    logger.error("A")
+    logger.critical("B")
+    assert time.monotonic() - start < 60
+    assert fsync.call_count == 2
+
+
+def test_fsync_group_with_enqueue(tmp_path, fsync):
+    file = tmp_path / "test.log"
+    logger.add(file, format="{message}", fsync="group:1h", enqueue=True)
+    logger.info("A")
+    logger.info("B")
+    logger.complete()
+    assert fsync.call_count == 0
+    logger.remove()
+    assert fsync.call_count == 1
+    assert file.read_text() == "A\nB\n"
+
+
+def test_fsync_group_with_rotation(tmp_path, fsync):
+    logger.add(tmp_path / "test.log", format="{message}", fsync="group:10ms", rotation="8 B")
+    logger.info("AAAAAA")
+    logger.info("BBBBBB")
+    logger.remove()
+    assert fsync.call_count == 2
+    files = sorted(tmp_path.iterdir())
+    assert sorted(f.read_text() for f in files) == ["AAAAAA\n", "BBBBBB\n"]
+
+
+def test_fsync_group_error(tmp_path, monkeypatch):
+    monkeypatch.setattr("loggerex._file_sink.os.fsync", Mock(side_effect=OSError("Fsync error")))
+    logger.add(tmp_path / "test.log", format="{message}", fsync="group:10ms", catch=False)
+
+    with pytest.raises(OSError, match=r"Fsync error"):
+        logger.info("A")
+
+
+def test_fsync_group_error_caught(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr("loggerex._file_sink.os.fsync", Mock(side_effect=OSError("Fsync error")))
+    logger.add(tmp_path / "test.log", format="{message}", fsync="group:10ms", catch=True)
+    logger.info("A")
+
+    out, err = capsys.readouterr()
+    assert out == ""
+    assert "OSError: Fsync error" in err
+
+
+@pytest.mark.parametrize(
+    "fsync", ["", "always", "group", "group:", "level:ERROR", "group:1s,group:2s", "group:1s,foo"]
+)
+def test_invalid_fsync(tmp_path, fsync):
+    with pytest.raises(ValueError, match=r"Invalid fsync"):
+        logger.add(tmp_path / "test.log", fsync=fsync)
+
+
+@pytest.mark.parametrize("fsync", ["group:foo", "group:-1s"])
+def test_invalid_fsync_interval(tmp_path, fsync):
+    with pytest.raises(ValueError, match=r"Invalid fsync interval"):
+        logger.add(tmp_path / "test.log", fsync=fsync)
+
+
+@pytest.mark.parametrize("fsync", [None, 1, object()])
+def test_invalid_fsync_type(tmp_path, fsync):
+    with pytest.raises(TypeError, match=r"Invalid fsync, it should be a boolean or a string"):
+        logger.add(tmp_path / "test.log", fsync=fsync)
+
+
+def test_invalid_fsync_with_flush(tmp_path):
+    with pytest.raises(ValueError, match=r"can't be used together"):
+        logger.add(tmp_path / "test.log", fsync=True, flush="level:ERROR")
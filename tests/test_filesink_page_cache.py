@@ -0,0 +1,146 @@
+import errno
+import os
+import sys
+from unittest.mock import Mock
+
+import pytest
+
+from loggerex import logger
+
+requires_linux = pytest.mark.skipif(
+    not sys.platform.startswith("linux"), reason="Preallocation is only available on Linux"
+)
+
+
+def allocated_size(path):
+    return os.stat(str(path)).st_blocks * 512
+
+
+@requires_linux
+def test_preallocate(tmp_path):
+    file = tmp_path / "test.log"
+    logger.add(file, format="{message}", preallocate="1 MB")
+    logger.info("Test")
+
+    assert os.stat(str(file)).st_size == 5
+    assert allocated_size(file) >= 1000000
+
+    logger.remove()
+
+    assert file.read_text() == "Test\n"
+    assert allocated_size(file) < 1000000
+
+
+@requires_linux
+def test_preallocate_next_chunk(tmp_path, monkeypatch):
+    fallocate = Mock()
+    monkeypatch.setattr("loggerex._file_sink.page_cache.fallocate", fallocate)
+    file = tmp_path / "test.log"
+    logger.add(file, format="{message}", preallocate=100)
+    assert fallocate.call_count == 1
+
+    for _ in range(10):
+        logger.info("A" * 9)
+
+    assert fallocate.call_count == 3
+    assert file.read_text() == "AAAAAAAAA\n" * 10
+
+
+@requires_linux
+def test_preallocate_rotation_size(tmp_path):
+    logger.add(
+        tmp_path / "test.log", format="{message}", rotation="20 B", preallocate=True, mode="w"
+    )
+
+    for i in range(5):
+        logger.info("Message {}", i)
+
+    logger.remove()
+
+    files = sorted(tmp_path.iterdir(), key=lambda f: f.read_text())
+    assert [f.read_text() for f in files] == [
+        "Message 0\nMessage 1\n",
+        "Message 2\nMessage 3\n",
+        "Message 4\n",
+    ]
+
+
+@requires_linux
+def test_preallocate_not_supported(tmp_path, monkeypatch):
+    error = OSError(errno.EOPNOTSUPP, "Operation not supported")
+    fallocate = Mock(side_effect=error)
+    monkeypatch.setattr("loggerex._file_sink.page_cache.fallocate", fallocate)
+    file = tmp_path / "test.log"
+    logger.add(file, format="{message}", preallocate=10)
+
+    for _ in range(10):
+        logger.info("Test")
+
+    assert fallocate.call_count == 1
+    assert file.read_text() == "Test\n" * 10
+
+
+@requires_linux
+def test_preallocate_error(tmp_path, monkeypatch):
+    fallocate = Mock(side_effect=OSError(errno.ENOSPC, "No space left on device"))
+    monkeypatch.setattr("loggerex._file_sink.page_cache.fallocate", fallocate)
+
+    with pytest.raises(OSError, match=r"No space left on device"):
+        logger.add(tmp_path / "test.log", preallocate=10)
+
+
+@pytest.mark.skipif(not hasattr(os, "posix_fadvise"), reason="Requires 'posix_fadvise()'")
+def test_drop_cache(tmp_path, monkeypatch):
+    drop_cache = Mock()
+    monkeypatch.setattr("loggerex._file_sink.page_cache.drop_cache", drop_cache)
+    monkeypatch.setattr("loggerex._file_sink.FileSink._drop_cache_step", 20)
+    file = tmp_path / "test.log"
+    logger.add(file, format="{message}", drop_cache=True)
+
+    for _ in range(3):
+        logger.info("Message")
+
+    assert drop_cache.call_count == 1
+    logger.remove()
+    assert drop_cache.call_count == 2
+    assert file.read_text() == "Message\n" * 3
+
+
+@pytest.mark.skipif(not hasattr(os, "posix_fadvise"), reason="Requires 'posix_fadvise()'")
+def test_drop_cache_real(tmp_path):
+    file = tmp_path / "test.log"
+    logger.add(file, format="{message}", drop_cache=True, buffering=-1)
+    logger.info("Test")
+    logger.remove()
+    assert file.read_text() == "Test\n"
+
+
+def test_preallocate_without_size_rotation(tmp_path):
+    with pytest.raises(ValueError, match=r"requires a size-based 'rotation'"):
+        logger.add(tmp_path / "test.log", preallocate=True, rotation="1 day")
+
+
+@pytest.mark.parametrize(
+    ("preallocate", "message"),
+    [
+        ("foo", r"Cannot parse preallocation size"),
+        ("1 day", r"Cannot parse preallocation size"),
+        (0, r"The preallocation size must be positive"),
+        (-1, r"The preallocation size must be positive"),
+    ],
+)
+def test_invalid_preallocate(tmp_path, preallocate, message):
+    with pytest.raises(ValueError, match=message):
+        logger.add(tmp_path / "test.log", preallocate=preallocate)
+
+
+@pytest.mark.parametrize("preallocate", [None, object(), [1]])
+def test_invalid_preallocate_type(tmp_path, preallocate):
+    with pytest.raises(TypeError, match=r"Cannot infer preallocation"):
+        logger.add(tmp_path / "test.log", preallocate=preallocate)
+
+
+@pytest.mark.parametrize("drop_cache", [None, 1, "yes"])
+def test_invalid_drop_cache_type(tmp_path, drop_cache):
+    with pytest.raises(TypeError, match=r"Invalid drop_cache"):
+        logger.add(tmp_path / "test.log", drop_cache=drop_cache)
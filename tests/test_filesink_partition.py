@@ -0,0 +1,205 @@
+import pytest
+
+from loggerex import logger
+
+
+def test_partition_by_extra(tmp_path):
+    logger.add(str(tmp_path / "{extra[tenant]}" / "app.log"), format="{message}")
+    logger.bind(tenant="a").info("A1")
+    logger.bind(tenant="b").info("B1")
+    logger.bind(tenant="a").info("A2")
+
+    assert (tmp_path / "a" / "app.log").read_text() == "A1\nA2\n"
+    assert (tmp_path / "b" / "app.log").read_text() == "B1\n"
+
+
+def test_partition_by_several_fields(tmp_path):
+    logger.add(str(tmp_path / "{extra[tenant]}" / "{level.name}.log"), format="{message}")
+    logger.bind(tenant="a").info("A")
+    logger.bind(tenant="a").error("B")
+    logger.bind(tenant="b").info("C")
+
+    assert (tmp_path / "a" / "INFO.log").read_text() == "A\n"
+    assert (tmp_path / "a" / "ERROR.log").read_text() == "B\n"
+    assert (tmp_path / "b" / "INFO.log").read_text() == "C\n"
+
+
+def test_partition_with_contextualize(tmp_path):
+    logger.add(str(tmp_path / "{extra[tenant]}.log"), format="{message}", enqueue=True)
+
+    with logger.contextualize(tenant="a"):
+        logger.info("A")
+
+    logger.bind(tenant="b").info("B")
+    logger.remove()
+
+    assert (tmp_path / "a.log").read_text() == "A\n"
+    assert (tmp_path / "b.log").read_text() == "B\n"
+
+
+def test_partition_with_time(tmp_path, freeze_time):
+    with freeze_time("2020-01-01 12:00:00"):
+        logger.add(str(tmp_path / "{extra[tenant]}_{time:YYYY}.log"), format="{message}")
+        logger.bind(tenant="a").info("A")
+
+    assert (tmp_path / "a_2020.log").read_text() == "A\n"
+
+
+@pytest.mark.parametrize(
+    ("value", "filename"),
+    [("x/y", "x_y.log"), ("..", "_...log"), ("", "_.log"), ("{x}", "{x}.log")],
+)
+def test_partition_value_sanitized(tmp_path, value, filename):
+    logger.add(str(tmp_path / "{extra[tenant]}.log"), format="{message}")
+    logger.bind(tenant=value).info("A")
+
+    assert [f.name for f in tmp_path.iterdir()] == [filename]
+    assert (tmp_path / filename).read_text() == "A\n"
+
+
+def test_partition_escaped_braces(tmp_path):
+    logger.add(str(tmp_path / "{{{extra[tenant]}}}.log"), format="{message}")
+    logger.bind(tenant="a").info("A")
+
+    assert (tmp_path / "{a}.log").read_text() == "A\n"
+
+
+def test_partition_max_open_files(tmp_path):
+    logger.add(str(tmp_path / "{extra[tenant]}.log"), format="{message}", max_open_files=2)
+
+    for tenant in "abcab":
+        logger.bind(tenant=tenant).info(tenant)
+
+    logger.remove()
+
+    assert (tmp_path / "a.log").read_text() == "a\na\n"
+    assert (tmp_path / "b.log").read_text() == "b\nb\n"
+    assert (tmp_path / "c.log").read_text() == "c\n"
+
+
+def test_partition_least_recently_used_suspended(tmp_path, monkeypatch):
+    suspended = []
+    monkeypatch.setattr("loggerex._file_sink.FileSink.suspend", lambda self: suspended.append(self))
+    logger.add(str(tmp_path / "{extra[tenant]}.log"), format="{message}", max_open_files=2)
+
+    logger.bind(tenant="a").info("A")
+    logger.bind(tenant="b").info("B")
+    logger.bind(tenant="a").info("A")
+    assert suspended == []
+
+    logger.bind(tenant="c").info("C")
+    assert [sink._file_path for sink in suspended] == [str(tmp_path / "b.log")]
+
+
+def test_partition_rotation(tmp_path):
+    logger.add(str(tmp_path / "{extra[tenant]}.log"), format="{message}", rotation="5 B")
+    logger.bind(tenant="a").info("AAAA")
+    logger.bind(tenant="b").info("BBBB")
+    logger.bind(tenant="a").info("AAAA")
+
+    assert sorted(f.name for f in tmp_path.iterdir() if f.name.startswith("b")) == ["b.log"]
+    assert len([f for f in tmp_path.iterdir() if f.name.startswith("a")]) == 2
+
+
+def test_partition_compression_at_stop(tmp_path):
+    path = str(tmp_path / "{extra[tenant]}.log")
+    logger.add(path, format="{message}", compression="gz", max_open_files=1)
+    logger.bind(tenant="a").info("A")
+    logger.bind(tenant="b").info("B")
+    logger.remove()
+
+    assert sorted(f.name for f in tmp_path.iterdir()) == ["a.log.gz", "b.log.gz"]
+
+
+def test_partition_retention(tmp_path):
+    for name in ["a.log.1", "a.log.2", "b.log.1"]:
+        (tmp_path / name).write_text("")
+
+    logger.add(str(tmp_path / "{extra[tenant]}.log"), format="{message}", retention=1)
+    logger.bind(tenant="a").info("A")
+    logger.remove()
+
+    assert sorted(f.name for f in tmp_path.iterdir()) == ["a.log", "b.log.1"]
+
+
+def test_partition_retention_ignores_other_partitions(tmp_path, freeze_time):
+    with freeze_time("2020-01-01") as frozen:
+        logger.add(
+            str(tmp_path / "{extra[tenant]}.log"), format="{message}", rotation=0, retention=1
+        )
+        for tenant in ["a.b", "a.b", "a", "a", "a"]:
+            frozen.tick()
+            logger.bind(tenant=tenant).info(tenant)
+        logger.remove()
+
+    assert sorted(f.name for f in tmp_path.iterdir()) == [
+        "a.2020-01-01_00-00-04_000000.log",
+        "a.b.2020-01-01_00-00-01_000000.2.log",
+        "a.b.log",
+        "a.log",
+    ]
+
+
+def test_partition_fields_of_logging_thread(tmp_path):
+    logger.add(str(tmp_path / "{thread.name}.log"), format="{message}", enqueue="thread")
+    logger.info("A")
+    logger.remove()
+
+    assert (tmp_path / "MainThread.log").read_text() == "A\n"
+
+
+def test_partition_flush_policy(tmp_path):
+    logger.add(str(tmp_path / "{extra[tenant]}.log"), format="{message}", flush="level:ERROR")
+    logger.bind(tenant="a").info("A")
+    logger.bind(tenant="b").error("B")
+
+    assert (tmp_path / "a.log").read_text() == ""
+    assert (tmp_path / "b.log").read_text() == "B\n"
+
+    logger.remove()
+
+    assert (tmp_path / "a.log").read_text() == "A\n"
+
+
+def test_partition_missing_field(tmp_path, capsys):
+    logger.add(str(tmp_path / "{extra[tenant]}.log"), format="{message}", catch=True)
+    logger.info("A")
+
+    out, err = capsys.readouterr()
+    assert out == ""
+    assert "KeyError: 'tenant'" in err
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.parametrize("mode", ["w", "x"])
+def test_invalid_partition_mode(tmp_path, mode):
+    with pytest.raises(ValueError, match=r"only supports the 'a' mode"):
+        logger.add(str(tmp_path / "{extra[tenant]}.log"), mode=mode)
+
+
+@pytest.mark.parametrize("max_open_files", [0, -1])
+def test_invalid_max_open_files(tmp_path, max_open_files):
+    with pytest.raises(ValueError, match=r"Invalid max_open_files"):
+        logger.add(str(tmp_path / "{extra[tenant]}.log"), max_open_files=max_open_files)
+
+
+@pytest.mark.parametrize("max_open_files", [None, 1.5, True, "10"])
+def test_invalid_max_open_files_type(tmp_path, max_open_files):
+    with pytest.raises(TypeError, match=r"Invalid max_open_files"):
+        logger.add(str(tmp_path / "{extra[tenant]}.log"), max_open_files=max_open_files)
+
+
+def test_invalid_max_open_files_without_partition(tmp_path):
+    with pytest.raises(ValueError, match=r"requires a path partitioned by record fields"):
+        logger.add(str(tmp_path / "{time}.log"), max_open_files=10)
+
+
+def test_invalid_partition_option(tmp_path):
+    with pytest.raises(ValueError, match=r"Cannot parse rotation"):
+        logger.add(str(tmp_path / "{extra[tenant]}.log"), rotation="foo")
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_invalid_partition_with_shared_memory(tmp_path):
+    with pytest.raises(ValueError, match=r"only supports file and stream sinks"):
+        logger.add(str(tmp_path / "{extra[tenant]}.log"), enqueue="shared_memory")
@@ -41,6 +41,34 @@ def test_retention_count(tmp_path, retention):
     check_dir(tmp_path, size=retention)
 
 
+@pytest.mark.parametrize("retention", ["10 B", "10B", " 0.01 kB ", "80 b"])
+def test_retention_size(tmp_path, retention):
+    for i, size in enumerate([3, 5, 4, 2]):
+        file = tmp_path / ("test.2011-01-01_01-01-0%d_000000.log" % i)
+        file.write_text("x" * size)
+        os.utime(str(file), (i, i))
+
+    i = logger.add(tmp_path / "test.log", format="{message}", retention=retention)
+    logger.debug("test")
+    logger.remove(i)
+
+    check_dir(
+        tmp_path,
+        files=[
+            ("test.2011-01-01_01-01-03_000000.log", "xx"),
+            ("test.log", "test\n"),
+        ],
+    )
+
+
+def test_retention_size_larger_than_budget(tmp_path):
+    i = logger.add(tmp_path / "test.log", format="{message}", retention="2 B")
+    logger.debug("test")
+    logger.remove(i)
+
+    check_dir(tmp_path, size=0)
+
+
 def test_retention_function(tmp_path):
     def func(logs):
         for log in logs:
@@ -236,6 +264,23 @@ def test_retention_at_rotation(tmp_path, mode):
     check_dir(tmp_path, size=2)
 
 
+@pytest.mark.parametrize("background", [True, "process"])
+def test_background_retention_at_rotation(tmp_path, background):
+    logger.add(
+        tmp_path / "file.log",
+        format="{message}",
+        rotation="10 B",
+        retention=1,
+        background=background,
+    )
+    logger.debug("First message")
+    logger.debug("Second message")
+    logger.remove()
+
+    check_dir(tmp_path, size=2)
+    assert (tmp_path / "file.log").read_text() == "Second message\n"
+
+
 @pytest.mark.parametrize("mode", ["a", "a+", "w", "x"])
 def test_retention_at_remove_without_rotation(tmp_path, mode):
     i = logger.add(tmp_path / "file.log", retention=0, mode=mode)
@@ -254,6 +299,74 @@ def test_no_retention_at_remove_with_rotation(tmp_path, mode):
     check_dir(tmp_path, size=1)
 
 
+def test_retention_files_listed_only_once(tmp_path, freeze_time, monkeypatch):
+    scandir = Mock(side_effect=os.scandir)
+    monkeypatch.setattr(os, "scandir", scandir)
+
+    with freeze_time("2020-01-01") as frozen:
+        logger.add(tmp_path / "test.log", format="{message}", retention=2, rotation=0)
+
+        for i in range(5):
+            frozen.tick()
+            logger.debug(str(i))
+
+    assert scandir.call_count == 1
+    check_dir(
+        tmp_path,
+        files=[
+            ("test.2020-01-01_00-00-03_000000.log", "2\n"),
+            ("test.2020-01-01_00-00-04_000000.log", "3\n"),
+            ("test.log", "4\n"),
+        ],
+    )
+
+
+def test_retention_with_files_removed_externally(tmp_path, capsys):
+    old_file = tmp_path / "test.2019-01-01_00-00-00_000000.log"
+    old_file.write_text("Old")
+    os.utime(str(old_file), (0, 0))
+
+    logger.add(tmp_path / "test.log", format="{message}", retention=2, rotation=0)
+    logger.debug("A")
+
+    old_file.unlink()
+
+    logger.debug("B")
+
+    check_dir(tmp_path, size=3)
+    assert (tmp_path / "test.log").read_text() == "B\n"
+
+    out, err = capsys.readouterr()
+    assert out == err == ""
+
+
+def test_retention_function_after_rotation_with_index(tmp_path, freeze_time):
+    seen = []
+
+    def retention(logs):
+        seen.append(sorted(os.path.basename(log) for log in logs))
+
+    with freeze_time("2020-01-01") as frozen:
+        logger.add(
+            tmp_path / "test.log",
+            format="{message}",
+            retention=retention,
+            compression="gz",
+            rotation=0,
+        )
+        logger.debug("A")
+        frozen.tick()
+        logger.debug("B")
+
+    assert seen == [
+        ["test.2020-01-01_00-00-00_000000.log.gz"],
+        [
+            "test.2020-01-01_00-00-00_000000.2020-01-01_00-00-00_000000.log.gz",
+            "test.2020-01-01_00-00-00_000000.log.gz",
+        ],
+    ]
+
+
 def test_no_renaming(tmp_path):
     i = logger.add(tmp_path / "test.log", format="{message}", retention=10)
     logger.debug("test")
@@ -357,7 +470,31 @@ def test_unparsable_retention(retention):
         logger.add("test.log", retention=retention)
 
 
-@pytest.mark.parametrize("retention", ["5 MB", "3 hours 2 dayz"])
+@pytest.mark.parametrize("retention", ["5 MBs", "3 hours 2 dayz"])
 def test_invalid_value_retention_duration(retention):
     with pytest.raises(ValueError, match="^Invalid unit value while parsing duration: '[^']+'$"):
         logger.add("test.log", retention=retention)
+
+
+def test_retention_with_files_rotated_by_another_process(tmp_path, freeze_time):
+    with freeze_time("2020-01-01") as frozen:
+        logger.add(tmp_path / "test.log", format="{message}", retention=2, rotation=0, watch=True)
+        logger.debug("A")
+        frozen.tick()
+        logger.debug("B")
+
+        # Simulate another process rotating the file, the sink reopens a new one.
+        (tmp_path / "test.log").rename(tmp_path / "test.2020-01-01_00-00-01_000000.log")
+        frozen.tick()
+        logger.debug("C")
+        frozen.tick()
+        logger.debug("D")
+
+    check_dir(
+        tmp_path,
+        files=[
+            ("test.2020-01-01_00-00-01_000000.log", "B\n"),
+            ("test.2020-01-01_00-00-02_000000.2.log", "C\n"),
+            ("test.log", "D\n"),
+        ],
+    )
@@ -104,6 +104,40 @@ def test_size_rotation(freeze_time, tmp_path, size):
     )
 
 
+def test_size_rotation_counts_encoded_bytes(freeze_time, tmp_path):
+    with freeze_time("2018-01-01 00:00:00") as frozen:
+        i = logger.add(tmp_path / "test_{time}.log", format="{message}", rotation=8, mode="w")
+
+        frozen.tick()
+        logger.debug("éé")
+
+        frozen.tick()
+        logger.debug("éé")
+
+        logger.remove(i)
+
+    check_dir(
+        tmp_path,
+        files=[
+            ("test_2018-01-01_00-00-00_000000.log", "éé\n"),
+            ("test_2018-01-01_00-00-02_000000.log", "éé\n"),
+        ],
+    )
+
+
+def test_size_rotation_with_existing_file(tmp_path):
+    filepath = tmp_path / "test.log"
+    filepath.write_text("A" * 8)
+
+    logger.add(filepath, format="{message}", rotation=10, buffering=1000)
+    logger.debug("B")
+    logger.debug("C")
+    logger.remove()
+
+    files = sorted(tmp_path.iterdir(), key=lambda p: p.name != "test.log")
+    assert [f.read_text() for f in files] == ["C\n", "A" * 8 + "B\n"]
+
+
 @pytest.mark.parametrize(
     ("when", "hours"),
     [
@@ -0,0 +1,122 @@
+import datetime
+import os
+
+import pytest
+
+from loggerex import logger
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="Requires 'fcntl'")
+
+
+def test_shared_file(tmp_path):
+    file = tmp_path / "test.log"
+    logger.add(file, format="{message}", shared=True)
+    logger.add(file, format="{message}", shared=True)
+    logger.info("A")
+    logger.info("B")
+    assert file.read_text() == "A\nA\nB\nB\n"
+
+
+def test_shared_file_written_without_buffering(tmp_path):
+    file = tmp_path / "test.log"
+    logger.add(file, format="{message}", shared=True, buffering=-1)
+    logger.info("A")
+    assert file.read_text() == "A\n"
+
+
+def test_shared_file_encoding(tmp_path):
+    file = tmp_path / "test.log"
+    logger.add(file, format="{message}", shared=True, encoding="ascii", errors="replace")
+    logger.info("é")
+    assert file.read_text() == "?\n"
+
+
+def test_shared_file_rotated_once(tmp_path):
+    file = tmp_path / "test.log"
+    logger.add(file, format="{message}", shared=True, rotation="10 B")
+    logger.add(file, format="{message}", shared=True, rotation="10 B")
+    logger.info("AAAA")
+    logger.info("BBBB")
+
+    files = sorted(tmp_path.iterdir())
+    assert len(files) == 3
+    assert files[0].name == ".test.log.lock"
+    assert files[-1] == file
+    assert files[1].read_text() == "AAAA\nAAAA\n"
+    assert file.read_text() == "BBBB\nBBBB\n"
+
+
+def test_shared_file_rotated_by_other_sink(tmp_path):
+    file = tmp_path / "test.log"
+    logger.add(file, format="{message}", shared=True, rotation="10 B", level="WARNING")
+    logger.add(file, format="{message}", shared=True)
+    logger.info("AAAAAAAA")
+    logger.warning("BBBB")
+    logger.info("CCCC")
+
+    files = sorted(f for f in tmp_path.iterdir() if not f.name.startswith("."))
+    assert len(files) == 2
+    assert files[-1] == file
+    assert files[0].read_text() == "AAAAAAAA\n"
+    assert file.read_text() == "BBBB\nBBBB\nCCCC\n"
+
+
+def test_shared_file_time_rotated_once(tmp_path, freeze_time):
+    file = tmp_path / "test.log"
+
+    with freeze_time("2020-01-01 12:00:00") as frozen:
+        logger.add(file, format="{message}", shared=True, rotation="1 h")
+        logger.add(file, format="{message}", shared=True, rotation="1 h")
+        frozen.tick(datetime.timedelta(minutes=30))
+        logger.info("A")
+        frozen.tick(datetime.timedelta(hours=1))
+        logger.info("B")
+        frozen.tick(datetime.timedelta(minutes=10))
+        logger.info("C")
+
+    files = sorted(f for f in tmp_path.iterdir() if not f.name.startswith("."))
+    assert len(files) == 2
+    assert files[-1] == file
+    assert files[0].read_text() == "A\nA\n"
+    assert file.read_text() == "B\nB\nC\nC\n"
+
+
+def test_shared_file_not_compressed_when_stopped(tmp_path):
+    file = tmp_path / "test.log"
+    logger.add(file, format="{message}", shared=True, compression="gz")
+    logger.info("A")
+    logger.remove()
+    assert [f.name for f in tmp_path.iterdir()] == ["test.log"]
+    assert file.read_text() == "A\n"
+
+
+def test_shared_file_retention_ignores_lock_file(tmp_path):
+    file = tmp_path / "test.log"
+    logger.add(file, format="{message}", shared=True, rotation="5 B", retention=1)
+    logger.info("AAAA")
+    logger.info("BBBB")
+    logger.info("CCCC")
+
+    files = sorted(f.name for f in tmp_path.iterdir())
+    assert len(files) == 3
+    assert ".test.log.lock" in files
+    assert file.read_text() == "CCCC\n"
+
+
+@pytest.mark.parametrize(
+    ("kwargs", "message"),
+    [
+        ({"mode": "w"}, r"requires the 'a' mode"),
+        ({"compression": "gz", "compression_mode": "stream"}, r"'stream' compression mode"),
+        ({"flush": "level:ERROR"}, r"not supported with the 'flush' parameter"),
+    ],
+)
+def test_invalid_shared_combination(tmp_path, kwargs, message):
+    with pytest.raises(ValueError, match=message):
+        logger.add(tmp_path / "test.log", shared=True, **kwargs)
+
+
+@pytest.mark.parametrize("shared", [None, 1, "yes"])
+def test_invalid_shared_type(tmp_path, shared):
+    with pytest.raises(TypeError, match=r"Invalid shared"):
+        logger.add(tmp_path / "test.log", shared=shared)
@@ -0,0 +1,229 @@
+import datetime
+import os
+from unittest.mock import Mock
+
+import pytest
+
+from loggerex import logger
+
+
+def listdir(path):
+    return sorted(str(file.relative_to(path)) for file in path.rglob("*") if file.is_file())
+
+
+def test_time_partition_hourly(tmp_path, freeze_time):
+    with freeze_time("2020-01-01 12:30:00") as frozen:
+        path = str(tmp_path / "{time:YYYY/MM/DD/HH}.log")
+        logger.add(path, format="{message}", time_partition=True)
+        logger.info("A")
+        frozen.move_to("2020-01-01 12:59:59")
+        logger.info("B")
+        frozen.move_to("2020-01-01 13:00:00")
+        logger.info("C")
+        frozen.move_to("2020-01-02 00:10:00")
+        logger.info("D")
+
+    assert listdir(tmp_path) == ["2020/01/01/12.log", "2020/01/01/13.log", "2020/01/02/00.log"]
+    assert (tmp_path / "2020/01/01/12.log").read_text() == "A\nB\n"
+    assert (tmp_path / "2020/01/01/13.log").read_text() == "C\n"
+    assert (tmp_path / "2020/01/02/00.log").read_text() == "D\n"
+
+
+@pytest.mark.parametrize(
+    ("spec", "dates", "files"),
+    [
+        ("YYYY", ["2020-12-31 23:59:59", "2021-01-01"], ["2020.log", "2021.log"]),
+        ("YYYY-MM", ["2020-12-31 23:59:59", "2021-01-01"], ["2020-12.log", "2021-01.log"]),
+        ("YYYY-MM-DD", ["2020-02-28 23:59:59", "2020-02-29"], ["2020-02-28.log", "2020-02-29.log"]),
+        ("HH-mm", ["2020-01-01 12:00:59", "2020-01-01 12:01:00"], ["12-00.log", "12-01.log"]),
+        ("mm-ss", ["2020-01-01 12:00:00", "2020-01-01 12:00:01"], ["00-00.log", "00-01.log"]),
+        ("%Y_%H", ["2020-01-01 12:59:59", "2020-01-01 13:00:00"], ["2020_12.log", "2020_13.log"]),
+        ("Q", ["2020-01-31 12:00:00", "2020-02-01"], ["1.log"]),
+        ("[YYYY]", ["2020-01-01 12:00:00", "2021-01-01"], ["YYYY.log"]),
+    ],
+)
+def test_time_partition_resolution(tmp_path, freeze_time, spec, dates, files):
+    with freeze_time(dates[0]) as frozen:
+        path = str(tmp_path / ("{time:%s}.log" % spec))
+        logger.add(path, format="{message}", time_partition=True)
+        for date in dates:
+            frozen.move_to(date)
+            logger.info(date)
+
+    assert listdir(tmp_path) == files
+
+
+def test_time_partition_uses_record_time(tmp_path, freeze_time):
+    with freeze_time("2020-01-01 12:00:00"):
+        path = str(tmp_path / "{time:HH}.log")
+        logger.add(path, format="{message}", time_partition=True, delay=True)
+        logger.patch(lambda r: r.update(time=r["time"].replace(hour=8))).info("A")
+        logger.info("B")
+
+    assert (tmp_path / "08.log").read_text() == "A\n"
+    assert (tmp_path / "12.log").read_text() == "B\n"
+
+
+def test_time_partition_late_record(tmp_path, freeze_time):
+    with freeze_time("2020-01-01 12:59:59") as frozen:
+        logger.add(str(tmp_path / "{time:HH}.log"), format="{message}", time_partition=True)
+        logger.info("A")
+        frozen.move_to("2020-01-01 13:00:00")
+        logger.info("B")
+        logger.patch(lambda r: r.update(time=r["time"].replace(hour=12))).info("C")
+
+    assert (tmp_path / "12.log").read_text() == "A\nC\n"
+    assert (tmp_path / "13.log").read_text() == "B\n"
+
+
+def test_time_partition_utc(tmp_path, freeze_time):
+    with freeze_time("2020-01-01 12:00:00", ("CET", 3600)) as frozen:
+        path = str(tmp_path / "{time:HH!UTC}.log")
+        logger.add(path, format="{message}", time_partition=True)
+        logger.info("A")
+        frozen.tick(datetime.timedelta(seconds=3599))
+        logger.info("B")
+        frozen.tick(datetime.timedelta(seconds=1))
+        logger.info("C")
+
+    assert (tmp_path / "11.log").read_text() == "A\nB\n"
+    assert (tmp_path / "12.log").read_text() == "C\n"
+
+
+def test_time_partition_without_ctime(tmp_path, monkeypatch):
+    get_ctime, set_ctime = Mock(), Mock()
+    monkeypatch.setattr("loggerex._file_sink.get_ctime", get_ctime)
+    monkeypatch.setattr("loggerex._file_sink.set_ctime", set_ctime)
+    logger.add(str(tmp_path / "{time:mm-ss}.log"), format="{message}", time_partition=True)
+
+    for _ in range(3):
+        logger.info("A")
+
+    logger.remove()
+
+    assert get_ctime.call_count == 0
+    assert set_ctime.call_count == 0
+
+
+def test_time_partition_compression(tmp_path, freeze_time):
+    with freeze_time("2020-01-01 12:00:00") as frozen:
+        path = str(tmp_path / "{time:HH}.log")
+        logger.add(path, format="{message}", time_partition=True, compression="gz")
+        logger.info("A")
+        frozen.move_to("2020-01-01 13:00:00")
+        logger.info("B")
+        assert listdir(tmp_path) == ["12.log.gz", "13.log"]
+
+    logger.remove()
+    assert listdir(tmp_path) == ["12.log.gz", "13.log.gz"]
+
+
+def test_time_partition_late_record_not_finalized_again(tmp_path, freeze_time):
+    with freeze_time("2020-01-01 12:00:00") as frozen:
+        path = str(tmp_path / "{time:HH}.log")
+        logger.add(path, format="{message}", time_partition=True, compression="gz")
+        logger.info("A")
+        frozen.move_to("2020-01-01 13:00:00")
+        logger.info("B")
+        logger.patch(lambda r: r.update(time=r["time"].replace(hour=12))).info("C")
+        assert listdir(tmp_path) == ["12.log", "12.log.gz", "13.log"]
+        logger.info("D")
+        frozen.move_to("2020-01-01 14:00:00")
+        logger.info("E")
+        assert listdir(tmp_path) == ["12.log", "12.log.gz", "13.log.gz", "14.log"]
+
+    logger.remove()
+    assert listdir(tmp_path) == ["12.log", "12.log.gz", "13.log.gz", "14.log.gz"]
+    assert (tmp_path / "12.log").read_text() == "C\n"
+
+
+def test_time_partition_repeated_bucket_finalized_once(tmp_path, freeze_time):
+    finalized = []
+
+    def compression(path):
+        finalized.append(os.path.basename(path))
+
+    with freeze_time("2020-01-01 12:59:00") as frozen:
+        path = str(tmp_path / "{time:mm}.log")
+        logger.add(path, format="{message}", time_partition=True, compression=compression)
+        logger.info("A")
+        # The wall-clock time is set back, as during a DST transition.
+        frozen.move_to("2020-01-01 12:00:00")
+        logger.info("B")
+        frozen.move_to("2020-01-01 12:59:00")
+        logger.info("C")
+        frozen.move_to("2020-01-01 13:00:00")
+        logger.info("D")
+
+    logger.remove()
+    assert finalized == ["59.log", "00.log"]
+    assert (tmp_path / "59.log").read_text() == "A\nC\n"
+    assert (tmp_path / "00.log").read_text() == "B\nD\n"
+
+
+def test_time_partition_retention(tmp_path, freeze_time):
+    with freeze_time("2020-01-01 10:00:00") as frozen:
+        path = str(tmp_path / "{time:HH}.log")
+        logger.add(path, format="{message}", time_partition=True, retention=2)
+        for hour in range(10, 14):
+            frozen.move_to("2020-01-01 %d:00:00" % hour)
+            logger.info("A")
+
+    assert listdir(tmp_path) == ["11.log", "12.log", "13.log"]
+
+
+def test_time_partition_with_enqueue(tmp_path, freeze_time):
+    with freeze_time("2020-01-01 12:59:59") as frozen:
+        path = str(tmp_path / "{time:HH}.log")
+        logger.add(path, format="{message}", time_partition=True, enqueue="thread")
+        logger.info("A")
+        frozen.move_to("2020-01-01 13:00:00")
+        logger.info("B")
+        logger.remove()
+
+    assert (tmp_path / "12.log").read_text() == "A\n"
+    assert (tmp_path / "13.log").read_text() == "B\n"
+
+
+def test_time_partition_with_record_fields(tmp_path, freeze_time):
+    with freeze_time("2020-01-01 12:59:59") as frozen:
+        path = str(tmp_path / "{extra[tenant]}" / "{time:HH}.log")
+        logger.add(path, format="{message}", time_partition=True)
+        logger.bind(tenant="a").info("A")
+        frozen.move_to("2020-01-01 13:00:00")
+        logger.bind(tenant="a").info("B")
+        logger.bind(tenant="b").info("C")
+
+    assert listdir(tmp_path) == ["a/12.log", "a/13.log", "b/13.log"]
+
+
+def test_invalid_time_partition_without_time_field(tmp_path):
+    with pytest.raises(ValueError, match=r"requires a '\{time\}' field"):
+        logger.add(str(tmp_path / "test.log"), time_partition=True)
+
+
+@pytest.mark.parametrize("spec", ["", "SSS", "x", "%H-%f"])
+def test_invalid_time_partition_resolution(tmp_path, spec):
+    with pytest.raises(ValueError, match=r"resolution of at most one second"):
+        logger.add(str(tmp_path / ("{time:%s}.log" % spec)), time_partition=True)
+
+
+def test_invalid_time_partition_with_rotation(tmp_path):
+    with pytest.raises(ValueError, match=r"can't be used together"):
+        logger.add(str(tmp_path / "{time:HH}.log"), time_partition=True, rotation="1 h")
+
+
+def test_invalid_time_partition_with_shared(tmp_path):
+    with pytest.raises(ValueError, match=r"not supported with the 'shared' parameter"):
+        logger.add(str(tmp_path / "{time:HH}.log"), time_partition=True, shared=True)
+
+
+def test_invalid_time_partition_mode(tmp_path):
+    with pytest.raises(ValueError, match=r"requires the 'a' mode"):
+        logger.add(str(tmp_path / "{time:HH}.log"), time_partition=True, mode="w")
+
+
+@pytest.mark.parametrize("time_partition", [None, 1, "time"])
+def test_invalid_time_partition_type(tmp_path, time_partition):
+    with pytest.raises(TypeError, match=r"Invalid time_partition"):
+        logger.add(str(tmp_path / "{time:HH}.log"), time_partition=time_partition)
@@ -1,4 +1,6 @@
 import os
+import sys
+import time
 from unittest.mock import Mock
 
 import pytest
@@ -146,3 +148,101 @@ def test_file_closed_without_being_logged(tmp_path, delay, compression):
     )
     logger.remove()
     assert filepath.exists() is (False if delay else True)
+
+
+@pytest.mark.skipif(os.name == "nt", reason="Windows can't delete file in use")
+def test_watch_interval_throttles_checks(tmp_path, monkeypatch):
+    now = Mock(return_value=100.0)
+    monkeypatch.setattr("loggerex._file_sink.time.monotonic", now)
+
+    file = tmp_path / "test.log"
+    logger.add(file, format="{message}", watch=True, watch_interval="10 seconds")
+    logger.info("A")
+    os.remove(str(file))
+    logger.info("B")
+    assert not file.exists()
+
+    now.return_value = 109.0
+    logger.info("C")
+    assert not file.exists()
+
+    now.return_value = 110.0
+    logger.info("D")
+    assert file.read_text() == "D\n"
+
+
+@pytest.mark.skipif(os.name == "nt", reason="Windows can't delete file in use")
+def test_watch_interval_checked_at_stop(tmp_path):
+    file = tmp_path / "test.log"
+    i = logger.add(file, format="{message}", watch=True, watch_interval=3600)
+    logger.info("A")
+    os.remove(str(file))
+    logger.remove(i)
+    assert file.read_text() == ""
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="Requires inotify")
+@pytest.mark.parametrize("action", ["remove", "rename"])
+def test_watch_inotify(tmp_path, action):
+    file = tmp_path / "test.log"
+    logger.add(file, format="{message}", watch="inotify")
+    logger.info("A")
+
+    if action == "remove":
+        os.remove(str(file))
+    else:
+        os.rename(str(file), str(tmp_path / "moved.log"))
+
+    for _ in range(100):
+        logger.info("B")
+        if file.exists():
+            break
+        time.sleep(0.05)
+
+    assert file.read_text() == "B\n"
+
+    logger.remove()
+    check_dir(tmp_path, size=2 if action == "rename" else 1)
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="Requires inotify")
+def test_watch_inotify_unchanged_file_not_checked(tmp_path, monkeypatch):
+    file = tmp_path / "test.log"
+    logger.add(file, format="{message}", watch="inotify")
+    stat = Mock(side_effect=os.stat)
+    monkeypatch.setattr("loggerex._file_sink.os.stat", stat)
+    logger.info("A")
+    logger.info("B")
+    assert stat.call_count == 0
+    assert file.read_text() == "A\nB\n"
+
+
+@pytest.mark.parametrize("watch", ["stat", "", "INOTIFY"])
+def test_invalid_watch_mode(tmp_path, watch):
+    with pytest.raises(ValueError, match=r"Invalid watch mode"):
+        logger.add(tmp_path / "test.log", watch=watch)
+
+
+@pytest.mark.parametrize("watch", [1, object(), None])
+def test_invalid_watch_mode_type(tmp_path, watch):
+    with pytest.raises(TypeError, match=r"Cannot infer watch mode"):
+        logger.add(tmp_path / "test.log", watch=watch)
+
+
+@pytest.mark.parametrize(
+    ("watch_interval", "message"),
+    [
+        ("foobar", r"Cannot parse watch interval"),
+        ("1 KB", r"Invalid unit value while parsing duration"),
+        (-1, r"The watch interval can't be negative"),
+    ],
+)
+def test_invalid_watch_interval(tmp_path, watch_interval, message):
+    with pytest.raises(ValueError, match=message):
+        logger.add(tmp_path / "test.log", watch=True, watch_interval=watch_interval)
+
+
+@pytest.mark.parametrize("watch_interval", [True, object(), [1]])
+def test_invalid_watch_interval_type(tmp_path, watch_interval):
+    with pytest.raises(TypeError, match=r"Cannot infer watch interval"):
+        logger.add(tmp_path / "test.log", watch=True, watch_interval=watch_interval)
@@ -1,9 +1,12 @@
 import os
+import pickle
 import re
 
 import pytest
 
+import loggerex
 from loggerex import logger
+from loggerex._colorizer import FormatTemplate, compile_template
 
 
 @pytest.mark.parametrize(
@@ -240,3 +243,93 @@ def test_invalid_color_markup(writer):
         ValueError, match="^Invalid format, color markups could not be parsed correctly$"
     ):
         logger.add(writer, format="<red>Not closed tag", colorize=True)
+
+
+@pytest.mark.parametrize(
+    "format_string",
+    [
+        "",
+        "{a}",
+        "{a} literal {b}",
+        "{{a}} {{",
+        "{a:>10} {b:*^8}",
+        "{a!r} {b!s} {a!a}",
+        "{c.real} {d[x]} {d[0]}",
+        "{e[nested][0]:.2f}",
+    ],
+)
+def test_compiled_format_template(format_string):
+    mapping = {"a": "é", "b": 42, "c": 1.5, "d": {"x": "y", 0: "z"}, "e": {"nested": [3.14159]}}
+    template = FormatTemplate(format_string)
+    assert compile_template(format_string) is not None
+    assert template.render(mapping, "", "") == format_string.format_map(mapping)
+
+
+@pytest.mark.parametrize("format_string", ["{}", "{0}", "{a:{b}}", "{a!x}", "{a[}"])
+def test_compiled_format_template_fallback(format_string):
+    assert compile_template(format_string) is None
+
+
+@pytest.mark.parametrize("compiled", [True, False])
+def test_compiled_format_template_overridden_fields(compiled):
+    format_string = "{a} {message:>5} {exception!r}" + ("" if compiled else " {a:{b}}")
+    template = FormatTemplate(format_string)
+    mapping = {"a": 1, "b": 2, "message": "ignored", "exception": None}
+    expected = "1   Msg 'Exc'" + ("" if compiled else "  1")
+    assert template.render(mapping, "Exc", "Msg") == expected
+
+
+def test_compiled_format_template_missing_key():
+    template = FormatTemplate("{a} {b}")
+    with pytest.raises(KeyError, match="b"):
+        template.render({"a": 1}, "", "")
+
+
+def test_compiled_format_template_pickled():
+    template = pickle.loads(pickle.dumps(FormatTemplate("{a:>3}")))
+    assert template.format_string == "{a:>3}"
+    assert template.render({"a": 1}, "", "") == "  1"
+
+
+def test_exception_formatted_once_for_identical_handlers(writer, monkeypatch):
+    calls = []
+    format_exception = loggerex._better_exceptions.ExceptionFormatter.format_exception
+
+    def patched_format_exception(self, *args, **kwargs):
+        calls.append(self)
+        return format_exception(self, *args, **kwargs)
+
+    monkeypatch.setattr(
+        loggerex._better_exceptions.ExceptionFormatter, "format_exception", patched_format_exception
+    )
+
+    logger.add(writer, format="{message}", diagnose=False)
+    logger.add(writer, format="{level} {message}", diagnose=False)
+    logger.add(writer, format="{message}", diagnose=True)
+
+    try:
+        1 / 0  # noqa: B018
+    except ZeroDivisionError:
+        logger.exception("Error")
+
+    assert len(calls) == 2
+    assert writer.read().count("ZeroDivisionError: division by zero") == 3
+
+
+def test_exception_changed_by_filter_between_handlers(writer):
+    def filter_(record):
+        record["exception"] = None
+        return True
+
+    logger.add(writer, format="A {message}", backtrace=False)
+    logger.add(writer, format="B {message}", backtrace=False, filter=filter_)
+    logger.add(writer, format="C {message}", backtrace=False)
+
+    try:
+        1 / 0  # noqa: B018
+    except ZeroDivisionError:
+        logger.exception("Error")
+
+    lines = writer.read().splitlines()
+    assert lines[0] == "A Error"
+    assert lines[-3:] == ["ZeroDivisionError: division by zero", "B Error", "C Error"]
@@ -9,6 +9,7 @@ import time
 import pytest
 
 from loggerex import logger
+from loggerex._ring_buffer import RingBuffer
 
 from .conftest import new_event_loop_context
 
@@ -52,6 +53,18 @@ def subworker_remove_inheritance():
     logger.info("Nope")
 
 
+def subworker_shared_memory():
+    pid = os.getpid()
+    for i in range(100):
+        logger.info("{}:{}", pid, i)
+
+
+def subworker_shared_file():
+    pid = os.getpid()
+    for i in range(200):
+        logger.info("{}:{:03d}:{}", pid, i, "x" * 50)
+
+
 def subworker_complete(logger_):
     async def work():
         logger_.info("Child")
@@ -257,6 +270,108 @@ def test_process_inheritance(fork_context):
     assert writer.read() == "Child\nMain\n"
 
 
+@pytest.mark.skipif(os.name == "nt", reason="Windows does not support forking")
+def test_process_inheritance_thread_queue(tmp_path, fork_context):
+    filepath = tmp_path / "test.log"
+
+    logger.add(filepath, format="{message}", enqueue="thread", catch=False)
+
+    process = fork_context.Process(target=subworker_remove_inheritance)
+    process.start()
+    process.join()
+
+    assert process.exitcode == 0
+
+    logger.info("Main")
+    logger.remove()
+
+    assert filepath.read_text() == "Child\nMain\n"
+
+
+@pytest.mark.skipif(os.name == "nt", reason="Windows does not support forking")
+@pytest.mark.skipif(sys.version_info < (3, 8), reason="Shared memory requires Python 3.8+")
+def test_process_inheritance_shared_memory(tmp_path, fork_context):
+    filepath = tmp_path / "test.log"
+
+    logger.add(
+        filepath, context=fork_context, format="{message}", enqueue="shared_memory", catch=False
+    )
+
+    processes = [fork_context.Process(target=subworker_shared_memory) for _ in range(4)]
+
+    for process in processes:
+        process.start()
+
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+
+    logger.info("Main")
+    logger.remove()
+
+    lines = filepath.read_text().splitlines()
+    assert len(lines) == 4 * 100 + 1
+    assert lines[-1] == "Main"
+
+    for pid in set(line.split(":")[0] for line in lines[:-1]):
+        messages = [line for line in lines if line.startswith(pid + ":")]
+        assert messages == ["%s:%d" % (pid, i) for i in range(100)]
+
+
+@pytest.mark.skipif(os.name == "nt", reason="Windows does not support forking")
+@pytest.mark.skipif(sys.version_info < (3, 8), reason="Shared memory requires Python 3.8+")
+def test_process_shared_memory_rings_released(tmp_path, fork_context, monkeypatch):
+    closed = []
+    close = RingBuffer.close
+
+    def close_ring(ring):
+        closed.append(ring.name)
+        close(ring)
+
+    monkeypatch.setattr(RingBuffer, "close", close_ring)
+    filepath = tmp_path / "test.log"
+    logger.add(
+        filepath, context=fork_context, format="{message}", enqueue="shared_memory", catch=False
+    )
+
+    for _ in range(3):
+        process = fork_context.Process(target=subworker_shared_memory)
+        process.start()
+        process.join()
+        assert process.exitcode == 0
+
+    logger.complete()
+    assert len(set(closed)) == 3
+
+    logger.remove()
+    assert len(filepath.read_text().splitlines()) == 3 * 100
+
+
+@pytest.mark.skipif(os.name == "nt", reason="Windows does not support forking")
+def test_process_inheritance_shared_file(tmp_path, fork_context):
+    logger.add(tmp_path / "test.log", format="{message}", shared=True, rotation="4 KB", catch=False)
+
+    processes = [fork_context.Process(target=subworker_shared_file) for _ in range(4)]
+
+    for process in processes:
+        process.start()
+
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+
+    logger.remove()
+
+    files = [f for f in tmp_path.iterdir() if not f.name.startswith(".")]
+    lines = [line for f in files for line in f.read_text().splitlines()]
+    assert len(files) > 4
+    assert len(lines) == 4 * 200
+
+    for pid in set(line.split(":")[0] for line in lines):
+        messages = sorted(line for line in lines if line.startswith(pid + ":"))
+        assert messages == ["%s:%03d:%s" % (pid, i, "x" * 50) for i in range(200)]
+
+
 def test_remove_in_child_process_spawn(spawn_context):
     writer = Writer()
 
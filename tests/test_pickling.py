@@ -215,6 +215,14 @@ def test_pickling_file_handler_compression(tmp_path, compression):
         assert file.read_text() == "DEBUG - test_pickling_file_handler_compression - A message\n"
 
 
+def test_pickling_file_handler_background(tmp_path):
+    file = tmp_path / "test.log"
+    logger.add(file, format="{message}", delay=True, compression="gz", background=True)
+    with copied_logger_though_pickle(logger) as dupe_logger:
+        dupe_logger.debug("A message")
+        assert file.read_text() == "A message\n"
+
+
 def test_pickling_no_handler(writer):
     with copied_logger_though_pickle(logger) as dupe_logger:
         dupe_logger.add(writer, format="{level} - {function} - {message}")
@@ -1,4 +1,7 @@
+import io
+import pickle
 import re
+import threading
 
 import loggerex._recattrs as recattrs
 from loggerex import logger
@@ -75,3 +78,149 @@ def test_exception_repr():
     exception = recattrs.RecordException(ValueError, ValueError("Nope"), None)
     regex = r"\(type=<class 'ValueError'>, value=ValueError\('Nope',?\), traceback=None\)"
     assert re.fullmatch(regex, repr(exception))
+
+
+def test_lazy_record_fields_not_computed_if_unused(monkeypatch):
+    stream = io.StringIO()
+    records = []
+
+    def resolve(key, context):
+        raise AssertionError("Field should not be computed: '%s'" % key)
+
+    monkeypatch.setattr(recattrs.LazyRecord, "_resolve", staticmethod(resolve))
+    logger.add(stream, format="{level} {name} {message}")
+    logger.patch(lambda r: records.append(type(r))).info("Test")
+
+    assert stream.getvalue() == "INFO tests.test_recattr Test\n"
+    assert records == [recattrs.LazyRecord]
+
+
+def test_lazy_record_fields_computed_on_access():
+    stream = io.StringIO()
+    records = []
+
+    def patch(record):
+        records.append(record["thread"].name)
+        record["extra"]["foo"] = "bar"
+
+    logger.add(stream, format="{extra[foo]} {file} {message}")
+    logger.patch(patch).info("Test")
+
+    assert stream.getvalue() == "bar test_recattr.py Test\n"
+    assert records == [threading.current_thread().name]
+
+
+def test_lazy_record_used_as_dict():
+    stream = io.StringIO()
+    records = []
+
+    logger.add(stream, format="{message}")
+    logger.bind(a=1).patch(records.append).info("Test")
+
+    (record,) = records
+    assert isinstance(record, recattrs.LazyRecord)
+    assert "elapsed" in record
+    assert record.get("extra") == {"a": 1}
+    assert record.get("unknown", 42) == 42
+    assert list(record) == [
+        "elapsed",
+        "exception",
+        "extra",
+        "file",
+        "function",
+        "level",
+        "line",
+        "message",
+        "module",
+        "name",
+        "process",
+        "thread",
+        "time",
+    ]
+    assert dict(record) == {**record} == dict(record.items()) == record
+
+
+def test_lazy_record_deleted_field_not_recomputed():
+    stream = io.StringIO()
+
+    def patch(record):
+        del record["thread"]
+        assert "thread" not in record
+        assert record.copy().get("thread") is None
+
+    logger.add(stream, format="{message}")
+    logger.patch(patch).info("Test")
+
+    assert stream.getvalue() == "Test\n"
+
+
+def test_lazy_record_pickled_as_dict():
+    stream = io.StringIO()
+    records = []
+
+    logger.add(stream, format="{message}")
+    logger.patch(records.append).info("Test")
+
+    (record,) = records
+    unpickled = pickle.loads(pickle.dumps(record))
+    assert type(unpickled) is dict
+    assert unpickled["thread"].name == threading.current_thread().name
+    assert unpickled["file"].name == "test_recattr.py"
+
+
+def test_record_not_lazy_if_all_fields_needed():
+    stream = io.StringIO()
+    records = []
+
+    logger.add(stream, format="{elapsed} {extra} {file} {process} {thread} {message}")
+    logger.patch(records.append).info("Test")
+
+    assert type(records[0]) is dict
+
+
+def test_record_not_lazy_if_sink_is_callable(writer):
+    records = []
+
+    logger.add(io.StringIO(), format="{message}")
+    logger.add(writer, format="{message}")
+    logger.patch(records.append).info("Test")
+
+    assert type(records[0]) is dict
+
+
+def test_record_not_lazy_if_sink_is_custom_stream():
+    class Stream:
+        def __init__(self):
+            self.records = []
+
+        def write(self, message):
+            self.records.append(message.record)
+
+    def worker():
+        logger.info("Test")
+
+    stream = Stream()
+    logger.configure(extra={"a": 1})
+    logger.add(stream, format="{message}")
+
+    thread = threading.Thread(target=worker, name="worker")
+    thread.start()
+    thread.join()
+
+    logger.configure(extra={"a": 2})
+
+    (record,) = stream.records
+    assert type(record) is dict
+    assert record["thread"].name == "worker"
+    assert record["extra"] == {"a": 1}
+
+
+def test_record_lazy_again_after_handler_removed(writer):
+    records = []
+
+    logger.add(io.StringIO(), format="{message}")
+    i = logger.add(writer, format="{message}")
+    logger.remove(i)
+    logger.patch(records.append).info("Test")
+
+    assert type(records[0]) is recattrs.LazyRecord